@@ -1,4 +1,6 @@
 import os
+import unicodedata
+from array import array
 
 # Clase Producto
 class Producto:
@@ -12,22 +14,109 @@ class Producto:
         return f"{self.id_producto:<10} | {self.nombre:<20} | {self.cantidad:<8} | ${self.precio:<8.2f}"
 
 
+# Normaliza un texto para buscar: minúsculas y sin tildes ("Lápiz" -> "lapiz")
+def normalizar_texto(texto):
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+# Índice de trigramas (subcadenas de 3 letras) de los nombres de productos
+class IndiceTrigramas:
+    """Para buscar por parte del nombre sin recorrer todo el inventario: cada trigrama
+    guarda las entradas cuyo nombre lo contiene y solo se revisan las de la lista más
+    corta. Eliminar marca la entrada como muerta; si hay más muertas que vivas, se
+    reconstruye.
+    """
+
+    def __init__(self):
+        self.listas = {}       # trigrama -> array de números de entrada
+        self.productos = []    # entrada -> producto (None = eliminado)
+        self.textos = []       # entrada -> nombre normalizado
+        self.entrada_de = {}   # id_producto -> entrada viva
+        self.muertas = 0
+
+    def agregar(self, producto):
+        texto = normalizar_texto(producto.nombre)
+        entrada = len(self.productos)
+        self.productos.append(producto)
+        self.textos.append(texto)
+        self.entrada_de[producto.id_producto] = entrada
+        for trigrama in {texto[i:i + 3] for i in range(len(texto) - 2)}:
+            if trigrama not in self.listas:
+                self.listas[trigrama] = array("i")
+            self.listas[trigrama].append(entrada)
+
+    def quitar(self, id_producto):
+        entrada = self.entrada_de.pop(id_producto, None)
+        if entrada is None:
+            return
+        self.productos[entrada] = None
+        self.textos[entrada] = ""
+        self.muertas += 1
+        if self.muertas > 1024 and self.muertas > len(self.entrada_de):
+            vivos = [p for p in self.productos if p is not None]
+            self.__init__()
+            for p in vivos:
+                self.agregar(p)
+
+    def buscar(self, consulta):
+        """Productos cuyo nombre contiene la consulta (sin distinguir mayúsculas ni tildes),
+        en el orden en que se agregaron.
+        """
+        q = normalizar_texto(consulta)
+        if not q:
+            return [p for p in self.productos if p is not None]
+        if len(q) < 3:
+            candidatas = range(len(self.textos))
+        else:
+            listas = []
+            for trigrama in {q[i:i + 3] for i in range(len(q) - 2)}:
+                if trigrama not in self.listas:
+                    return []
+                listas.append(self.listas[trigrama])
+            candidatas = min(listas, key=len)
+        return [self.productos[e] for e in candidatas if q in self.textos[e]]
+
+
 # Clase Inventario
 class Inventario:
     def __init__(self):
         self.productos = []
 
+    # Al reemplazar la lista completa, el índice de nombres se rehace en la próxima búsqueda
+    @property
+    def productos(self):
+        return self._productos
+
+    @productos.setter
+    def productos(self, productos):
+        self._productos = productos
+        self._indice = None
+
+    def indice_nombres(self):
+        if self._indice is None:
+            self._indice = IndiceTrigramas()
+            for p in self._productos:
+                self._indice.agregar(p)
+        return self._indice
+
     def agregar(self, producto):
         if any(p.id_producto == producto.id_producto for p in self.productos):
             print("❌ Ya existe un producto con ese ID.")
         else:
             self.productos.append(producto)
+            if self._indice is not None:
+                self._indice.agregar(producto)
             print("✅ Producto agregado al inventario.")
 
     def eliminar(self, id_producto):
         for p in self.productos:
             if p.id_producto == id_producto:
                 self.productos.remove(p)
+                if self._indice is not None:
+                    self._indice.quitar(id_producto)
                 print("🗑️ Producto eliminado correctamente.")
                 return
         print("⚠️ No se encontró un producto con ese ID.")
@@ -44,7 +133,8 @@ class Inventario:
         print("⚠️ No se encontró un producto con ese ID.")
 
     def buscar(self, nombre):
-        encontrados = [p for p in self.productos if nombre.lower() in p.nombre.lower()]
+        # Búsqueda parcial sin distinguir mayúsculas ni tildes ("lapiz" encuentra "Lápiz")
+        encontrados = self.indice_nombres().buscar(nombre)
         if encontrados:
             print("\n🔎 Resultados de búsqueda:")
             self.mostrar_tabla(encontrados)
@@ -13,6 +13,28 @@ Estas son las características clave:
   PermissionError, errores de parseo (archivo corrupto), etc.
 - Interfaz de consola con mensajes claros de éxito o fallo.
 - Escritura atómica (usa archivo temporal + os.replace) para minimizar corrupción.
+- Modo journal opcional: cada cambio se anexa como un registro a `inventario.txt.journal`
+  y se compacta en `inventario.txt` al superar un umbral de registros o bytes.
+- Transacciones (`with inv.transaccion():` / `aplicar_lote(ops)`): muchos cambios
+  en memoria, reversión ante fallos y una única escritura al confirmar.
+- Persistencia asíncrona opcional (`asincrono=True`): un hilo escritor agrupa los
+  cambios y escribe como máximo cada N ms; `flush()`/`close()` fuerzan la escritura.
+- Carga paralela de archivos grandes: el CSV se divide en bloques alineados a líneas
+  que se procesan en varios procesos (ProcessPoolExecutor).
+- Instantánea binaria `inventario.txt.bin` escrita junto al CSV: si su checksum y la
+  fecha/tamaño del CSV coinciden, se carga en lugar del CSV (arranque mucho más rápido).
+- `InventarioIndexado`: consultas de solo lectura por ID (kioscos) con un índice
+  ordenado `inventario.txt.idx` mapeado en memoria, sin cargar todo el inventario.
+- Almacén columnar opcional (`almacen="columnar"`): cantidades y precios en arrays,
+  ids y nombres en listas; mucho menos memoria por producto que un dict de dataclasses.
+- Modo compartido (`compartido=True`) para varias terminales sobre el mismo archivo:
+  bloqueo consultivo (fcntl.flock sobre `inventario.txt.lock`) al escribir y recarga
+  incremental cuando otro proceso modificó el archivo (se detecta por inodo/mtime/tamaño).
+- Instrumentación opcional (`instrumentacion=True` o `activar_instrumentacion()`):
+  histogramas de latencia acotados (p50/p95/p99) por método y por fase (parseo,
+  archivo temporal, os.replace, fsync del journal...). Desactivada no cuesta nada.
+- Modo por lotes sin menú (`--lote comandos.txt` o `--lote -` para stdin): ejecuta
+  comandos CSV o JSON por línea con una sola escritura al final y muestra ops/s.
 - Código comentado y organizado.
 
 Formato del archivo `inventario.txt` (CSV con cabecera):
@@ -20,19 +42,59 @@ Formato del archivo `inventario.txt` (CSV con cabecera):
     P001,Lápiz,120,0.25
     P002,Cuaderno,50,1.80
 
+Formato del journal `inventario.txt.journal` (CSV sin cabecera, un registro por cambio):
+    PUT,P001,Lápiz,110,0.25     -> alta o actualización (estado completo del producto)
+    DEL,P002                    -> eliminación
+
+Formato de la instantánea binaria `inventario.txt.bin` (little-endian):
+    cabecera: magia b"INVB", versión (H), n (Q), mtime_ns del CSV (q), tamaño del CSV (q),
+              crc32 del cuerpo (I)
+    cuerpo:   n cantidades (int64) | n precios (double) |
+              tabla de cadenas UTF-8 "id0\0nombre0\0id1\0nombre1..."
+
+Formato de los comandos del modo por lotes (una línea por comando; `#` = comentario):
+    add,P001,Lápiz,120,0.25          {"op": "add", "id": "P001", "nombre": "Lápiz", "cantidad": 120, "precio": 0.25}
+    update,P001,,110,                {"op": "update", "id": "P001", "cantidad": 110}
+    delete,P001                      {"op": "delete", "id": "P001"}
+    get,P001                         {"op": "get", "id": "P001"}
+    list                             {"op": "list"}
+  Cada resultado se escribe en stdout como una línea JSON.
+
 Run:
     python inventario.py
+    python inventario.py --archivo inventario.txt --lote comandos.txt > resultados.jsonl
 
 Autor: (Flor Muñoz)
 """
 from __future__ import annotations
 
+import argparse
 import csv
+import functools
+import io
+import json
+import math
+import mmap
 import os
+import struct
 import sys
 import tempfile
-from dataclasses import dataclass, asdict
-from typing import Dict, Optional, Tuple, List
+import threading
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager, nullcontext
+from itertools import chain
+from dataclasses import dataclass, asdict, replace
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, List
+
+try:
+    import fcntl  # bloqueo entre procesos (Linux/Mac)
+except ImportError:  # Windows: el modo compartido funciona sin bloqueo entre procesos
+    fcntl = None
 
 
 # -----------------------------
@@ -55,6 +117,457 @@ class Producto:
         }
 
 
+def _error_numeros(cantidad: Any, precio: Any) -> Optional[str]:
+    """Mensaje de error si cantidad no es un int o precio no es un número (bool no
+    cuenta como número); None si ambos sirven. Lo usan Inventario y AlmacenColumnar."""
+    if isinstance(cantidad, bool) or not isinstance(cantidad, int):
+        return f"La cantidad debe ser un número entero (se recibió {cantidad!r})."
+    if isinstance(precio, bool) or not isinstance(precio, (int, float)):
+        return f"El precio debe ser un número (se recibió {precio!r})."
+    return None
+
+
+def _convertir_campos(id_txt: Optional[str], nombre_txt: Optional[str], cantidad_txt: Optional[str],
+                      precio_txt: Optional[str]) -> Tuple[str, str, int, float]:
+    """Convierte los campos de texto de una fila a (id, nombre, cantidad, precio).
+    Lanza ValueError si la fila no es válida. Compartida por la carga secuencial y la paralela.
+    """
+    idp = (id_txt or "").strip()
+    nombre = (nombre_txt or "").strip()
+    cantidad_str = (cantidad_txt or "0").strip()
+    precio_str = (precio_txt or "0").strip()
+    if not idp:
+        raise ValueError("ID vacío")
+    return idp, nombre, int(cantidad_str), float(precio_str)
+
+
+def _parsear_bloque(ruta: str, inicio: int, fin: int, posiciones: Tuple[int, int, int, int]
+                    ) -> Tuple[Tuple[List[str], List[str], List[int], List[float]], List[Tuple[int, str]], int, bool]:
+    """Tarea de un proceso de la carga paralela: procesa los bytes [inicio, fin) del CSV.
+
+    `posiciones` son los índices de las columnas id, nombre, cantidad y precio.
+    Devuelve (columnas, errores, lineas, multilinea):
+    - columnas: listas paralelas (ids, nombres, cantidades, precios) de las filas válidas,
+      en orden de archivo. Se devuelven por columnas porque se serializan (pickle) mucho
+      más rápido que una tupla por fila.
+    - errores: (línea relativa al bloque, mensaje).
+    - lineas: cantidad de saltos de línea del bloque, para numerar los bloques siguientes.
+    - multilinea: True si hay campos con saltos de línea (entre comillas); en ese caso el
+      corte por líneas no es fiable y se debe usar la carga secuencial.
+    """
+    with open(ruta, "rb") as f:
+        f.seek(inicio)
+        datos = f.read(fin - inicio)
+    ids: List[str] = []
+    nombres: List[str] = []
+    cantidades: List[int] = []
+    precios: List[float] = []
+    errores: List[Tuple[int, str]] = []
+    i_id, i_nombre, i_cantidad, i_precio = posiciones
+    reader = csv.reader(io.StringIO(datos.decode("utf-8"), newline=""))
+    for row in reader:
+        if not row:
+            continue  # csv.DictReader también ignora las líneas vacías
+        n = len(row)
+        try:
+            idp, nombre, cantidad, precio = _convertir_campos(row[i_id] if i_id < n else None,
+                                                              row[i_nombre] if i_nombre < n else None,
+                                                              row[i_cantidad] if i_cantidad < n else None,
+                                                              row[i_precio] if i_precio < n else None)
+            ids.append(idp)
+            nombres.append(nombre)
+            cantidades.append(cantidad)
+            precios.append(precio)
+        except Exception as e:
+            errores.append((reader.line_num, str(e)))
+        if any("\n" in campo or "\r" in campo for campo in row):
+            return ([], [], [], []), [], 0, True
+    return (ids, nombres, cantidades, precios), errores, datos.count(b"\n"), False
+
+
+class AlmacenColumnar(MutableMapping):
+    """Almacén de productos por columnas, intercambiable con el dict {id: Producto}.
+
+    Cada producto ocupa una fila: `cantidad` en array('q'), `precio` en array('d'),
+    id y nombre (internado con sys.intern) en listas, y un dict id -> fila. Los objetos
+    Producto no se guardan: se crean bajo demanda al leer (son copias; Inventario nunca
+    modifica un Producto en sitio, siempre lo reemplaza).
+    - Al eliminar, la fila queda vacía (id None) y se compacta cuando hay muchas vacías,
+      así se conserva el orden de inserción igual que con un dict.
+    - `cantidad` debe ser int y caber en 64 bits, y `precio` un número: si no, ValueError
+      (con el mismo mensaje que Inventario.agregar), antes de tocar ninguna columna.
+
+    Memoria medida con benchmarks/bench_memoria_almacen.py (1M productos, CPython 3.11,
+    64 bits, tracemalloc):
+        nombres todos distintos:  dict de Producto 334 MB (334 B/producto); columnar 279 MB
+        5000 nombres distintos:   dict de Producto 332 MB;                   columnar 154 MB
+    Lo que queda en el columnar son sobre todo los propios str de id y nombre y el dict
+    id -> fila; el ahorro crece cuanto más se repiten los nombres.
+    """
+
+    def __init__(self) -> None:
+        self._fila: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._nombres: List[str] = []
+        self._cantidades = array("q")
+        self._precios = array("d")
+        self._vacias = 0
+
+    def __len__(self) -> int:
+        return len(self._fila)
+
+    def __contains__(self, id_producto: object) -> bool:
+        return id_producto in self._fila
+
+    def __iter__(self) -> Iterator[str]:
+        return (idp for idp in self._ids if idp is not None)
+
+    def __getitem__(self, id_producto: str) -> Producto:
+        fila = self._fila[id_producto]
+        return Producto(id_producto, self._nombres[fila], self._cantidades[fila], self._precios[fila])
+
+    def __setitem__(self, id_producto: str, producto: Producto) -> None:
+        # Todo lo que puede fallar va antes de tocar las columnas, para que sigan alineadas:
+        # los tipos numéricos, el rango de array('q') y sys.intern (nombre no str).
+        error = _error_numeros(producto.cantidad, producto.precio)
+        if error is None and not -2 ** 63 <= producto.cantidad < 2 ** 63:
+            error = f"La cantidad no cabe en 64 bits (se recibió {producto.cantidad!r})."
+        if error is not None:
+            raise ValueError(error)
+        nombre = sys.intern(producto.nombre)
+        fila = self._fila.get(id_producto)
+        if fila is None:
+            self._cantidades.append(producto.cantidad)
+            self._precios.append(producto.precio)
+            self._ids.append(id_producto)
+            self._nombres.append(nombre)
+            self._fila[id_producto] = len(self._ids) - 1
+        else:
+            self._cantidades[fila] = producto.cantidad
+            self._precios[fila] = producto.precio
+            self._nombres[fila] = nombre
+
+    def __delitem__(self, id_producto: str) -> None:
+        fila = self._fila.pop(id_producto)
+        self._ids[fila] = None
+        self._nombres[fila] = ""
+        self._vacias += 1
+        if self._vacias > 1024 and self._vacias * 2 > len(self._ids):
+            self._compactar()
+
+    def _compactar(self) -> None:
+        """Elimina las filas vacías conservando el orden."""
+        vivas = [fila for fila, idp in enumerate(self._ids) if idp is not None]
+        self._ids = [self._ids[f] for f in vivas]
+        self._nombres = [self._nombres[f] for f in vivas]
+        self._cantidades = array("q", (self._cantidades[f] for f in vivas))
+        self._precios = array("d", (self._precios[f] for f in vivas))
+        self._fila = {idp: fila for fila, idp in enumerate(self._ids)}
+        self._vacias = 0
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def fusionar_columnas(self, ids: List[str], nombres: List[str],
+                          cantidades: Iterable[int], precios: Iterable[float]) -> None:
+        """Carga masiva desde columnas (cargadores) sin crear objetos Producto.
+        Con IDs repetidos gana el último, como en dict.update.
+        """
+        if not self._fila:
+            nuevas = dict(zip(ids, range(len(ids))))
+            if len(nuevas) == len(ids):
+                # Caso habitual (almacén vacío, IDs únicos): se extienden las columnas de una vez
+                self.clear()
+                self._cantidades.extend(cantidades)
+                self._precios.extend(precios)
+                self._ids.extend(ids)
+                self._nombres.extend(map(sys.intern, nombres))
+                self._fila = nuevas
+                return
+        for idp, nombre, cantidad, precio in zip(ids, nombres, cantidades, precios):
+            self[idp] = Producto(idp, nombre, cantidad, precio)
+
+    def instantanea(self) -> "_InstantaneaColumnar":
+        """Copia barata de las columnas (sin crear Producto) para guardar a disco."""
+        return _InstantaneaColumnar(list(self._ids), list(self._nombres), array("q", self._cantidades),
+                                    array("d", self._precios), len(self._fila))
+
+
+class _InstantaneaColumnar:
+    """Copia inmutable de un AlmacenColumnar; al recorrerla crea los Producto de a uno."""
+
+    def __init__(self, ids: List[Optional[str]], nombres: List[str], cantidades: array,
+                 precios: array, n: int) -> None:
+        self._columnas = (ids, nombres, cantidades, precios)
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[Producto]:
+        for idp, nombre, cantidad, precio in zip(*self._columnas):
+            if idp is not None:
+                yield Producto(idp, nombre, cantidad, precio)
+
+
+@dataclass
+class ResultadoTransaccion:
+    """Resultado de una transacción, disponible al salir del bloque `with`."""
+    confirmada: bool = False  # False si se revirtió
+    guardada: bool = False    # True si la escritura única al confirmar tuvo éxito
+    operaciones: int = 0      # cambios confirmados
+
+
+class _LoteRevertido(Exception):
+    """Uso interno: provoca la reversión de la transacción de `aplicar_lote`."""
+
+
+class EscritorAgrupado:
+    """Hilo escritor del modo asíncrono (group commit).
+
+    Las mutaciones solo encolan sus registros y regresan. El hilo espera a que haya
+    cambios pendientes y los escribe todos juntos, como máximo una vez cada
+    `intervalo_s` segundos; así una ráfaga de cambios cuesta una sola escritura.
+    Es el único que escribe en disco mientras está activo.
+
+    Si una escritura falla, los registros vuelven a la cola y se reintenta con espera
+    creciente (el doble cada vez, hasta ESPERA_MAXIMA_ERROR_S). Al detener se hace un
+    último intento; lo que no se pudo escribir se descarta, se cuenta y detener()
+    devuelve False.
+    """
+
+    ESPERA_MAXIMA_ERROR_S = 5.0
+
+    def __init__(self, inventario: "Inventario", intervalo_s: float) -> None:
+        self._inv = inventario
+        self._intervalo = intervalo_s
+        # Comparte el candado del inventario: encolar ocurre dentro de las mutaciones
+        self._cond = threading.Condition(inventario._lock)
+        self._pendientes: List[List[str]] = []
+        self._generacion = 0           # se incrementa en cada encolado
+        self._generacion_escrita = 0   # última generación ya escrita (o intentada)
+        self._urgente = False          # flush() pide escribir sin esperar el intervalo
+        self._compactar = False
+        self._detener = False
+        self._ultima_escritura = 0.0
+        self._ultimo_ok = True
+        self._espera = intervalo_s     # crece tras cada fallo, vuelve a intervalo_s al escribir bien
+        # Métricas
+        self.escrituras = 0
+        self.cambios_escritos = 0
+        self.fallos = 0
+        self.descartados = 0           # registros que no se pudieron escribir antes de detener
+        self._hilo = threading.Thread(target=self._bucle, name="inventario-escritor", daemon=True)
+        self._hilo.start()
+
+    def encolar(self, registros: List[List[str]]) -> None:
+        with self._cond:
+            self._pendientes.extend(registros)
+            self._generacion += 1
+            self._cond.notify_all()
+
+    def _hay_trabajo(self) -> bool:
+        return bool(self._pendientes) or self._compactar
+
+    def _bucle(self) -> None:
+        while True:
+            with self._cond:
+                while not self._hay_trabajo() and not self._detener:
+                    self._cond.wait()
+                if not self._hay_trabajo():
+                    return  # detenido y sin pendientes
+                # Esperar a completar el intervalo (más largo tras un fallo): mientras tanto
+                # se acumulan más cambios
+                while not (self._urgente or self._detener):
+                    restante = self._ultima_escritura + self._espera - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._cond.wait(restante)
+                registros, self._pendientes = self._pendientes, []
+                generacion, compactar = self._generacion, self._compactar
+                self._urgente = self._compactar = False
+                ultimo_intento = self._detener
+            # La escritura ocurre sin el candado: las mutaciones no se bloquean
+            ok = self._inv._escribir_registros(registros) if registros else True
+            if compactar:
+                ok = self._inv._guardar_atomico() and ok
+            with self._cond:
+                self._ultima_escritura = time.monotonic()
+                self._ultimo_ok = ok
+                if ok:
+                    self.escrituras += 1
+                    self.cambios_escritos += len(registros)
+                    self._espera = self._intervalo
+                else:
+                    self.fallos += 1
+                    self._espera = min(max(self._espera, 0.01) * 2, self.ESPERA_MAXIMA_ERROR_S)
+                    if ultimo_intento:
+                        self.descartados += len(registros)
+                    elif registros and not self._inv._solo_lectura:
+                        self._pendientes[:0] = registros  # se reintentan en el próximo ciclo
+                self._generacion_escrita = generacion
+                self._cond.notify_all()
+                if ultimo_intento and not ok:
+                    self.descartados += len(self._pendientes)
+                    self._pendientes = []
+                    return
+
+    def flush(self, compactar: bool = False) -> bool:
+        """Escribe ya lo pendiente y espera a que termine. Devuelve si la escritura tuvo éxito."""
+        with self._cond:
+            if not self._hilo.is_alive():
+                return self._ultimo_ok
+            self._compactar = self._compactar or compactar
+            objetivo = self._generacion
+            if not self._hay_trabajo() and self._generacion_escrita >= objetivo:
+                return self._ultimo_ok
+            self._urgente = True
+            self._cond.notify_all()
+            while self._hilo.is_alive() and (self._generacion_escrita < objetivo or self._compactar):
+                self._cond.wait(0.1)
+            return self._ultimo_ok
+
+    def detener(self) -> bool:
+        """Escribe lo pendiente (un último intento) y termina el hilo. Devuelve False si
+        quedaron cambios sin escribir."""
+        with self._cond:
+            self._detener = True
+            self._cond.notify_all()
+        self._hilo.join()
+        return self._ultimo_ok and not self.descartados
+
+    def metricas(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "escrituras": self.escrituras,
+                "cambios_escritos": self.cambios_escritos,
+                # Cambios que no necesitaron una escritura propia al agruparse con otros
+                "cambios_coalescidos": self.cambios_escritos - self.escrituras,
+                "fallos": self.fallos,
+                "descartados": self.descartados,
+                "pendientes": len(self._pendientes),
+            }
+
+
+class HistogramaLatencias:
+    """Histograma de latencias (en nanosegundos) con memoria acotada.
+
+    Cada potencia de 2 se divide en 8 cubetas, así que el tamaño es fijo (496 cubetas)
+    sin importar cuántas muestras se registren, y los percentiles tienen un error
+    relativo menor al 7 %. Mínimo, máximo y suma son exactos.
+    """
+
+    SUBCUBETAS = 8
+    CUBETAS = 16 + (64 - 4) * 8
+
+    def __init__(self) -> None:
+        self._conteos = [0] * self.CUBETAS
+        self.n = 0
+        self.suma_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    @staticmethod
+    def _cubeta(ns: int) -> int:
+        if ns < 16:
+            return ns
+        e = ns.bit_length()
+        return 16 + (e - 5) * 8 + ((ns >> (e - 4)) - 8)
+
+    @staticmethod
+    def _valor_representativo(cubeta: int) -> int:
+        if cubeta < 16:
+            return cubeta
+        e = (cubeta - 16) // 8 + 5
+        inicio = (8 + (cubeta - 16) % 8) << (e - 4)
+        return inicio + (1 << (e - 4)) // 2  # punto medio de la cubeta
+
+    def registrar(self, ns: int) -> None:
+        ns = max(ns, 0)
+        self._conteos[self._cubeta(ns)] += 1
+        if not self.n or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.n += 1
+        self.suma_ns += ns
+
+    def percentil(self, q: float) -> int:
+        """Valor aproximado (ns) bajo el cual queda la fracción `q` de las muestras."""
+        if not self.n:
+            return 0
+        objetivo = max(1, math.ceil(q * self.n))
+        acumulado = 0
+        for cubeta, conteo in enumerate(self._conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return min(max(self._valor_representativo(cubeta), self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def resumen(self) -> Dict[str, float]:
+        """Conteo y tiempos en milisegundos."""
+        ms = 1e-6
+        return {
+            "n": self.n,
+            "media_ms": self.suma_ns / self.n * ms if self.n else 0.0,
+            "p50_ms": self.percentil(0.50) * ms,
+            "p95_ms": self.percentil(0.95) * ms,
+            "p99_ms": self.percentil(0.99) * ms,
+            "max_ms": self.max_ns * ms,
+            "total_ms": self.suma_ns * ms,
+        }
+
+
+class Instrumentacion:
+    """Colección de histogramas por nombre de operación o fase (p. ej. "agregar",
+    "guardar_atomico.os_replace"). Segura entre hilos: el escritor asíncrono también registra.
+    """
+
+    def __init__(self) -> None:
+        self._histogramas: Dict[str, HistogramaLatencias] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, nombre: str, ns: int) -> None:
+        with self._lock:
+            hist = self._histogramas.get(nombre)
+            if hist is None:
+                hist = self._histogramas[nombre] = HistogramaLatencias()
+            hist.registrar(ns)
+
+    @contextmanager
+    def medir(self, nombre: str) -> Iterator[None]:
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter_ns() - inicio)
+
+    def envolver(self, funcion: Any, nombre: str) -> Any:
+        """Devuelve `funcion` cronometrada bajo `nombre`."""
+        registrar, reloj = self.registrar, time.perf_counter_ns
+
+        @functools.wraps(funcion)
+        def medida(*args: Any, **kwargs: Any) -> Any:
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registrar(nombre, reloj() - inicio)
+        return medida
+
+    def resumen(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {nombre: h.resumen() for nombre, h in sorted(self._histogramas.items())}
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+
+
+# Contexto vacío reutilizable: las fases no miden nada con la instrumentación apagada
+_SIN_MEDICION = nullcontext()
+
+
 # -----------------------------
 # Repositorio con persistencia
 # -----------------------------
@@ -64,18 +577,231 @@ class Inventario:
     - Mantiene un índice en memoria (diccionario) para rapidez.
     - En cada operación de escritura (agregar/actualizar/eliminar) sincroniza
       al archivo con escritura atómica.
+    - Con `modo_journal=True` cada operación solo anexa un registro al journal;
+      el archivo completo se reescribe (compacta) al superar los umbrales.
     - Carga inicial tolerante a fallos: ignora filas inválidas y avisa.
+    - Con `compartido=True` varias instancias (p. ej. en distintas terminales) pueden
+      usar el mismo archivo sin pisarse los cambios.
     """
 
     CAMPOS = ("id", "nombre", "cantidad", "precio")
+    SUFIJO_JOURNAL = ".journal"
+    SUFIJO_BLOQUEO = ".lock"
+    # Métodos que se cronometran con la instrumentación activa -> nombre del histograma
+    METODOS_INSTRUMENTADOS = {
+        "agregar": "agregar",
+        "actualizar": "actualizar",
+        "eliminar": "eliminar",
+        "_persistir": "persistir",
+        "_anexar_journal": "journal.anexar",
+        "_cargar_desde_archivo": "cargar",
+        "_guardar_atomico": "guardar_atomico",
+    }
+    SUFIJO_BINARIO = ".bin"
+    MAGIA_BINARIO = b"INVB"
+    VERSION_BINARIO = 1
+    CABECERA_BINARIO = struct.Struct("<4sHQqqI")
 
-    def __init__(self, ruta_archivo: str = "inventario.txt") -> None:
+    def __init__(self, ruta_archivo: str = "inventario.txt", *, modo_journal: bool = False,
+                 max_registros_journal: int = 1000, max_bytes_journal: int = 1024 * 1024,
+                 asincrono: bool = False, intervalo_escritura_ms: int = 200,
+                 procesos_carga: Optional[int] = None,
+                 umbral_carga_paralela_bytes: int = 16 * 1024 * 1024,
+                 snapshot_binario: bool = True, almacen: str = "dict", compartido: bool = False,
+                 instrumentacion: bool = False) -> None:
+        if almacen not in ("dict", "columnar"):
+            raise ValueError(f"Almacén desconocido: {almacen!r} (use 'dict' o 'columnar').")
+        if compartido and asincrono:
+            # Con escrituras diferidas no se puede releer el archivo sin perder lo pendiente
+            raise ValueError("El modo compartido no se puede combinar con la persistencia asíncrona.")
         self.ruta_archivo = ruta_archivo
-        self._productos: Dict[str, Producto] = {}
+        # Ambos almacenes se usan igual: {id: Producto}
+        self._productos: MutableMapping[str, Producto] = AlmacenColumnar() if almacen == "columnar" else {}
         self._solo_lectura = False  # Se activa si detectamos PermissionError al escribir
         self._errores_carga: List[str] = []
-        self._asegurar_archivo()
-        self._cargar_desde_archivo()
+        self._modo_journal = modo_journal
+        self._ruta_journal = ruta_archivo + self.SUFIJO_JOURNAL
+        self._max_registros_journal = max_registros_journal
+        self._max_bytes_journal = max_bytes_journal
+        self._registros_journal = 0  # registros en el journal aún no compactados
+        self._bytes_journal = 0      # bytes del journal ya aplicados en memoria
+        self._lineas_journal = 0
+        self._journal_incompleto = False  # el journal termina en una línea truncada
+        self._aviso_journal: Optional[str] = None  # mensaje sobre esa línea, mientras siga así
+        # Estado de la transacción en curso (nivel 0 = sin transacción)
+        self._tx_nivel = 0
+        self._tx_registros: List[List[str]] = []
+        self._tx_deshacer: List[Tuple[str, Optional[Producto]]] = []
+        self._tx_resultado: Optional[ResultadoTransaccion] = None
+        # Protege _productos y las colas; reentrante porque las transacciones lo retienen
+        self._lock = threading.RLock()
+        self._escritor: Optional[EscritorAgrupado] = None
+        # Carga paralela: None = un proceso por CPU; solo para archivos mayores al umbral
+        self._procesos_carga = procesos_carga or os.cpu_count() or 1
+        self._umbral_carga_paralela = umbral_carga_paralela_bytes
+        self._snapshot_binario = snapshot_binario
+        self._ruta_binario = ruta_archivo + self.SUFIJO_BINARIO
+        self._origen_carga = "csv"  # "binario" si se usó la instantánea binaria
+        # Modo compartido entre procesos
+        self._compartido = compartido
+        self._ruta_bloqueo = ruta_archivo + self.SUFIJO_BLOQUEO
+        self._fd_bloqueo: Optional[int] = None
+        self._nivel_bloqueo = 0
+        self._firma_conocida: Optional[Tuple[Any, ...]] = None  # estado del disco ya cargado
+        self.recargas = 0              # recargas completas por cambios de otro proceso
+        self.recargas_incrementales = 0
+        # Latencias: None = desactivada (ni los métodos envueltos ni las fases cuestan nada)
+        self._instrumentacion: Optional[Instrumentacion] = None
+        if instrumentacion:
+            self.activar_instrumentacion()
+        with self._bloqueo():
+            self._asegurar_archivo()
+            self._cargar_desde_archivo()
+            self._recordar_firma()
+        if asincrono:
+            self._escritor = EscritorAgrupado(self, intervalo_escritura_ms / 1000.0)
+
+    def __enter__(self) -> "Inventario":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # ---------------------
+    # Instrumentación (latencias)
+    # ---------------------
+    def activar_instrumentacion(self) -> None:
+        """Empieza a registrar latencias. Los métodos medidos se envuelven solo en esta
+        instancia, así que con la instrumentación apagada se llama al método original.
+        """
+        if self._instrumentacion is not None:
+            return
+        self._instrumentacion = Instrumentacion()
+        for metodo, nombre in self.METODOS_INSTRUMENTADOS.items():
+            setattr(self, metodo, self._instrumentacion.envolver(getattr(self, metodo), nombre))
+
+    def desactivar_instrumentacion(self) -> None:
+        """Deja de medir y descarta los histogramas."""
+        for metodo in self.METODOS_INSTRUMENTADOS:
+            self.__dict__.pop(metodo, None)
+        self._instrumentacion = None
+
+    def instrumentacion_activa(self) -> bool:
+        return self._instrumentacion is not None
+
+    def metricas_latencia(self) -> Dict[str, Dict[str, float]]:
+        """{operación o fase: {n, media_ms, p50_ms, p95_ms, p99_ms, max_ms, total_ms}}.
+        Vacío si la instrumentación está desactivada.
+        """
+        return self._instrumentacion.resumen() if self._instrumentacion is not None else {}
+
+    def reiniciar_metricas_latencia(self) -> None:
+        if self._instrumentacion is not None:
+            self._instrumentacion.reiniciar()
+
+    def _fase(self, nombre: str) -> Any:
+        """Cronometra una fase interna: `with self._fase("guardar_atomico.os_replace"):`."""
+        instrumentacion = self._instrumentacion
+        return instrumentacion.medir(nombre) if instrumentacion is not None else _SIN_MEDICION
+
+    # ---------------------
+    # Modo compartido (varios procesos)
+    # ---------------------
+    @contextmanager
+    def _bloqueo(self, compartido: bool = False) -> Iterator[None]:
+        """Bloqueo consultivo entre procesos sobre `inventario.txt.lock` (solo en modo
+        compartido y si existe fcntl). Exclusivo para escribir; `compartido=True` para leer.
+        Es reentrante: si ya se tiene, no se vuelve a pedir.
+        """
+        if not self._compartido or fcntl is None or self._nivel_bloqueo:
+            self._nivel_bloqueo += 1
+            try:
+                yield
+            finally:
+                self._nivel_bloqueo -= 1
+            return
+        try:
+            if self._fd_bloqueo is None:
+                self._fd_bloqueo = os.open(self._ruta_bloqueo, os.O_RDWR | os.O_CREAT, 0o666)
+            fcntl.flock(self._fd_bloqueo, fcntl.LOCK_SH if compartido else fcntl.LOCK_EX)
+        except OSError as e:
+            print(f"[ADVERTENCIA] No se pudo bloquear {self._ruta_bloqueo}: {e}. Se continúa sin bloqueo.")
+            self._nivel_bloqueo += 1
+            try:
+                yield
+            finally:
+                self._nivel_bloqueo -= 1
+            return
+        self._nivel_bloqueo = 1
+        try:
+            yield
+        finally:
+            self._nivel_bloqueo = 0
+            fcntl.flock(self._fd_bloqueo, fcntl.LOCK_UN)
+
+    def _firma_disco(self) -> Tuple[Any, ...]:
+        """(inodo, mtime_ns, tamaño) del CSV y (inodo, tamaño) del journal; solo dos stat."""
+        def firma(ruta: str, con_mtime: bool) -> Optional[Tuple[int, ...]]:
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                return None
+            return (st.st_ino, st.st_mtime_ns, st.st_size) if con_mtime else (st.st_ino, st.st_size)
+        return firma(self.ruta_archivo, True), firma(self._ruta_journal, False)
+
+    def _recordar_firma(self) -> None:
+        if self._compartido:
+            self._firma_conocida = self._firma_disco()
+
+    def _sincronizar_con_disco(self) -> None:
+        """Si otro proceso cambió los archivos desde la última vez, los vuelve a leer:
+        - solo el journal creció: se aplican únicamente los registros nuevos;
+        - el CSV fue reemplazado (o el journal se rehízo): recarga completa.
+        Llamar con el candado del inventario tomado.
+        """
+        if not self._compartido:
+            return
+        firma = self._firma_disco()
+        if firma == self._firma_conocida:
+            return
+        with self._bloqueo(compartido=True):
+            firma = self._firma_disco()  # releer ya con el bloqueo
+            datos_previos, journal_previo = self._firma_conocida or (None, None)
+            datos, journal = firma
+            if datos == datos_previos and journal is None:
+                # Se borró el journal sin cambiar el CSV: el estado es el mismo
+                self._registros_journal = self._bytes_journal = self._lineas_journal = 0
+                self._journal_incompleto = False
+                self._aviso_journal = None
+            elif (datos == datos_previos and journal is not None and journal_previo is not None
+                  and journal[0] == journal_previo[0] and journal[1] >= self._bytes_journal):
+                self._reproducir_journal(desde=self._bytes_journal)
+                self.recargas_incrementales += 1
+            else:
+                self._productos.clear()
+                self._errores_carga = []
+                self._registros_journal = self._bytes_journal = self._lineas_journal = 0
+                self._journal_incompleto = False
+                self._aviso_journal = None
+                self._cargar_desde_archivo()
+                self.recargas += 1
+            self._firma_conocida = firma
+
+    def _verificar_cambios(self) -> None:
+        """Chequeo barato antes de cada lectura en modo compartido."""
+        if self._compartido and self._firma_disco() != self._firma_conocida:
+            with self._lock:
+                self._sincronizar_con_disco()
+
+    @contextmanager
+    def _seccion_escritura(self) -> Iterator[None]:
+        """Candado del inventario y, en modo compartido, bloqueo exclusivo del archivo
+        más sincronización previa: así ninguna escritura pisa cambios de otro proceso.
+        """
+        with self._lock:
+            with self._bloqueo():
+                self._sincronizar_con_disco()
+                yield
 
     # ---------------------
     # Utilidades de archivo
@@ -102,7 +828,59 @@ class Inventario:
         """Lee el archivo y reconstruye el inventario en memoria.
         - Si el archivo no existe, intenta crearlo (ya manejado en _asegurar_archivo).
         - Si hay filas corruptas, las salta y acumula mensajes en _errores_carga.
+        - Si hay una instantánea binaria vigente, se usa en lugar del CSV.
+        - Después reproduce el journal (si existe) encima de lo cargado.
+        """
+        with self._fase("cargar.binario"):
+            cargado = self._cargar_binario()
+        if cargado:
+            self._origen_carga = "binario"
+        else:
+            with self._fase("cargar.csv"):
+                self._cargar_csv()
+        with self._fase("cargar.journal"):
+            self._reproducir_journal()
+
+    def _cargar_binario(self) -> bool:
+        """Carga la instantánea binaria si existe, su checksum es correcto y corresponde
+        exactamente al CSV actual (mismo mtime y tamaño). Devuelve False en otro caso.
         """
+        if not self._snapshot_binario:
+            return False
+        cab = self.CABECERA_BINARIO
+        try:
+            with open(self._ruta_binario, "rb") as f:
+                datos = f.read()
+            st = os.stat(self.ruta_archivo)
+        except OSError:
+            return False
+        if len(datos) < cab.size:
+            return False
+        magia, version, n, mtime_ns, tamano, crc = cab.unpack_from(datos)
+        if (magia != self.MAGIA_BINARIO or version != self.VERSION_BINARIO
+                or (mtime_ns, tamano) != (st.st_mtime_ns, st.st_size)):
+            return False
+        cuerpo = memoryview(datos)[cab.size:]
+        if zlib.crc32(cuerpo) != crc or len(cuerpo) < 16 * n:
+            return False
+        cantidades, precios = array("q"), array("d")
+        cantidades.frombytes(cuerpo[:8 * n])
+        precios.frombytes(cuerpo[8 * n:16 * n])
+        if sys.byteorder != "little":
+            cantidades.byteswap()
+            precios.byteswap()
+        try:
+            cadenas = str(cuerpo[16 * n:], "utf-8").split("\0") if n else []
+        except UnicodeDecodeError:
+            return False
+        if len(cadenas) != 2 * n:
+            return False
+        ids = cadenas[0::2]
+        self._fusionar_columnas(ids, cadenas[1::2], cantidades, precios)
+        return True
+
+    def _cargar_csv(self) -> None:
+        """Carga la instantánea completa (`inventario.txt`) en memoria."""
         try:
             with open(self.ruta_archivo, mode="r", encoding="utf-8", newline="") as f:
                 reader = csv.DictReader(f)
@@ -116,19 +894,16 @@ class Inventario:
                         f"Cabecera inválida; faltan: {', '.join(faltan_campos)}. Se ignorará el contenido."
                     )
                     return
-                for i, row in enumerate(reader, start=2):  # start=2 por la cabecera en línea 1
+                if self._cargar_csv_paralelo(reader.fieldnames):
+                    return
+                for row in reader:
                     try:
-                        idp = (row.get("id") or "").strip()
-                        nombre = (row.get("nombre") or "").strip()
-                        cantidad_str = (row.get("cantidad") or "0").strip()
-                        precio_str = (row.get("precio") or "0").strip()
-                        if not idp:
-                            raise ValueError("ID vacío")
-                        cantidad = int(cantidad_str)
-                        precio = float(precio_str)
+                        idp, nombre, cantidad, precio = _convertir_campos(
+                            row.get("id"), row.get("nombre"), row.get("cantidad"), row.get("precio"))
                         self._productos[idp] = Producto(id=idp, nombre=nombre, cantidad=cantidad, precio=precio)
                     except Exception as e:  # captura parseos erróneos
-                        self._errores_carga.append(f"Línea {i}: {e}. Fila ignorada.")
+                        # line_num es la línea física (cuenta la cabecera y las líneas vacías)
+                        self._errores_carga.append(f"Línea {reader.line_num}: {e}. Fila ignorada.")
         except FileNotFoundError:
             # Ya lo gestiona _asegurar_archivo; aquí lo informamos por consola.
             print("[INFO] inventario.txt no existía; se creará uno nuevo.")
@@ -139,6 +914,246 @@ class Inventario:
         except OSError as e:
             print(f"[ERROR] No se pudo leer el archivo de inventario: {e}. Se inicializa inventario vacío.")
 
+    def _bloques_alineados(self, inicio: int, tamano: int, partes: int) -> List[Tuple[int, int]]:
+        """Divide [inicio, tamano) en `partes` rangos de bytes que empiezan en inicio de línea."""
+        cortes = [inicio]
+        with open(self.ruta_archivo, "rb") as f:
+            for k in range(1, partes):
+                objetivo = max(inicio + (tamano - inicio) * k // partes, cortes[-1])
+                f.seek(objetivo)
+                f.readline()  # avanzar hasta el final de la línea en curso
+                corte = min(f.tell(), tamano)
+                if corte > cortes[-1]:
+                    cortes.append(corte)
+        cortes.append(tamano)
+        return [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+
+    def _cargar_csv_paralelo(self, cabecera: List[str]) -> bool:
+        """Carga el CSV en paralelo si el archivo es grande. Devuelve False si no se usó
+        (archivo pequeño, un solo proceso, campos multilínea o error del pool), en cuyo caso
+        el llamador sigue con la carga secuencial; no deja cambios parciales.
+        """
+        try:
+            tamano = os.path.getsize(self.ruta_archivo)
+        except OSError:
+            return False
+        if self._procesos_carga < 2 or tamano < self._umbral_carga_paralela:
+            return False
+        columnas = {nombre: i for i, nombre in enumerate(cabecera)}  # como DictReader: gana la última
+        posiciones = tuple(columnas[c] for c in self.CAMPOS)
+        with open(self.ruta_archivo, "rb") as f:
+            f.readline()  # la cabecera es la línea 1
+            inicio = f.tell()
+        bloques = self._bloques_alineados(inicio, tamano, self._procesos_carga * 4)
+        try:
+            with ProcessPoolExecutor(max_workers=self._procesos_carga) as pool:
+                futuros = [pool.submit(_parsear_bloque, self.ruta_archivo, a, b, posiciones)
+                           for a, b in bloques]
+                resultados = [fut.result() for fut in futuros]
+        except Exception as e:
+            print(f"[INFO] Carga paralela no disponible ({e}); se usa la carga secuencial.")
+            return False
+        if any(multilinea for _, _, _, multilinea in resultados):
+            return False
+        # Fusionar en el orden del archivo: con IDs repetidos gana la última fila
+        lineas_previas = 1
+        for (ids, nombres, cantidades, precios), errores, lineas, _ in resultados:
+            self._fusionar_columnas(ids, nombres, cantidades, precios)
+            for linea, msg in errores:
+                self._errores_carga.append(f"Línea {lineas_previas + linea}: {msg}. Fila ignorada.")
+            lineas_previas += lineas
+        return True
+
+    def _fusionar_columnas(self, ids: List[str], nombres: List[str],
+                           cantidades: Iterable[int], precios: Iterable[float]) -> None:
+        """Agrega productos dados por columnas; con IDs repetidos gana el último."""
+        if isinstance(self._productos, AlmacenColumnar):
+            self._productos.fusionar_columnas(ids, nombres, cantidades, precios)
+        else:
+            self._productos.update(zip(ids, map(Producto, ids, nombres, cantidades, precios)))
+
+    def _instantanea_productos(self) -> Iterable[Producto]:
+        """Copia consistente de los productos para guardarlos (llamar con el candado)."""
+        if isinstance(self._productos, AlmacenColumnar):
+            return self._productos.instantanea()
+        # Solo se copian referencias: las actualizaciones reemplazan el objeto
+        # Producto en vez de modificarlo, así que la copia es consistente.
+        return list(self._productos.values())
+
+    def _reproducir_journal(self, desde: int = 0) -> None:
+        """Aplica en orden los registros del journal (a partir del byte `desde`) sobre el
+        inventario en memoria. Los registros inválidos se ignoran y se informan en
+        _errores_carga. Una última línea sin fin de línea (un corte, o otro proceso que
+        todavía está anexando) no se consume: _bytes_journal queda al principio de ella
+        para volver a leerla completa en la próxima recarga incremental.
+        """
+        if not os.path.exists(self._ruta_journal):
+            return
+        try:
+            with open(self._ruta_journal, mode="rb") as f:
+                f.seek(desde)
+                datos = f.read()
+        except PermissionError:
+            print("[ERROR] No hay permisos para leer el journal del inventario. Se ignora.")
+            return
+        except OSError as e:
+            print(f"[ERROR] No se pudo leer el journal del inventario: {e}.")
+            return
+        fin = datos.rfind(b"\n") + 1
+        reader = csv.reader(io.StringIO(datos[:fin].decode("utf-8", errors="replace"), newline=""))
+        for registro in reader:
+            try:
+                self._aplicar_registro(registro)
+                self._registros_journal += 1
+            except Exception as e:
+                self._errores_carga.append(
+                    f"Journal línea {self._lineas_journal + reader.line_num}: {e}. Registro ignorado.")
+        self._lineas_journal += reader.line_num
+        self._bytes_journal = desde + fin
+        self._journal_incompleto = fin < len(datos)
+        self._aviso_journal = (
+            f"Journal línea {self._lineas_journal + 1}: registro incompleto (sin fin de línea). Registro ignorado."
+            if self._journal_incompleto else None)
+
+    def _aplicar_registro(self, registro: List[str]) -> None:
+        """Aplica un registro del journal (PUT o DEL) al diccionario en memoria."""
+        op = registro[0] if registro else ""
+        if op == "PUT" and len(registro) == 5:
+            idp, nombre, cantidad_str, precio_str = registro[1:]
+            if not idp:
+                raise ValueError("ID vacío")
+            self._productos[idp] = Producto(id=idp, nombre=nombre, cantidad=int(cantidad_str),
+                                            precio=float(precio_str))
+        elif op == "DEL" and len(registro) == 2:
+            self._productos.pop(registro[1], None)
+        else:
+            raise ValueError(f"registro con formato inválido ({','.join(registro)})")
+
+    @staticmethod
+    def _registro_put(p: Producto) -> List[str]:
+        fila = p.to_row()
+        return ["PUT", fila["id"], fila["nombre"], fila["cantidad"], fila["precio"]]
+
+    @staticmethod
+    def _registro_del(id_producto: str) -> List[str]:
+        return ["DEL", id_producto]
+
+    def _anexar_journal(self, registros: List[List[str]]) -> bool:
+        """Anexa registros al journal y fuerza su escritura a disco (flush + fsync).
+        Devuelve True si se guardaron correctamente, False en caso de error.
+
+        En modo asíncrono corre en el hilo escritor sin el candado (para no bloquear las
+        mutaciones durante el fsync); los contadores del journal, que también leen
+        _sincronizar_con_disco y la decisión de compactar, se leen y actualizan con él.
+        """
+        if self._solo_lectura:
+            print("[ADVERTENCIA] El sistema está en modo solo-lectura; no se puede guardar en archivo.")
+            return False
+        try:
+            with self._lock:
+                cerrar_linea = self._journal_incompleto
+            with open(self._ruta_journal, mode="a", encoding="utf-8", newline="") as f:
+                if cerrar_linea:
+                    f.write("\r\n")  # cerrar la línea truncada para no corromper el registro nuevo
+                csv.writer(f).writerows(registros)
+                f.flush()
+                with self._fase("journal.fsync"):
+                    os.fsync(f.fileno())
+                tamano = f.tell()
+            with self._lock:
+                if cerrar_linea:
+                    # La línea truncada queda cerrada y descartada para siempre
+                    self._journal_incompleto = False
+                    self._lineas_journal += 1
+                    if self._aviso_journal:
+                        self._errores_carga.append(self._aviso_journal)
+                        self._aviso_journal = None
+                self._bytes_journal = tamano
+                self._lineas_journal += len(registros)
+                self._registros_journal += len(registros)
+                self._recordar_firma()
+            return True
+        except PermissionError:
+            print("[ERROR] Permiso denegado al escribir el journal del inventario. Cambiando a modo solo-lectura.")
+            self._solo_lectura = True
+            return False
+        except OSError as e:
+            print(f"[ERROR] No se pudo escribir el journal del inventario: {e}")
+            return False
+
+    def _descartar_journal(self) -> None:
+        """Elimina el journal una vez que su contenido ya está en la instantánea."""
+        try:
+            if os.path.exists(self._ruta_journal):
+                os.remove(self._ruta_journal)
+        except OSError as e:
+            # No es grave: al reproducirlo de nuevo se obtiene el mismo estado.
+            print(f"[ADVERTENCIA] No se pudo eliminar el journal ya compactado: {e}")
+            return
+        self._registros_journal = 0
+        self._bytes_journal = 0
+        self._lineas_journal = 0
+        self._journal_incompleto = False
+        self._aviso_journal = None
+
+    def _journal_excede_umbral(self) -> bool:
+        return (self._registros_journal >= self._max_registros_journal
+                or self._bytes_journal >= self._max_bytes_journal)
+
+    def _persistir(self, registros: List[List[str]]) -> bool:
+        """Hace durable un cambio: anexa al journal (modo journal) o reescribe el archivo.
+        Dentro de una transacción solo acumula los registros hasta la confirmación.
+        """
+        if self._tx_nivel:
+            self._tx_registros.extend(registros)
+            return True
+        if self._escritor is not None:
+            self._escritor.encolar(registros)
+            return True
+        return self._escribir_registros(registros)
+
+    def _escribir_registros(self, registros: List[List[str]]) -> bool:
+        if not self._modo_journal:
+            return self._guardar_atomico()
+        if not self._anexar_journal(registros):
+            return False
+        with self._lock:
+            excede = self._journal_excede_umbral()
+        if excede:
+            # El cambio ya es durable en el journal; un fallo al compactar solo se informa.
+            self._guardar_atomico()
+        return True
+
+    def compactar_journal(self) -> bool:
+        """Vuelca el inventario completo a `inventario.txt` y vacía el journal."""
+        if self._escritor is not None:
+            return self._escritor.flush(compactar=True)
+        with self._seccion_escritura():
+            return self._guardar_atomico()
+
+    def flush(self) -> bool:
+        """En modo asíncrono, escribe ya los cambios pendientes y espera a que sean durables."""
+        if self._escritor is None:
+            return True  # en modo síncrono cada operación ya está en disco
+        return self._escritor.flush()
+
+    def close(self) -> bool:
+        """Escribe los cambios pendientes y detiene el hilo escritor (si lo hay).
+        Devuelve False si quedaron cambios sin guardar (p. ej. el journal no se puede
+        escribir). Después de cerrar, el inventario sigue funcionando en modo síncrono.
+        """
+        if self._fd_bloqueo is not None:
+            os.close(self._fd_bloqueo)
+            self._fd_bloqueo = None
+        if self._escritor is None:
+            return True
+        escritor, self._escritor = self._escritor, None
+        return escritor.detener()
+
+    def metricas_persistencia(self) -> Dict[str, int]:
+        """Métricas del escritor asíncrono (vacío en modo síncrono)."""
+        return self._escritor.metricas() if self._escritor is not None else {}
+
     def _reescribir_cabecera_por_si_acaso(self) -> None:
         """Si el archivo está vacío o sin cabecera, escribe cabecera sin perder datos (no hay datos)."""
         try:
@@ -160,15 +1175,26 @@ class Inventario:
         if self._solo_lectura:
             print("[ADVERTENCIA] El sistema está en modo solo-lectura; no se puede guardar en archivo.")
             return False
+        with self._lock, self._fase("guardar_atomico.instantanea"):
+            productos = self._instantanea_productos()
         try:
             carpeta = os.path.dirname(self.ruta_archivo) or "."
-            with tempfile.NamedTemporaryFile("w", delete=False, dir=carpeta, encoding="utf-8", newline="") as tmp:
-                tmp_ruta = tmp.name
-                writer = csv.DictWriter(tmp, fieldnames=self.CAMPOS)
-                writer.writeheader()
-                for p in self._productos.values():
-                    writer.writerow(p.to_row())
-            os.replace(tmp_ruta, self.ruta_archivo)  # atómico en la mayoría de SO
+            with self._fase("guardar_atomico.temporal"):
+                with tempfile.NamedTemporaryFile("w", delete=False, dir=carpeta, encoding="utf-8",
+                                                 newline="") as tmp:
+                    tmp_ruta = tmp.name
+                    writer = csv.DictWriter(tmp, fieldnames=self.CAMPOS)
+                    writer.writeheader()
+                    for p in productos:
+                        writer.writerow(p.to_row())
+            with self._fase("guardar_atomico.os_replace"):
+                os.replace(tmp_ruta, self.ruta_archivo)  # atómico en la mayoría de SO
+            # La instantánea ya contiene todo lo registrado en el journal.
+            self._descartar_journal()
+            if self._snapshot_binario:
+                with self._fase("guardar_atomico.binario"):
+                    self._guardar_binario(productos)
+            self._recordar_firma()
             return True
         except PermissionError:
             print("[ERROR] Permiso denegado al escribir el archivo de inventario. Cambiando a modo solo-lectura.")
@@ -178,62 +1204,553 @@ class Inventario:
             print(f"[ERROR] No se pudo escribir el archivo de inventario: {e}")
             return False
 
+    def _guardar_binario(self, productos: Iterable[Producto]) -> None:
+        """Escribe la instantánea binaria del CSV recién guardado (escritura atómica).
+        Es solo una optimización de arranque: si falla o los datos no son representables
+        (cantidad fuera de int64, texto con el carácter NUL), se elimina y se seguirá usando el CSV.
+        """
+        try:
+            cantidades = array("q", [p.cantidad for p in productos])
+            # El CSV guarda el precio con 2 decimales; se guarda igual para cargar lo mismo
+            precios = array("d", [round(p.precio, 2) for p in productos])
+            tabla = "\0".join(chain.from_iterable((p.id, p.nombre) for p in productos))
+        except (OverflowError, TypeError):
+            self._descartar_binario()
+            return
+        if len(cantidades) and tabla.count("\0") != 2 * len(cantidades) - 1:
+            self._descartar_binario()
+            return
+        if sys.byteorder != "little":
+            cantidades.byteswap()
+            precios.byteswap()
+        partes = (cantidades.tobytes(), precios.tobytes(), tabla.encode("utf-8"))
+        crc = 0
+        for parte in partes:
+            crc = zlib.crc32(parte, crc)
+        try:
+            st = os.stat(self.ruta_archivo)
+            cabecera = self.CABECERA_BINARIO.pack(self.MAGIA_BINARIO, self.VERSION_BINARIO, len(cantidades),
+                                                  st.st_mtime_ns, st.st_size, crc)
+            carpeta = os.path.dirname(self._ruta_binario) or "."
+            with tempfile.NamedTemporaryFile("wb", delete=False, dir=carpeta) as tmp:
+                tmp_ruta = tmp.name
+                tmp.write(cabecera)
+                for parte in partes:
+                    tmp.write(parte)
+            os.replace(tmp_ruta, self._ruta_binario)
+        except OSError as e:
+            print(f"[ADVERTENCIA] No se pudo escribir la instantánea binaria: {e}")
+            self._descartar_binario()
+
+    def _descartar_binario(self) -> None:
+        try:
+            if os.path.exists(self._ruta_binario):
+                os.remove(self._ruta_binario)
+        except OSError:
+            pass  # quedará obsoleta: su mtime ya no coincide con el CSV
+
+    # ---------------------
+    # Transacciones
+    # ---------------------
+    @contextmanager
+    def transaccion(self) -> Iterator[ResultadoTransaccion]:
+        """Agrupa varias operaciones: se aplican en memoria y se guardan una sola vez al final.
+
+        Si el bloque lanza una excepción, todos los cambios se revierten y la excepción
+        se propaga. Las transacciones anidadas se guardan junto con la externa; si una
+        anidada lanza una excepción, se revierte solo lo que se hizo dentro de ella
+        (punto de guardado) y la externa sigue, si atrapa la excepción.
+
+            with inv.transaccion() as tx:
+                inv.agregar(...)
+                inv.actualizar(...)
+            print(tx.guardada)
+
+        En modo compartido el archivo queda bloqueado durante toda la transacción.
+        """
+        with self._seccion_escritura():
+            if self._tx_nivel:
+                self._tx_nivel += 1
+                punto_deshacer, punto_registros = len(self._tx_deshacer), len(self._tx_registros)
+                try:
+                    yield self._tx_resultado
+                except BaseException:
+                    self._deshacer_transaccion(desde=punto_deshacer)
+                    del self._tx_registros[punto_registros:]
+                    raise
+                finally:
+                    self._tx_nivel -= 1
+                return
+            resultado = ResultadoTransaccion()
+            self._tx_nivel = 1
+            self._tx_registros, self._tx_deshacer, self._tx_resultado = [], [], resultado
+            try:
+                yield resultado
+            except BaseException:
+                self._tx_nivel = 0
+                self._deshacer_transaccion()
+                raise
+            else:
+                self._tx_nivel = 0
+                registros = self._tx_registros
+                resultado.confirmada = True
+                resultado.operaciones = len(registros)
+                resultado.guardada = self._persistir(registros) if registros else True
+            finally:
+                self._tx_nivel = 0
+                self._tx_registros, self._tx_deshacer, self._tx_resultado = [], [], None
+
+    def _guardar_para_deshacer(self, id_producto: str, previo: Optional[Producto]) -> None:
+        """Anota el estado anterior de un producto (None = no existía) si hay transacción."""
+        if self._tx_nivel:
+            self._tx_deshacer.append((id_producto, previo))
+
+    def _deshacer_transaccion(self, desde: int = 0) -> None:
+        """Revierte los cambios anotados a partir de la posición `desde` (0 = todos)."""
+        for id_producto, previo in reversed(self._tx_deshacer[desde:]):
+            if previo is None:
+                self._productos.pop(id_producto, None)
+            else:
+                self._productos[id_producto] = previo
+        del self._tx_deshacer[desde:]
+
+    def aplicar_lote(self, ops: Iterable[Tuple[Any, ...]]) -> Tuple[bool, List[Tuple[bool, str]]]:
+        """Aplica un lote de operaciones con semántica todo-o-nada y una sola escritura.
+
+        Cada operación es una tupla:
+            ("agregar", Producto)
+            ("actualizar", id, {"nombre": ..., "cantidad": ..., "precio": ...})
+            ("eliminar", id)
+        Devuelve (éxito_global, resultados) con un (bool, str) por operación. Si alguna
+        falla, el lote completo se revierte y ninguna operación queda aplicada.
+        Dentro de otra transacción, el lote se guarda cuando ella se confirme (y si
+        falla, se revierte solo el lote).
+        """
+        ops = list(ops)
+        resultados: List[Tuple[bool, str]] = []
+        try:
+            with self.transaccion() as tx:
+                anidado = self._tx_nivel > 1
+                for op in ops:
+                    ok, msg = self._aplicar_operacion(op)
+                    resultados.append((ok, msg))
+                    if not ok:
+                        raise _LoteRevertido()
+        except _LoteRevertido:
+            fallo = len(resultados)
+            error = resultados[-1][1]
+            revertidos = [(False, f"Revertida: falló la operación {fallo} ({error})")] * (fallo - 1)
+            no_ejecutados = [(False, "No ejecutada: el lote se revirtió.")] * (len(ops) - fallo)
+            return False, revertidos + [resultados[-1]] + no_ejecutados
+        return (True if anidado else tx.guardada), resultados
+
+    def _aplicar_operacion(self, op: Tuple[Any, ...]) -> Tuple[bool, str]:
+        nombre_op = op[0] if op else None
+        try:
+            if nombre_op == "agregar":
+                return self.agregar(op[1])
+            if nombre_op == "actualizar":
+                campos = op[2] if len(op) > 2 else {}
+                return self.actualizar(op[1], **campos)
+            if nombre_op == "eliminar":
+                return self.eliminar(op[1])
+        except (IndexError, TypeError) as e:
+            return False, f"Operación mal formada {op!r}: {e}"
+        return False, f"Operación desconocida: {nombre_op!r}."
+
     # ---------------------
     # Operaciones de negocio
     # ---------------------
     def agregar(self, producto: Producto) -> Tuple[bool, str]:
-        if producto.id in self._productos:
-            return False, f"Ya existe un producto con ID '{producto.id}'."
-        self._productos[producto.id] = producto
-        if self._guardar_atomico():
-            return True, f"Producto '{producto.nombre}' agregado y guardado en archivo."
-        else:
-            return False, "Producto agregado en memoria, pero falló la escritura en archivo."
+        with self._seccion_escritura():
+            if producto.id in self._productos:
+                return False, f"Ya existe un producto con ID '{producto.id}'."
+            error = _error_numeros(producto.cantidad, producto.precio)
+            if error is not None:
+                return False, error
+            try:
+                self._productos[producto.id] = producto
+            except (ValueError, TypeError) as e:  # límites propios del almacén (p. ej. 64 bits)
+                return False, str(e)
+            self._guardar_para_deshacer(producto.id, None)
+            if self._persistir([self._registro_put(producto)]):
+                if self._tx_nivel:
+                    return True, f"Producto '{producto.nombre}' agregado (pendiente de confirmar la transacción)."
+                if self._escritor is not None:
+                    return True, f"Producto '{producto.nombre}' agregado (pendiente de escritura en archivo)."
+                return True, f"Producto '{producto.nombre}' agregado y guardado en archivo."
+            else:
+                return False, "Producto agregado en memoria, pero falló la escritura en archivo."
 
     def actualizar(self, id_producto: str, *, nombre: Optional[str] = None,
                    cantidad: Optional[int] = None, precio: Optional[float] = None) -> Tuple[bool, str]:
-        p = self._productos.get(id_producto)
-        if not p:
-            return False, f"No existe producto con ID '{id_producto}'."
-        if nombre is not None:
-            p.nombre = nombre
-        if cantidad is not None:
-            if cantidad < 0:
+        with self._seccion_escritura():
+            p = self._productos.get(id_producto)
+            if not p:
+                return False, f"No existe producto con ID '{id_producto}'."
+            # Validar todo antes de modificar, para no dejar cambios a medias
+            error = _error_numeros(p.cantidad if cantidad is None else cantidad,
+                                   p.precio if precio is None else precio)
+            if error is not None:
+                return False, error
+            if cantidad is not None and cantidad < 0:
                 return False, "La cantidad no puede ser negativa."
-            p.cantidad = cantidad
-        if precio is not None:
-            if precio < 0:
+            if precio is not None and precio < 0:
                 return False, "El precio no puede ser negativo."
-            p.precio = precio
-        if self._guardar_atomico():
-            return True, f"Producto '{id_producto}' actualizado y guardado en archivo."
-        else:
-            return False, "Producto actualizado en memoria, pero falló la escritura en archivo."
+            # Se reemplaza el objeto (no se modifica): el escritor en segundo plano nunca
+            # ve un producto a medio actualizar.
+            nuevo = replace(p,
+                            nombre=p.nombre if nombre is None else nombre,
+                            cantidad=p.cantidad if cantidad is None else cantidad,
+                            precio=p.precio if precio is None else precio)
+            try:
+                self._productos[id_producto] = nuevo
+            except (ValueError, TypeError) as e:
+                return False, str(e)
+            self._guardar_para_deshacer(id_producto, p)
+            if self._persistir([self._registro_put(nuevo)]):
+                if self._tx_nivel:
+                    return True, f"Producto '{id_producto}' actualizado (pendiente de confirmar la transacción)."
+                if self._escritor is not None:
+                    return True, f"Producto '{id_producto}' actualizado (pendiente de escritura en archivo)."
+                return True, f"Producto '{id_producto}' actualizado y guardado en archivo."
+            else:
+                return False, "Producto actualizado en memoria, pero falló la escritura en archivo."
 
     def eliminar(self, id_producto: str) -> Tuple[bool, str]:
-        if id_producto not in self._productos:
-            return False, f"No existe producto con ID '{id_producto}'."
-        eliminado = self._productos.pop(id_producto)
-        if self._guardar_atomico():
-            return True, f"Producto '{eliminado.nombre}' eliminado y cambios guardados en archivo."
-        else:
-            return False, "Producto eliminado en memoria, pero falló la escritura en archivo."
+        with self._seccion_escritura():
+            if id_producto not in self._productos:
+                return False, f"No existe producto con ID '{id_producto}'."
+            eliminado = self._productos.pop(id_producto)
+            self._guardar_para_deshacer(id_producto, eliminado)
+            if self._persistir([self._registro_del(id_producto)]):
+                if self._tx_nivel:
+                    return True, f"Producto '{eliminado.nombre}' eliminado (pendiente de confirmar la transacción)."
+                if self._escritor is not None:
+                    return True, f"Producto '{eliminado.nombre}' eliminado (pendiente de escritura en archivo)."
+                return True, f"Producto '{eliminado.nombre}' eliminado y cambios guardados en archivo."
+            else:
+                return False, "Producto eliminado en memoria, pero falló la escritura en archivo."
 
     def obtener(self, id_producto: str) -> Optional[Producto]:
+        self._verificar_cambios()
         return self._productos.get(id_producto)
 
     def listar(self) -> List[Producto]:
+        self._verificar_cambios()
         return list(self._productos.values())
 
+    def iterar(self) -> Iterator[Producto]:
+        """Recorre los productos sin copiarlos a una lista (para listados grandes).
+        El inventario no debe modificarse mientras se recorre."""
+        self._verificar_cambios()
+        return iter(self._productos.values())
+
     # ---------------------
     # Info de estado
     # ---------------------
     def errores_carga(self) -> List[str]:
+        if self._aviso_journal:
+            return self._errores_carga + [self._aviso_journal]
         return list(self._errores_carga)
 
     def es_solo_lectura(self) -> bool:
         return self._solo_lectura
 
+    def es_modo_journal(self) -> bool:
+        return self._modo_journal
+
+    def registros_journal(self) -> int:
+        """Cantidad de registros en el journal pendientes de compactar."""
+        return self._registros_journal
+
+    def origen_carga(self) -> str:
+        """'binario' si el arranque usó la instantánea binaria, 'csv' en otro caso."""
+        return self._origen_carga
+
+
+# ------------------------------------------
+# Consulta de solo lectura con índice en disco
+# ------------------------------------------
+class InventarioIndexado:
+    """Consulta por ID de solo lectura, pensada para procesos de kiosco.
+
+    En vez de cargar todos los productos mantiene un índice `inventario.txt.idx`
+    ordenado (id -> desplazamiento en bytes de su fila en el CSV) y lo mapea en memoria.
+    `obtener()` hace búsqueda binaria en el índice y solo lee y convierte esa fila.
+    - El índice se reconstruye solo si el CSV cambió (mtime/tamaño distintos).
+    - Los cambios aún no compactados del journal se aplican encima (es pequeño).
+    - Si no se puede escribir el .idx (carpeta sin permisos), el índice vive en memoria.
+
+    Formato del índice (little-endian):
+        cabecera: magia b"INVI", versión (H), n (Q), mtime_ns del CSV (q), tamaño del CSV (q)
+        n entradas ordenadas por id: desplazamiento del id (Q), longitud del id (I),
+                                     desplazamiento de la fila en el CSV (Q)
+        ids en UTF-8, uno tras otro
+    """
+
+    SUFIJO_INDICE = ".idx"
+    MAGIA_INDICE = b"INVI"
+    VERSION_INDICE = 1
+    CABECERA_INDICE = struct.Struct("<4sHQqq")
+    ENTRADA_INDICE = struct.Struct("<QIQ")
+
+    def __init__(self, ruta_archivo: str = "inventario.txt") -> None:
+        self.ruta_archivo = ruta_archivo
+        self._ruta_indice = ruta_archivo + self.SUFIJO_INDICE
+        self._ruta_journal = ruta_archivo + Inventario.SUFIJO_JOURNAL
+        self._errores_carga: List[str] = []
+        self._datos: Optional[io.BufferedReader] = None
+        self._indice: Any = b""  # mmap del .idx, o bytes si no se pudo escribir
+        self._n = 0
+        self._firma_datos: Optional[Tuple[int, int]] = None
+        self._posiciones: Tuple[int, int, int, int] = (0, 1, 2, 3)
+        self._firma_journal: Optional[Tuple[int, int]] = None
+        self._journal: Dict[str, Optional[Producto]] = {}  # None = eliminado en el journal
+        self._errores_journal: List[str] = []  # se rehace en cada lectura del journal
+        self._sincronizar()
+
+    def __enter__(self) -> "InventarioIndexado":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._indice, mmap.mmap):
+            self._indice.close()
+        self._indice = b""
+        if self._datos is not None:
+            self._datos.close()
+            self._datos = None
+
+    # ---------------------
+    # Sincronización con el archivo
+    # ---------------------
+    @staticmethod
+    def _firma(ruta: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _sincronizar(self) -> None:
+        """Comprueba (con un stat) si el CSV o el journal cambiaron y, si es así, actualiza."""
+        firma = self._firma(self.ruta_archivo)
+        if firma != self._firma_datos:
+            self.close()
+            self._errores_carga = []
+            self._firma_datos = firma
+            if firma is not None:
+                try:
+                    self._datos = open(self.ruta_archivo, "rb")
+                    self._leer_cabecera_csv()
+                    if not self._abrir_indice(firma):
+                        self._reconstruir_indice(firma)
+                except OSError as e:
+                    self._errores_carga.append(f"No se pudo leer el inventario: {e}")
+                    self.close()
+        firma_journal = self._firma(self._ruta_journal)
+        if firma_journal != self._firma_journal:
+            self._firma_journal = firma_journal
+            self._leer_journal()
+
+    def _leer_cabecera_csv(self) -> None:
+        self._datos.seek(0)
+        cabecera = next(csv.reader([self._datos.readline().decode("utf-8")]), [])
+        columnas = {nombre: i for i, nombre in enumerate(cabecera)}
+        faltan = [c for c in Inventario.CAMPOS if c not in columnas]
+        if faltan:
+            raise OSError(f"cabecera inválida; faltan: {', '.join(faltan)}")
+        self._posiciones = tuple(columnas[c] for c in Inventario.CAMPOS)
+
+    def _abrir_indice(self, firma: Tuple[int, int]) -> bool:
+        """Mapea el .idx existente si corresponde al CSV actual."""
+        cab = self.CABECERA_INDICE
+        try:
+            with open(self._ruta_indice, "rb") as f:
+                indice = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: archivo vacío
+            return False
+        if len(indice) >= cab.size:
+            magia, version, n, mtime_ns, tamano = cab.unpack_from(indice)
+            if (magia, version, (mtime_ns, tamano)) == (self.MAGIA_INDICE, self.VERSION_INDICE, firma):
+                self._indice, self._n = indice, n
+                return True
+        indice.close()
+        return False
+
+    def _filas_con_desplazamiento(self) -> Iterator[Tuple[int, List[str]]]:
+        """Recorre el CSV (sin cabecera) devolviendo (desplazamiento de la fila, campos).
+        Soporta campos entre comillas que ocupan varias líneas.
+        """
+        self._datos.seek(0)
+        desplazamiento = len(self._datos.readline())
+        inicios: deque = deque()  # (número de línea, desplazamiento) de líneas aún no consumidas
+
+        def lineas() -> Iterator[str]:
+            nonlocal desplazamiento
+            numero = 0
+            for linea in self._datos:
+                inicios.append((numero, desplazamiento))
+                desplazamiento += len(linea)
+                numero += 1
+                yield linea.decode("utf-8")
+
+        reader = csv.reader(lineas())
+        while True:
+            primera_linea = reader.line_num
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            while inicios[0][0] < primera_linea:
+                inicios.popleft()
+            if row:
+                yield inicios[0][1], row
+
+    def _reconstruir_indice(self, firma: Tuple[int, int]) -> None:
+        """Recorre el CSV una vez y escribe el índice ordenado (atómico). Con IDs repetidos
+        gana la última fila válida, igual que en Inventario.
+        """
+        i_id, i_nombre, i_cantidad, i_precio = self._posiciones
+        desplazamientos: Dict[bytes, int] = {}
+        for desplazamiento, row in self._filas_con_desplazamiento():
+            n = len(row)
+            try:
+                idp, _, _, _ = _convertir_campos(row[i_id] if i_id < n else None,
+                                                 row[i_nombre] if i_nombre < n else None,
+                                                 row[i_cantidad] if i_cantidad < n else None,
+                                                 row[i_precio] if i_precio < n else None)
+            except Exception:
+                continue  # fila inválida: Inventario también la ignora
+            desplazamientos[idp.encode("utf-8")] = desplazamiento
+        claves = sorted(desplazamientos)
+        cab, ent = self.CABECERA_INDICE, self.ENTRADA_INDICE
+        buf = bytearray(cab.pack(self.MAGIA_INDICE, self.VERSION_INDICE, len(claves), *firma))
+        pos_clave = cab.size + ent.size * len(claves)
+        for clave in claves:
+            buf += ent.pack(pos_clave, len(clave), desplazamientos[clave])
+            pos_clave += len(clave)
+        buf += b"".join(claves)
+        self._n = len(claves)
+        try:
+            carpeta = os.path.dirname(self._ruta_indice) or "."
+            with tempfile.NamedTemporaryFile("wb", delete=False, dir=carpeta) as tmp:
+                tmp_ruta = tmp.name
+                tmp.write(buf)
+            os.replace(tmp_ruta, self._ruta_indice)
+        except OSError:
+            self._indice = bytes(buf)  # sin permisos de escritura: índice solo en memoria
+            return
+        if not self._abrir_indice(firma):
+            self._indice = bytes(buf)
+
+    def _leer_journal(self) -> None:
+        """Lee los cambios del journal (aún no compactados) como una capa encima del CSV.
+
+        Igual que Inventario._reproducir_journal, solo se usan las líneas completas: si
+        un proceso está anexando, la última puede estar a medias y se leerá cuando cambie
+        la firma del journal. Los registros inválidos se ignoran y se informan.
+        """
+        self._journal = {}
+        self._errores_journal = []
+        if self._firma_journal is None:
+            return
+        try:
+            with open(self._ruta_journal, mode="rb") as f:
+                datos = f.read()
+        except OSError as e:
+            self._errores_journal.append(f"No se pudo leer el journal: {e}")
+            return
+        fin = datos.rfind(b"\n") + 1
+        reader = csv.reader(io.StringIO(datos[:fin].decode("utf-8", errors="replace"), newline=""))
+        for registro in reader:
+            try:
+                if len(registro) == 5 and registro[0] == "PUT" and registro[1]:
+                    self._journal[registro[1]] = Producto(registro[1], registro[2], int(registro[3]),
+                                                          float(registro[4]))
+                elif len(registro) == 2 and registro[0] == "DEL":
+                    self._journal[registro[1]] = None
+                else:
+                    raise ValueError(f"registro con formato inválido ({','.join(registro)})")
+            except ValueError as e:
+                self._errores_journal.append(f"Journal línea {reader.line_num}: {e}. Registro ignorado.")
+
+    # ---------------------
+    # Consultas
+    # ---------------------
+    def _buscar_desplazamiento(self, clave: bytes) -> Optional[int]:
+        """Búsqueda binaria del id en el índice; devuelve el desplazamiento de su fila."""
+        indice, ent, base = self._indice, self.ENTRADA_INDICE, self.CABECERA_INDICE.size
+        bajo, alto = 0, self._n
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            pos, largo, desplazamiento = ent.unpack_from(indice, base + medio * ent.size)
+            actual = indice[pos:pos + largo]
+            if actual < clave:
+                bajo = medio + 1
+            elif actual > clave:
+                alto = medio
+            else:
+                return desplazamiento
+        return None
+
+    def _leer_fila(self, desplazamiento: int) -> Optional[Producto]:
+        self._datos.seek(desplazamiento)
+        lineas = (linea.decode("utf-8") for linea in iter(self._datos.readline, b""))
+        row = next(csv.reader(lineas), [])
+        n = len(row)
+        i_id, i_nombre, i_cantidad, i_precio = self._posiciones
+        idp, nombre, cantidad, precio = _convertir_campos(row[i_id] if i_id < n else None,
+                                                          row[i_nombre] if i_nombre < n else None,
+                                                          row[i_cantidad] if i_cantidad < n else None,
+                                                          row[i_precio] if i_precio < n else None)
+        return Producto(id=idp, nombre=nombre, cantidad=cantidad, precio=precio)
+
+    def obtener(self, id_producto: str) -> Optional[Producto]:
+        self._sincronizar()
+        if id_producto in self._journal:
+            return self._journal[id_producto]
+        if self._datos is None:
+            return None
+        desplazamiento = self._buscar_desplazamiento(id_producto.encode("utf-8"))
+        if desplazamiento is None:
+            return None
+        return self._leer_fila(desplazamiento)
+
+    def listar(self) -> List[Producto]:
+        """Todos los productos ordenados por ID. Lee el archivo completo: úsese con moderación."""
+        self._sincronizar()
+        productos: Dict[str, Optional[Producto]] = {}
+        if self._datos is not None:
+            ent, base = self.ENTRADA_INDICE, self.CABECERA_INDICE.size
+            for i in range(self._n):
+                _, _, desplazamiento = ent.unpack_from(self._indice, base + i * ent.size)
+                p = self._leer_fila(desplazamiento)
+                productos[p.id] = p
+        productos.update(self._journal)
+        return sorted((p for p in productos.values() if p is not None), key=lambda p: p.id.encode("utf-8"))
+
+    # ---------------------
+    # Misma interfaz que Inventario (sin escritura)
+    # ---------------------
+    def agregar(self, producto: Producto) -> Tuple[bool, str]:
+        return False, "Inventario abierto en modo consulta (solo-lectura); no se puede agregar."
+
+    def actualizar(self, id_producto: str, **_cambios: Any) -> Tuple[bool, str]:
+        return False, "Inventario abierto en modo consulta (solo-lectura); no se puede actualizar."
+
+    def eliminar(self, id_producto: str) -> Tuple[bool, str]:
+        return False, "Inventario abierto en modo consulta (solo-lectura); no se puede eliminar."
+
+    def errores_carga(self) -> List[str]:
+        return self._errores_carga + self._errores_journal
+
+    def es_solo_lectura(self) -> bool:
+        return True
+
 
 # --------------------------------------
 # Interfaz de usuario (consola interact.)
@@ -277,6 +1794,18 @@ def imprimir_tabla(productos: List[Producto]) -> None:
         print(f"{p.id.ljust(ancho_id)}  {p.nombre.ljust(ancho_nombre)}  {str(p.cantidad).rjust(8)}  {p.precio:>7.2f}")
 
 
+def imprimir_latencias(metricas: Dict[str, Dict[str, float]]) -> None:
+    if not metricas:
+        print("(Sin mediciones todavía)")
+        return
+    ancho = max(10, max(len(nombre) for nombre in metricas))
+    print(f"{'Operación'.ljust(ancho)}  {'n':>7}  {'p50 ms':>9}  {'p95 ms':>9}  {'p99 ms':>9}  {'máx ms':>9}")
+    print("-" * (ancho + 53))
+    for nombre, m in metricas.items():
+        print(f"{nombre.ljust(ancho)}  {m['n']:>7}  {m['p50_ms']:>9.3f}  {m['p95_ms']:>9.3f}  "
+              f"{m['p99_ms']:>9.3f}  {m['max_ms']:>9.3f}")
+
+
 def menu() -> None:
     print("""
 ==============================
@@ -289,6 +1818,7 @@ def menu() -> None:
 [5] Buscar producto por ID
 [6] Ver estado del archivo
 [7] Ejecutar pruebas rápidas
+[8] Ver métricas de latencia
 [0] Salir
 """)
 
@@ -303,9 +1833,14 @@ def ejecutar_pruebas_rapidas() -> None:
     os.makedirs(carpeta, exist_ok=True)
     ruta_temp = os.path.join(carpeta, "inventario_pruebas.txt")
 
+    def borrar_archivos_prueba() -> None:
+        for ruta in (ruta_temp, ruta_temp + Inventario.SUFIJO_JOURNAL, ruta_temp + Inventario.SUFIJO_BINARIO,
+                     ruta_temp + InventarioIndexado.SUFIJO_INDICE, ruta_temp + Inventario.SUFIJO_BLOQUEO):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
     # 1) Archivo inexistente (se debe crear solo)
-    if os.path.exists(ruta_temp):
-        os.remove(ruta_temp)
+    borrar_archivos_prueba()
     inv = Inventario(ruta_temp)
     assert len(inv.listar()) == 0, "Debe iniciar vacío"
 
@@ -336,7 +1871,157 @@ def ejecutar_pruebas_rapidas() -> None:
     assert any("Línea" in e for e in errores), "Debe reportar líneas corruptas"
     assert inv2.obtener("X01") is not None
 
-    # 3) Simular permiso denegado (solo lectura) => en muchas plataformas no podemos
+    # 3) Modo journal: los cambios se anexan y se reproducen al reiniciar
+    borrar_archivos_prueba()
+    inv3 = Inventario(ruta_temp, modo_journal=True, max_registros_journal=3)
+    inv3.agregar(Producto("J001", "Regla", 4, 0.80))
+    inv3.actualizar("J001", cantidad=7)
+    assert inv3.registros_journal() == 2, "Cada cambio debe anexar un registro"
+    inv4 = Inventario(ruta_temp, modo_journal=True, max_registros_journal=3)
+    assert inv4.obtener("J001").cantidad == 7, "El journal debe reproducirse al cargar"
+    inv4.eliminar("J001")  # tercer registro => compactación
+    print("- Journal compactado; registros pendientes:", inv4.registros_journal())
+    assert inv4.registros_journal() == 0
+    assert Inventario(ruta_temp).obtener("J001") is None
+
+    # 4) Lote transaccional: todo o nada
+    ok, resultados = inv4.aplicar_lote([
+        ("agregar", Producto("L001", "Borrador", 3, 0.40)),
+        ("actualizar", "L001", {"cantidad": -1}),  # inválida => se revierte todo
+    ])
+    print("- Lote con error:", resultados[-1][1])
+    assert not ok and inv4.obtener("L001") is None, "El lote fallido no debe dejar cambios"
+    ok, _ = inv4.aplicar_lote([
+        ("agregar", Producto("L001", "Borrador", 3, 0.40)),
+        ("actualizar", "L001", {"cantidad": 9}),
+    ])
+    assert ok and Inventario(ruta_temp).obtener("L001").cantidad == 9
+    # Lote dentro de otra transacción: si falla, se revierte el lote y no lo de afuera
+    with inv4.transaccion() as tx_externa:
+        inv4.actualizar("L001", cantidad=10)
+        ok, resultados = inv4.aplicar_lote([
+            ("agregar", Producto("L002", "Sacapuntas", 1, 0.30)),
+            ("actualizar", "L001", {"cantidad": 11}),
+            ("eliminar", "NO-EXISTE"),
+        ])
+        assert not ok and inv4.obtener("L002") is None and inv4.obtener("L001").cantidad == 10
+        assert resultados[0] == (False, "Revertida: falló la operación 3 (No existe producto con ID 'NO-EXISTE'.)")
+    assert tx_externa.guardada and tx_externa.operaciones == 1
+    recargado = Inventario(ruta_temp)
+    assert recargado.obtener("L001").cantidad == 10 and recargado.obtener("L002") is None
+
+    # 5) Persistencia asíncrona: una ráfaga de cambios se agrupa en pocas escrituras
+    with Inventario(ruta_temp, asincrono=True, intervalo_escritura_ms=50) as inv5:
+        for i in range(200):
+            ok, msg = inv5.actualizar("L001", cantidad=i)
+            assert ok and "pendiente de escritura" in msg, "en modo asíncrono no se promete lo que no está en disco"
+        assert inv5.flush()
+        assert Inventario(ruta_temp).obtener("L001").cantidad == 199, "flush() debe dejar todo en disco"
+        print("- Escritor asíncrono:", inv5.metricas_persistencia())
+    # Si el journal no se puede escribir, close() no se queda reintentando: avisa con False
+    ruta_rota = os.path.join(carpeta, "inventario_roto.txt")
+    inv_roto = Inventario(ruta_rota, modo_journal=True, asincrono=True, intervalo_escritura_ms=10)
+    os.makedirs(ruta_rota + Inventario.SUFIJO_JOURNAL)  # un directorio en lugar del journal
+    inv_roto.agregar(Producto("R1", "Regla", 1, 0.5))
+    assert inv_roto.close() is False, "close() debe informar los cambios que no se guardaron"
+    os.rmdir(ruta_rota + Inventario.SUFIJO_JOURNAL)
+    for ruta in (ruta_rota, ruta_rota + Inventario.SUFIJO_BINARIO):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+    # 6) Instantánea binaria: se usa si corresponde al CSV, si no se ignora
+    inv6 = Inventario(ruta_temp)
+    assert inv6.origen_carga() == "binario" and inv6.obtener("L001").cantidad == 199
+    with open(ruta_temp, "a", encoding="utf-8") as f:
+        f.write("X99,Editado a mano,1,1.00\n")  # el CSV cambia => la instantánea queda obsoleta
+    inv6 = Inventario(ruta_temp)
+    assert inv6.origen_carga() == "csv" and inv6.obtener("X99") is not None
+    print("- Instantánea binaria: se ignora cuando el CSV cambió")
+
+    # 7) Consulta indexada de solo lectura: se entera de los cambios de otro proceso
+    with InventarioIndexado(ruta_temp) as kiosco:
+        assert kiosco.obtener("X99").nombre == "Editado a mano"
+        assert kiosco.obtener("NO-EXISTE") is None
+        inv6.actualizar("X99", cantidad=42)  # se escribe el CSV => el índice se reconstruye
+        assert kiosco.obtener("X99").cantidad == 42
+        assert not kiosco.agregar(Producto("K1", "Kiosco", 1, 1.0))[0]
+        # Journal con un registro inválido y la última línea a medias (otro proceso anexando)
+        ruta_journal = ruta_temp + Inventario.SUFIJO_JOURNAL
+        with open(ruta_journal, "w", encoding="utf-8", newline="") as f:
+            f.write("PUT,K2,Kiosco,3,1.00\r\nBASURA\r\nPUT,K3,Kio")
+        assert kiosco.obtener("K2").cantidad == 3 and kiosco.obtener("K3") is None
+        assert len(kiosco.errores_carga()) == 1, kiosco.errores_carga()
+        with open(ruta_journal, "a", encoding="utf-8", newline="") as f:
+            f.write("sco,4,1.00\r\n")
+        assert kiosco.obtener("K3").cantidad == 4 and len(kiosco.errores_carga()) == 1
+        os.remove(ruta_journal)
+        assert kiosco.obtener("K2") is None and not kiosco.errores_carga()
+    print("- Índice de solo lectura: búsquedas por ID sin cargar el inventario")
+
+    # 8) Almacén columnar: misma interfaz, mismos archivos
+    inv8 = Inventario(ruta_temp, almacen="columnar")
+    assert inv8.obtener("X99").cantidad == 42
+    ok, _ = inv8.aplicar_lote([("agregar", Producto("C001", "Compás", 2, 3.10)), ("eliminar", "X99")])
+    assert ok and [p.id for p in Inventario(ruta_temp).listar()] == [p.id for p in inv8.listar()]
+    # Una cantidad no entera da (False, mensaje) igual en ambos almacenes, sin excepciones
+    inv8_dict = Inventario(ruta_temp)
+    for inv_almacen in (inv8, inv8_dict):
+        ok, msg = inv_almacen.agregar(Producto("C002", "Compás", 2.5, 3.10))
+        assert not ok and msg == "La cantidad debe ser un número entero (se recibió 2.5).", msg
+        assert inv_almacen.obtener("C002") is None
+        assert not inv_almacen.actualizar("C001", precio="caro")[0]
+    assert not inv8.agregar(Producto("C003", "Compás", 2 ** 70, 3.10))[0]  # no cabe en array('q')
+    assert len(inv8._productos._ids) == len(inv8._productos._nombres) == len(inv8._productos._cantidades)
+    print("- Almacén columnar: mismos datos que el almacén dict")
+
+    # 9) Modo compartido: dos instancias (como dos terminales) sobre el mismo archivo
+    term_a = Inventario(ruta_temp, compartido=True, modo_journal=True)
+    term_b = Inventario(ruta_temp, compartido=True, modo_journal=True)
+    term_a.agregar(Producto("S001", "Sacapuntas", 5, 0.60))
+    assert term_b.obtener("S001") is not None, "B debe ver el alta de A"
+    term_b.actualizar("S001", cantidad=6)
+    term_a.actualizar("C001", cantidad=8)  # A no debe pisar el cambio de B
+    assert Inventario(ruta_temp).obtener("S001").cantidad == 6
+    assert term_a.recargas_incrementales > 0
+    # Otro proceso deja un registro a medias: no se aplica, y se lee entero cuando se completa
+    with open(ruta_temp + Inventario.SUFIJO_JOURNAL, "a", encoding="utf-8", newline="") as f:
+        f.write("PUT,S002,Sacapun")
+    assert term_b.obtener("S002") is None and len(term_b.errores_carga()) == 1
+    with open(ruta_temp + Inventario.SUFIJO_JOURNAL, "a", encoding="utf-8", newline="") as f:
+        f.write("tas rojo,3,0.70\r\n")
+    assert term_b.obtener("S002").cantidad == 3 and not term_b.errores_carga(), term_b.errores_carga()
+    print(f"- Modo compartido: recargas incrementales A={term_a.recargas_incrementales}, "
+          f"B={term_b.recargas_incrementales}")
+    term_a.close()
+    term_b.close()
+
+    # 10) Instrumentación: histogramas por operación y por fase
+    inv_med = Inventario(ruta_temp, modo_journal=True, instrumentacion=True)
+    for i in range(50):
+        inv_med.agregar(Producto(f"L{i:03d}", "Lupa", i, 1.0))
+        inv_med.actualizar(f"L{i:03d}", cantidad=i + 1)
+    inv_med.compactar_journal()
+    lat = inv_med.metricas_latencia()
+    for clave in ("agregar", "actualizar", "cargar", "journal.fsync", "guardar_atomico.os_replace"):
+        assert clave in lat, f"Falta la métrica {clave}"
+    assert lat["agregar"]["n"] == 50
+    assert lat["agregar"]["p50_ms"] <= lat["agregar"]["p99_ms"] <= lat["agregar"]["max_ms"]
+    inv_med.desactivar_instrumentacion()
+    inv_med.eliminar("L000")
+    assert inv_med.metricas_latencia() == {}, "Desactivada no debe medir"
+    print(f"- Instrumentación: agregar p50={lat['agregar']['p50_ms']:.3f} ms, "
+          f"p99={lat['agregar']['p99_ms']:.3f} ms")
+
+    # 11) Lote: una cantidad no entera se rechaza (no se trunca) y `list` sale de a un producto
+    salida_lote = io.StringIO()
+    ops, fallidas, _ = ejecutar_lote(inv_med, ['{"op": "update", "id": "L001", "cantidad": 2.7}', "list"],
+                                     salida_lote)
+    resultados = [json.loads(l) for l in salida_lote.getvalue().splitlines()]
+    assert (ops, fallidas) == (2, 1) and "entero" in resultados[0]["mensaje"]
+    assert resultados[-1]["total"] == len(inv_med.listar()) == len(resultados) - 2
+    print("- Lote: cantidad 2.7 rechazada; list escribe un producto por línea")
+
+    # 12) Simular permiso denegado (solo lectura) => en muchas plataformas no podemos
     # cambiar permisos de forma portable aquí; mostramos cómo probar manualmente:
     print("\n[PRUEBAS] Para probar PermissionError manualmente:")
     print("   - En Linux/Mac: cambiar permisos del archivo o carpeta a solo lectura.")
@@ -346,13 +2031,164 @@ def ejecutar_pruebas_rapidas() -> None:
     print("[PRUEBAS] Finalizadas.\n")
 
 
+# --------------------------------------
+# Modo por lotes (sin menú)
+# --------------------------------------
+
+# Nombres aceptados para cada comando (inglés y español)
+COMANDOS_LOTE = {
+    "add": "add", "agregar": "add",
+    "update": "update", "actualizar": "update",
+    "delete": "delete", "eliminar": "delete",
+    "get": "get", "obtener": "get",
+    "list": "list", "listar": "list",
+}
+
+
+def _entero_lote(valor: Any) -> int:
+    """Cantidad de un comando por lotes: 5, "5" o 5.0. Lanza ValueError con 2.7, "2.7"
+    o true, en lugar de truncarlos en silencio como haría int()."""
+    if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+        raise ValueError(f"La cantidad debe ser un número entero (se recibió {valor!r}).")
+    return int(valor)
+
+
+def _interpretar_comando(linea: str) -> Tuple[str, Dict[str, Any]]:
+    """Convierte una línea (CSV o JSON) en (comando, argumentos). Lanza ValueError si
+    la línea no es válida.
+    """
+    if linea.startswith("{"):
+        try:
+            datos = json.loads(linea)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {e}") from None
+        if not isinstance(datos, dict):
+            raise ValueError("Se esperaba un objeto JSON.")
+        op = str(datos.pop("op", "")).strip().lower()
+        campos = datos
+    else:
+        fila = next(csv.reader([linea]))
+        op = fila[0].strip().lower()
+        campos = dict(zip(("id", "nombre", "cantidad", "precio"), (c.strip() for c in fila[1:])))
+    if op not in COMANDOS_LOTE:
+        raise ValueError(f"Comando desconocido: {op!r}.")
+    op = COMANDOS_LOTE[op]
+    if op != "list" and not str(campos.get("id") or "").strip():
+        raise ValueError("Falta el ID del producto.")
+    if op == "add":
+        cantidad = campos.get("cantidad", "")
+        if not isinstance(cantidad, str):  # número JSON
+            cantidad = str(_entero_lote(cantidad))
+        idp, nombre, cantidad, precio = _convertir_campos(
+            str(campos.get("id", "")), str(campos.get("nombre") or ""),
+            cantidad, str(campos.get("precio", "")))
+        return op, {"producto": Producto(idp, nombre, cantidad, precio)}
+    if op == "update":
+        # Campo vacío o ausente = sin cambio
+        nombre = campos.get("nombre")
+        cantidad = campos.get("cantidad")
+        precio = campos.get("precio")
+        return op, {
+            "id_producto": str(campos["id"]).strip(),
+            "nombre": str(nombre).strip() or None if nombre is not None else None,
+            "cantidad": _entero_lote(cantidad) if cantidad not in (None, "") else None,
+            "precio": float(precio) if precio not in (None, "") else None,
+        }
+    if op in ("delete", "get"):
+        return op, {"id_producto": str(campos["id"]).strip()}
+    return op, {}
+
+
+def ejecutar_lote(inv: Inventario, lineas: Iterable[str], salida: Any = None) -> Tuple[int, int, bool]:
+    """Ejecuta comandos por lotes sobre `inv` dentro de una transacción (una única
+    escritura al final) y escribe un resultado JSON por línea en `salida` (stdout).
+
+    Un comando inválido o fallido no detiene el lote: se informa y se sigue.
+    Devuelve (operaciones, fallidas, guardado).
+    """
+    salida = salida or sys.stdout
+    escribir = salida.write
+    operaciones = fallidas = 0
+    with inv.transaccion() as tx:
+        for num, linea in enumerate(lineas, start=1):
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            operaciones += 1
+            try:
+                op, args = _interpretar_comando(linea)
+            except (ValueError, TypeError) as e:
+                fallidas += 1
+                escribir(json.dumps({"linea": num, "ok": False, "mensaje": str(e)}, ensure_ascii=False) + "\n")
+                continue
+            resultado: Dict[str, Any] = {"linea": num, "op": op}
+            if op == "add":
+                resultado["ok"], resultado["mensaje"] = inv.agregar(args["producto"])
+            elif op == "update":
+                resultado["ok"], resultado["mensaje"] = inv.actualizar(**args)
+            elif op == "delete":
+                resultado["ok"], resultado["mensaje"] = inv.eliminar(args["id_producto"])
+            elif op == "get":
+                p = inv.obtener(args["id_producto"])
+                resultado["ok"] = p is not None
+                if p is None:
+                    resultado["mensaje"] = "No se encontró el producto."
+                else:
+                    resultado["producto"] = asdict(p)
+            else:
+                # Un producto por línea: no se arma la lista completa en memoria
+                total = 0
+                for p in inv.iterar():
+                    escribir(json.dumps({"linea": num, "op": op, "producto": asdict(p)}, ensure_ascii=False) + "\n")
+                    total += 1
+                resultado["ok"] = True
+                resultado["total"] = total
+            if not resultado["ok"]:
+                fallidas += 1
+            escribir(json.dumps(resultado, ensure_ascii=False) + "\n")
+    salida.flush()
+    return operaciones, fallidas, tx.guardada
+
+
 # -----------------------------
 # Punto de entrada (CLI)
 # -----------------------------
 
-def main() -> None:
-    ruta = "inventario.txt"  # puedes cambiarlo o parametrizar con sys.argv
-    inv = Inventario(ruta)
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Inventarios (SEMANA 10)")
+    parser.add_argument("--archivo", default="inventario.txt", help="archivo del inventario")
+    parser.add_argument("--lote", metavar="COMANDOS",
+                        help="ejecuta los comandos del archivo indicado ('-' = stdin) sin mostrar el menú")
+    parser.add_argument("--instrumentar", action="store_true",
+                        help="medir latencias desde la carga (en modo lote se muestran al final en stderr)")
+    args = parser.parse_args(argv)
+    ruta = args.archivo
+    inv = Inventario(ruta, modo_journal=True, instrumentacion=args.instrumentar)
+
+    if args.lote is not None:
+        # Los avisos van a stderr para no mezclarse con los resultados
+        for e in inv.errores_carga():
+            print(f"[ADVERTENCIA] {e}", file=sys.stderr)
+        inicio = time.perf_counter()
+        if args.lote == "-":
+            ops, fallidas, guardado = ejecutar_lote(inv, sys.stdin)
+        else:
+            try:
+                with open(args.lote, mode="r", encoding="utf-8") as f:
+                    ops, fallidas, guardado = ejecutar_lote(inv, f)
+            except OSError as e:
+                print(f"[ERROR] No se pudo leer el archivo de comandos: {e}", file=sys.stderr)
+                sys.exit(2)
+        inv.close()
+        segundos = time.perf_counter() - inicio
+        print(f"[INFO] {ops} operación(es), {fallidas} fallida(s) en {segundos:.3f} s "
+              f"({ops / segundos if segundos else 0:,.0f} ops/s)", file=sys.stderr)
+        if inv.instrumentacion_activa():
+            print(json.dumps({"latencias": inv.metricas_latencia()}, ensure_ascii=False), file=sys.stderr)
+        if not guardado:
+            print("[ERROR] No se pudieron guardar los cambios en el archivo.", file=sys.stderr)
+            sys.exit(1)
+        return
 
     # Informar estado inicial y errores de carga
     if inv.errores_carga():
@@ -403,6 +2239,9 @@ def main() -> None:
             elif opcion == "6":
                 print(f"Archivo: {inv.ruta_archivo}")
                 print(f"Solo-lectura: {inv.es_solo_lectura()}")
+                print(f"Origen de la carga: {inv.origen_carga()}")
+                if inv.es_modo_journal():
+                    print(f"Journal: {inv.registros_journal()} registro(s) pendientes de compactar")
                 if inv.errores_carga():
                     print("Errores de carga:")
                     for e in inv.errores_carga():
@@ -411,6 +2250,13 @@ def main() -> None:
                     print("Sin errores de carga registrados.")
             elif opcion == "7":
                 ejecutar_pruebas_rapidas()
+            elif opcion == "8":
+                if inv.instrumentacion_activa():
+                    imprimir_latencias(inv.metricas_latencia())
+                else:
+                    inv.activar_instrumentacion()
+                    print("Instrumentación activada: las próximas operaciones se medirán "
+                          "(o inicie con --instrumentar para medir también la carga).")
             else:
                 print("Opción no válida.")
         except PermissionError:
@@ -422,6 +2268,7 @@ def main() -> None:
         except Exception as e:
             # Evita que errores no controlados derriben el programa
             print(f"❌ Ocurrió un error no esperado: {e}")
+    inv.close()
 
 
 if __name__ == "__main__":
@@ -1,10 +1,83 @@
 #SEMANA 11 (SISTEMA AVANZADO DE GESTION DE INVENTARIO)
 #NOMBRE: FLOR MUÑOZ
 
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, fields
+from itertools import chain, islice, takewhile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import asyncio
+import gzip
+import io
 import json
+import lzma
 import os
+import re
+import signal
+import tempfile
+import threading
+import time
+import unicodedata
+
+
+# ---------- Conversión rápida de objetos a dict/tupla y de vuelta ----------
+
+@dataclass(frozen=True)
+class CodecClase:
+    """Funciones de conversión generadas para una dataclass (ver `generar_codec`)."""
+    campos: Tuple[str, ...]
+    a_dict: Callable[[Any], Dict[str, Any]]
+    a_tupla: Callable[[Any], Tuple[Any, ...]]
+    desde_dict: Callable[[Dict[str, Any]], Any]
+    desde_tupla: Callable[[Iterable[Any]], Any]
+
+
+def entero_estricto(valor: Any, campo: str = "valor") -> int:
+    """Acepta solo enteros de verdad. int() truncaría 2.7 a 2 y aceptaría "3" y True
+    (bool es subclase de int); aquí eso es un TypeError."""
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return int(valor)
+    raise TypeError(f"{campo} debe ser un número entero (llegó {valor!r})")
+
+
+def generar_codec(cls: type) -> CodecClase:
+    """Genera (con exec) funciones de conversión específicas de la dataclass `cls`.
+
+    `dataclasses.asdict` recorre y copia recursivamente cada valor; aquí cada función
+    es una sola expresión con los campos escritos a mano, p. ej. para Producto:
+        a_dict(o) -> {"id": o.id, "nombre": o.nombre, "cantidad": o.cantidad, ...}
+    Al leer, los campos int y float solo se convierten si no vienen ya con ese tipo:
+    JSON puede traer un precio entero como 5 (float(5)), pero un int debe venir como
+    int; 2.7, "3" o True lanzan TypeError (ver `entero_estricto`) en vez de truncarse.
+    Los demás campos se pasan tal cual.
+    """
+    nombres = tuple(f.name for f in fields(cls))
+    conversiones = {int: "int", float: "float", "int": "int", "float": "float"}
+    entorno: Dict[str, Any] = {"_cls": cls, "float": float, "_entero": entero_estricto}
+
+    def leer(i: int, expresion: str) -> Tuple[str, str]:
+        tipo = conversiones.get(fields(cls)[i].type)
+        if tipo is None:
+            return "", expresion
+        convertir = f"_entero(v{i}, {nombres[i]!r})" if tipo == "int" else f"float(v{i})"
+        return f"v{i} = {expresion}\n    ", f"v{i} if v{i}.__class__ is {tipo} else {convertir}"
+
+    def desde(fuente) -> str:
+        partes = [leer(i, fuente(i, n)) for i, n in enumerate(nombres)]
+        return "".join(p[0] for p in partes) + "return _cls(" + ", ".join(p[1] for p in partes) + ")"
+
+    codigo = (
+        "def a_dict(o):\n    return {" + ", ".join(f"{n!r}: o.{n}" for n in nombres) + "}\n"
+        "def a_tupla(o):\n    return (" + "".join(f"o.{n}, " for n in nombres) + ")\n"
+        "def desde_dict(d):\n    " + desde(lambda i, n: f"d[{n!r}]") + "\n"
+        "def desde_tupla(t):\n    (" + "".join(f"t{i}, " for i in range(len(nombres))) + ") = t\n    "
+        + desde(lambda i, n: f"t{i}") + "\n"
+    )
+    exec(compile(codigo, f"<codec {cls.__name__}>", "exec"), entorno)
+    return CodecClase(nombres, entorno["a_dict"], entorno["a_tupla"], entorno["desde_dict"], entorno["desde_tupla"])
 
 
 @dataclass
@@ -25,23 +98,583 @@ class Producto:
 
     def to_dict(self) -> Dict:
         """Convierte el objeto Producto a un diccionario serializable (para JSON)."""
-        return asdict(self)
+        return CODEC_PRODUCTO.a_dict(self)
+
+    def to_tuple(self) -> Tuple[str, str, int, float]:
+        """(id, nombre, cantidad, precio), en el orden de CAMPOS_PRODUCTO."""
+        return CODEC_PRODUCTO.a_tupla(self)
 
     @staticmethod
     def from_dict(d: Dict) -> "Producto":
         """Crea un Producto desde un diccionario (deserialización)."""
-        return Producto(id=d["id"], nombre=d["nombre"], cantidad=int(d["cantidad"]), precio=float(d["precio"]))
+        return CODEC_PRODUCTO.desde_dict(d)
+
+    @staticmethod
+    def from_tuple(t: Iterable[Any]) -> "Producto":
+        """Crea un Producto desde (id, nombre, cantidad, precio)."""
+        return CODEC_PRODUCTO.desde_tupla(t)
+
+
+CODEC_PRODUCTO = generar_codec(Producto)
+CAMPOS_PRODUCTO = CODEC_PRODUCTO.campos
+
+
+# ---------- Lectura y escritura de JSON por partes (streaming) ----------
+
+_ESPACIOS = re.compile(r"[ \t\n\r]*")
+# Atajos para el caso común: `"clave": ` y el separador `,` o `}` entre productos
+_CLAVE = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+_SEPARADOR = re.compile(r"[ \t\n\r]*([,}])")
+_DECODIFICADOR = json.JSONDecoder()
+
+
+def leer_productos_json(ruta: str, tam_bloque: int = 64 * 1024) -> Iterator[Tuple[str, Producto]]:
+    """Lee un inventory.json ({ id: {id, nombre, cantidad, precio}, ... }) y entrega los
+    pares (id, Producto) uno a uno, leyendo el archivo en bloques de `tam_bloque`
+    caracteres. Nunca tiene en memoria el texto completo ni el árbol de dicts entero.
+    Lanza json.JSONDecodeError si el archivo no es un objeto JSON válido.
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        yield from _leer_dict_json(f, tam_bloque)
+
+
+def _leer_dict_json(f: TextIO, tam_bloque: int = 64 * 1024, prefijo: str = "") -> Iterator[Tuple[str, Producto]]:
+    """Lector por partes de `leer_productos_json` sobre un archivo ya abierto; `prefijo`
+    es texto ya leído del principio del archivo (al detectar el formato).
+    """
+    buffer = prefijo
+    pos = 0
+    fin_archivo = False
+    desde_dict = CODEC_PRODUCTO.desde_dict
+
+    def leer_mas() -> bool:
+        nonlocal buffer, pos, fin_archivo
+        if fin_archivo:
+            return False
+        bloque = f.read(tam_bloque)
+        if not bloque:
+            fin_archivo = True
+            return False
+        buffer = buffer[pos:] + bloque  # se descarta lo ya procesado
+        pos = 0
+        return True
+
+    def siguiente_caracter() -> str:
+        """Salta espacios y devuelve el próximo carácter ('' al final del archivo)."""
+        nonlocal pos
+        while True:
+            pos = _ESPACIOS.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not leer_mas():
+                return ""
+
+    def decodificar() -> object:
+        """Decodifica el próximo valor JSON, leyendo más si quedó cortado en el bloque."""
+        nonlocal pos
+        while True:
+            try:
+                valor, fin = _DECODIFICADOR.raw_decode(buffer, pos)
+                # Un número al final del bloque podría continuar en el siguiente
+                if fin < len(buffer) or fin_archivo:
+                    pos = fin
+                    return valor
+            except json.JSONDecodeError:
+                if fin_archivo:
+                    raise
+            leer_mas()  # al llegar al final, el próximo intento decide
+
+    def esperar(caracter: str) -> None:
+        nonlocal pos
+        if siguiente_caracter() != caracter:
+            raise json.JSONDecodeError(f"Se esperaba '{caracter}'", buffer, pos)
+        pos += 1
+
+    if siguiente_caracter() == "":
+        raise json.JSONDecodeError("Archivo vacío", buffer, pos)
+    esperar("{")
+    if siguiente_caracter() == "}":
+        return
+    while True:
+        clave = _CLAVE.match(buffer, pos)
+        if clave is not None and clave.end() < len(buffer):
+            pid = clave.group(1)
+            if "\\" in pid:
+                pid = json.loads(f'"{pid}"')
+            pos = clave.end()
+        else:
+            # La clave quedó cortada al final del bloque (o no es válida): camino lento
+            if siguiente_caracter() != '"':
+                raise json.JSONDecodeError("Se esperaba una clave entre comillas", buffer, pos)
+            pid = decodificar()
+            esperar(":")
+            siguiente_caracter()
+        yield pid, desde_dict(decodificar())
+        separador = _SEPARADOR.match(buffer, pos)
+        if separador is not None:
+            c = separador.group(1)
+            pos = separador.end()
+        else:
+            c = siguiente_caracter()
+            pos += 1
+        if c == "}":
+            return
+        if c != ",":
+            raise json.JSONDecodeError("Se esperaba ',' o '}'", buffer, pos - 1)
+
+
+def escribir_productos_json(f: TextIO, productos: Iterable[Tuple[str, Producto]], compacto: bool = False) -> None:
+    """Escribe los pares (id, Producto) de a uno, con el mismo formato que
+    json.dump(..., indent=4, ensure_ascii=False), sin armar antes el dict completo.
+    Con `compacto=True` no hay indentación ni espacios (como separators=(",", ":")).
+    """
+    escribir = f.write
+    a_dict = CODEC_PRODUCTO.a_dict
+    if compacto:
+        codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        primero = True
+        for pid, p in productos:
+            escribir("{" if primero else ",")
+            primero = False
+            escribir(f"{codificar(pid)}:{codificar(a_dict(p))}")
+        escribir("{}" if primero else "}")
+        return
+    # Sin indent, json usa su codificador en C; la indentación (fija) se arma aquí
+    codificar = json.JSONEncoder(ensure_ascii=False).encode
+    primero = True
+    for pid, p in productos:
+        escribir("{\n    " if primero else ",\n    ")
+        primero = False
+        campos = ",\n        ".join(f"{codificar(k)}: {codificar(v)}" for k, v in a_dict(p).items())
+        escribir(f"{codificar(pid)}: {{\n        {campos}\n    }}")
+    escribir("{}" if primero else "\n}")
+
+
+# ---------- Formatos de almacenamiento (codecs) ----------
+#
+# Un codec combina una disposición del texto con una compresión opcional:
+#   "json"       dict indentado (el formato original, legible a mano)
+#   "compacto"   el mismo dict sin espacios
+#   "posicional" {"formato": "posicional", "campos": [...], "productos": [[...], ...]}:
+#                cada producto es una fila [id, nombre, cantidad, precio], sin repetir
+#                los nombres de los campos; una fila por línea
+#   "gzip", "lzma"  el dict compacto comprimido; "posicional+gzip" y "posicional+lzma"
+#                comprimen el formato posicional
+# Al leer, el codec se detecta solo: la compresión por los primeros bytes y la
+# disposición por el comienzo del texto.
+
+CODECS: Dict[str, Tuple[str, Optional[str]]] = {
+    "json": ("json", None),
+    "compacto": ("compacto", None),
+    "posicional": ("posicional", None),
+    "gzip": ("compacto", "gzip"),
+    "lzma": ("compacto", "lzma"),
+    "posicional+gzip": ("posicional", "gzip"),
+    "posicional+lzma": ("posicional", "lzma"),
+}
+NIVEL_GZIP = 6    # el 9 de gzip.open tarda bastante más y casi no achica
+PRESET_LZMA = 1   # el 6 por defecto achica ~1/3 más pero es ~25 veces más lento
+
+_MAGIA_GZIP = b"\x1f\x8b"
+_MAGIA_XZ = b"\xfd7zXZ\x00"
+_CABECERA_POSICIONAL = re.compile(r'[ \t\n\r]*\{[ \t\n\r]*"formato"[ \t\n\r]*:[ \t\n\r]*"posicional"')
+
+
+def _abrir_texto(ruta: str, modo: str, compresion: Optional[str]) -> TextIO:
+    if compresion == "gzip":
+        return gzip.open(ruta, modo + "t", encoding="utf-8", compresslevel=NIVEL_GZIP)
+    if compresion == "lzma":
+        if modo == "w":
+            return lzma.open(ruta, "wt", encoding="utf-8", preset=PRESET_LZMA)
+        return lzma.open(ruta, modo + "t", encoding="utf-8")
+    return open(ruta, modo, encoding="utf-8")
+
+
+def _compresion_de(ruta: str) -> Optional[str]:
+    with open(ruta, "rb") as f:
+        inicio = f.read(len(_MAGIA_XZ))
+    if inicio.startswith(_MAGIA_GZIP):
+        return "gzip"
+    if inicio.startswith(_MAGIA_XZ):
+        return "lzma"
+    return None
+
+
+def _disposicion_de(prefijo: str) -> str:
+    if _CABECERA_POSICIONAL.match(prefijo):
+        return "posicional"
+    # Solo el dict compacto pega la primera clave a la llave ("{}" cuenta como json)
+    return "compacto" if prefijo.lstrip()[1:2] == '"' else "json"
+
+
+def _nombre_codec(disposicion: str, compresion: Optional[str]) -> str:
+    for nombre, valor in CODECS.items():
+        if valor == (disposicion, compresion):
+            return nombre
+    return compresion or disposicion  # p. ej. un dict indentado comprimido a mano
+
+
+def detectar_codec(ruta: str) -> str:
+    """Nombre del codec con que está escrito `ruta` (ver CODECS)."""
+    compresion = _compresion_de(ruta)
+    with _abrir_texto(ruta, "r", compresion) as f:
+        return _nombre_codec(_disposicion_de(f.read(64)), compresion)
+
+
+def _filas_a_productos(campos: List[str], filas: Iterable[List[Any]]) -> Iterator[Tuple[str, Producto]]:
+    if sorted(campos) != sorted(CAMPOS_PRODUCTO):
+        raise ValueError(f"campos desconocidos en formato posicional: {campos!r}")
+    desde_tupla = CODEC_PRODUCTO.desde_tupla
+    if tuple(campos) == CAMPOS_PRODUCTO:
+        for fila in filas:
+            p = desde_tupla(fila)
+            yield p.id, p
+        return
+    posiciones = [campos.index(c) for c in CAMPOS_PRODUCTO]
+    for fila in filas:
+        p = desde_tupla([fila[i] for i in posiciones])
+        yield p.id, p
+
+
+def _leer_posicional(f: TextIO, prefijo: str) -> Iterator[Tuple[str, Producto]]:
+    """Lee el formato posicional tal como lo escribe `_escribir_posicional` (cabecera,
+    una fila por línea, cierre) sin cargar el archivo completo. Si la cabecera no tiene
+    esa forma (p. ej. el archivo se reformateó a mano) se decodifica como un documento
+    entero. Lanza ValueError (o json.JSONDecodeError) si el contenido no es válido.
+    """
+    # readline() completa la línea que el prefijo dejó a medias
+    cabecera = prefijo + f.readline()
+    primera = cabecera.split("\n", 1)[0].rstrip()
+    if primera.endswith('"productos":['):
+        encabezado = json.loads(primera + "]}")
+    elif primera.endswith("]}"):
+        encabezado = json.loads(primera)  # inventario vacío, todo en una línea
+    else:
+        documento = json.loads(cabecera + f.read())
+        yield from _filas_a_productos(documento["campos"], documento["productos"])
+        return
+    if encabezado.get("version") != 1:
+        raise ValueError(f"versión de formato posicional no soportada: {encabezado.get('version')!r}")
+    if encabezado["productos"]:
+        yield from _filas_a_productos(encabezado["campos"], encabezado["productos"])
+        return
+    if primera.endswith("]}"):
+        return
+    filas = (json.loads(linea.rstrip().removesuffix(",")) for linea in chain(io.StringIO(cabecera.split("\n", 1)[1]), f)
+             if linea.strip() and linea.strip() != "]}")
+    yield from _filas_a_productos(encabezado["campos"], filas)
+
+
+def _escribir_posicional(f: TextIO, productos: Iterable[Tuple[str, Producto]]) -> None:
+    codificar = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    encabezado = codificar({"formato": "posicional", "version": 1, "campos": list(CAMPOS_PRODUCTO)})
+    a_tupla = CODEC_PRODUCTO.a_tupla
+    escribir = f.write
+    escribir(encabezado[:-1] + ',"productos":[')
+    primero = True
+    for _, p in productos:
+        escribir("\n" if primero else ",\n")
+        primero = False
+        escribir(codificar(a_tupla(p)))
+    escribir("]}" if primero else "\n]}")
+
+
+def leer_productos(ruta: str, tam_bloque: int = 64 * 1024) -> Iterator[Tuple[str, Producto]]:
+    """Como `leer_productos_json`, pero acepta cualquiera de los codecs de CODECS y lo
+    detecta solo.
+    """
+    with _abrir_texto(ruta, "r", _compresion_de(ruta)) as f:
+        prefijo = f.read(64)
+        if _disposicion_de(prefijo) == "posicional":
+            yield from _leer_posicional(f, prefijo)
+        else:
+            yield from _leer_dict_json(f, tam_bloque, prefijo)
+
+
+def escribir_productos(ruta: str, productos: Iterable[Tuple[str, Producto]], codec: str = "json") -> None:
+    """Escribe los pares (id, Producto) en `ruta` con el codec indicado (ver CODECS)."""
+    disposicion, compresion = CODECS[codec]
+    with _abrir_texto(ruta, "w", compresion) as f:
+        if disposicion == "posicional":
+            _escribir_posicional(f, productos)
+        else:
+            escribir_productos_json(f, productos, compacto=disposicion == "compacto")
+
+
+# ---------- Índice de trigramas para buscar por nombre ----------
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes ni diacríticos: "Lápiz" -> "lapiz"."""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+class IndiceTrigramas:
+    """Índice de subcadenas de tres letras (trigramas) de los nombres normalizados.
+
+    Cada trigrama apunta a las entradas cuyo nombre lo contiene. Para buscar se toma
+    la lista del trigrama menos frecuente de la consulta y solo esos candidatos se
+    comparan con `in`, en lugar de recorrer todo el catálogo. Consultas de menos de
+    tres letras recorren los nombres ya normalizados.
+
+    Las listas son arrays de enteros que solo crecen: eliminar o renombrar marca la
+    entrada como muerta y, cuando las muertas superan a las vivas, se reconstruye.
+    """
+
+    def __init__(self) -> None:
+        self._listas: Dict[str, array] = {}    # trigrama -> números de entrada
+        self._ids: List[Optional[str]] = []     # entrada -> id (None = muerta)
+        self._textos: List[str] = []            # entrada -> nombre normalizado
+        self._orden: List[int] = []             # entrada -> orden de alta del producto
+        self._entrada_de: Dict[str, int] = {}   # id -> entrada viva
+        self._siguiente_orden = 0
+        self._muertas = 0
+        self._en_orden = True  # el orden de alta coincide con el de las entradas
+
+    def __len__(self) -> int:
+        return len(self._entrada_de)
+
+    def agregar(self, producto_id: str, nombre: str, orden: Optional[int] = None) -> None:
+        """Indexa (o reindexa, si ya existía) el nombre de un producto."""
+        previa = self._entrada_de.get(producto_id)
+        if previa is not None:
+            orden = self._orden[previa]  # un renombrado conserva la posición
+            self.quitar(producto_id)
+        if orden is not None and self._orden and orden < self._orden[-1]:
+            self._en_orden = False
+        if orden is None:
+            orden = self._siguiente_orden
+            self._siguiente_orden += 1
+        texto = normalizar_texto(nombre)
+        entrada = len(self._ids)
+        self._ids.append(producto_id)
+        self._textos.append(texto)
+        self._orden.append(orden)
+        self._entrada_de[producto_id] = entrada
+        listas = self._listas
+        for trigrama in {texto[i:i + 3] for i in range(len(texto) - 2)}:
+            lista = listas.get(trigrama)
+            if lista is None:
+                lista = listas[trigrama] = array("i")
+            lista.append(entrada)
+
+    def quitar(self, producto_id: str) -> None:
+        entrada = self._entrada_de.pop(producto_id, None)
+        if entrada is None:
+            return
+        self._ids[entrada] = None
+        self._textos[entrada] = ""
+        self._muertas += 1
+        if self._muertas > 1024 and self._muertas > len(self._entrada_de):
+            self._reconstruir()
+
+    def _reconstruir(self) -> None:
+        vivas = sorted(self._entrada_de.values(), key=self._orden.__getitem__)
+        datos = [(self._ids[e], self._textos[e], self._orden[e]) for e in vivas]
+        siguiente = self._siguiente_orden
+        self.__init__()
+        self._siguiente_orden = siguiente
+        for producto_id, texto, orden in datos:
+            self.agregar(producto_id, texto, orden)  # el texto ya está normalizado
+
+    def buscar(self, consulta: str) -> List[str]:
+        """Ids cuyo nombre contiene `consulta` (sin distinguir mayúsculas ni tildes),
+        en el orden en que se dieron de alta.
+        """
+        q = normalizar_texto(consulta)
+        textos = self._textos
+        if not q:
+            encontradas = sorted(self._entrada_de.values())
+        elif len(q) < 3:
+            # Las entradas muertas tienen texto "" y nunca coinciden
+            encontradas = [e for e, texto in enumerate(textos) if q in texto]
+        else:
+            listas = []
+            for trigrama in {q[i:i + 3] for i in range(len(q) - 2)}:
+                lista = self._listas.get(trigrama)
+                if lista is None:
+                    return []  # ningún nombre contiene este trigrama
+                listas.append(lista)
+            encontradas = [e for e in min(listas, key=len) if q in textos[e]]
+        if not self._en_orden:
+            encontradas.sort(key=self._orden.__getitem__)
+        ids = self._ids
+        return [ids[e] for e in encontradas]
+
+
+# ---------- Lista siempre ordenada (por bloques) ----------
+
+class ListaOrdenada:
+    """Valores siempre ordenados, guardados en bloques de ~1000 elementos.
+
+    Insertar o quitar busca el bloque con bisect sobre el máximo de cada bloque y solo
+    mueve elementos dentro de ese bloque, así que cuesta O(log n + tamaño de bloque) en
+    lugar de O(n). Recorrer en orden (completo o desde un valor) no ordena nada.
+    No se debe modificar mientras se recorre.
+    """
+
+    CARGA = 1000
+
+    def __init__(self, valores: Iterable[Any] = ()) -> None:
+        ordenados = sorted(valores)
+        self._bloques: List[List[Any]] = [ordenados[i:i + self.CARGA]
+                                          for i in range(0, len(ordenados), self.CARGA)]
+        self._maximos: List[Any] = [bloque[-1] for bloque in self._bloques]
+        self._total = len(ordenados)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._bloques)
+
+    def __contains__(self, valor: Any) -> bool:
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        bloque = self._bloques[i]
+        j = bisect_left(bloque, valor)
+        return bloque[j] == valor
+
+    def agregar(self, valor: Any) -> None:
+        if not self._bloques:
+            self._bloques.append([valor])
+            self._maximos.append(valor)
+            self._total = 1
+            return
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            i -= 1  # mayor que todos: va al final del último bloque
+        bloque = self._bloques[i]
+        insort(bloque, valor)
+        self._maximos[i] = bloque[-1]
+        self._total += 1
+        if len(bloque) > 2 * self.CARGA:
+            # Partir el bloque en dos mitades
+            mitad = bloque[self.CARGA:]
+            del bloque[self.CARGA:]
+            self._bloques.insert(i + 1, mitad)
+            self._maximos[i] = bloque[-1]
+            self._maximos.insert(i + 1, mitad[-1])
+
+    def quitar(self, valor: Any) -> bool:
+        """Quita una aparición de `valor`. Devuelve False si no estaba."""
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        bloque = self._bloques[i]
+        j = bisect_left(bloque, valor)
+        if bloque[j] != valor:
+            return False
+        del bloque[j]
+        self._total -= 1
+        if bloque:
+            self._maximos[i] = bloque[-1]
+        else:
+            del self._bloques[i]
+            del self._maximos[i]
+        return True
+
+    def iterar_desde(self, inicio: Any = None, incluir_inicio: bool = True) -> Iterator[Any]:
+        """Recorre en orden a partir de `inicio` (o desde el principio si es None)."""
+        if inicio is None:
+            yield from self
+            return
+        buscar = bisect_left if incluir_inicio else bisect_right
+        i = buscar(self._maximos, inicio)
+        if i == len(self._bloques):
+            return
+        bloque = self._bloques[i]
+        yield from islice(bloque, buscar(bloque, inicio), None)
+        yield from chain.from_iterable(islice(self._bloques, i + 1, None))
 
 
 class Inventario:
     """Clase que gestiona la colección de productos.
 
-    Internamente usa un diccionario para acceso rápido por ID: { id: Producto }
+    Internamente usa un diccionario para acceso rápido por ID: { id: Producto },
+    más un índice de trigramas de los nombres para `buscar_por_nombre`, los ids en una
+    `ListaOrdenada` para listar en orden sin ordenar cada vez y pares (cantidad, id) y
+    (precio, id) también en `ListaOrdenada` para las búsquedas por rango. Los índices se
+    construyen la primera vez que se usan, para no demorar la carga. Por eso cantidad,
+    precio y nombre deben cambiarse con los métodos actualizar_*, no en el Producto.
     """
 
-    def __init__(self, storage_path: str = "inventory.json"):
+    SUFIJO_DELTA = ".delta"
+
+    def __init__(self, storage_path: str = "inventory.json", max_registros_delta: int = 5000,
+                 codec: Optional[str] = None):
+        """`codec` elige el formato de storage_path al compactar (ver CODECS). Con None se
+        conserva el del archivo cargado, o "json" si todavía no existe.
+        """
+        if codec is not None and codec not in CODECS:
+            raise ValueError(f"Codec desconocido {codec!r}. Opciones: {', '.join(CODECS)}")
         self.productos: Dict[str, Producto] = {}
         self.storage_path = storage_path
+        self.codec = codec or "json"
+        self._codec_fijo = codec is not None
+        # Guardado incremental: ids cambiados/eliminados desde el último guardado
+        self._sucios: set = set()
+        self._eliminados: set = set()
+        self._registros_delta = 0  # registros en el archivo .delta aún no compactados
+        self._delta_cortado = False  # el .delta termina en una línea incompleta
+        self.max_registros_delta = max_registros_delta
+        self.advertencias_carga: List[str] = []
+        self.version = 0  # aumenta con cada modificación (alta, baja o actualización)
+
+    @property
+    def productos(self) -> Dict[str, Producto]:
+        return self._productos
+
+    @productos.setter
+    def productos(self, productos: Dict[str, Producto]) -> None:
+        """Reemplazar el dict completo invalida los índices y obliga a que el próximo
+        guardado sea completo (no se sabe qué cambió).
+        """
+        self._productos = productos
+        self._indice_nombres: Optional[IndiceTrigramas] = None
+        self._ids_ordenados: Optional[ListaOrdenada] = None
+        self._por_cantidad: Optional[ListaOrdenada] = None  # pares (cantidad, id)
+        self._por_precio: Optional[ListaOrdenada] = None    # pares (precio, id)
+        self._reemplazado = True
+
+    @property
+    def ruta_delta(self) -> str:
+        """Archivo JSON-lines con los cambios posteriores a storage_path."""
+        return self.storage_path + self.SUFIJO_DELTA
+
+    def _marcar_sucio(self, producto_id: str) -> None:
+        self._sucios.add(producto_id)
+        self._eliminados.discard(producto_id)
+        self.version += 1
+
+    def cambios_pendientes(self) -> int:
+        """Productos modificados o eliminados desde el último guardado."""
+        return len(self._sucios) + len(self._eliminados)
+
+    def _indice(self) -> IndiceTrigramas:
+        if self._indice_nombres is None:
+            self._indice_nombres = IndiceTrigramas()
+            for pid, p in self._productos.items():
+                self._indice_nombres.agregar(pid, p.nombre)
+        return self._indice_nombres
+
+    def _orden_ids(self) -> ListaOrdenada:
+        if self._ids_ordenados is None:
+            self._ids_ordenados = ListaOrdenada(self._productos)
+        return self._ids_ordenados
+
+    def _orden_cantidad(self) -> ListaOrdenada:
+        if self._por_cantidad is None:
+            self._por_cantidad = ListaOrdenada((p.cantidad, pid) for pid, p in self._productos.items())
+        return self._por_cantidad
+
+    def _orden_precio(self) -> ListaOrdenada:
+        if self._por_precio is None:
+            self._por_precio = ListaOrdenada((p.precio, pid) for pid, p in self._productos.items())
+        return self._por_precio
 
     # ---------- Operaciones CRUD ----------
     def añadir_producto(self, producto: Producto) -> bool:
@@ -49,12 +682,32 @@ class Inventario:
         if producto.id in self.productos:
             return False
         self.productos[producto.id] = producto
+        self._marcar_sucio(producto.id)
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(producto.id, producto.nombre)
+        if self._ids_ordenados is not None:
+            self._ids_ordenados.agregar(producto.id)
+        if self._por_cantidad is not None:
+            self._por_cantidad.agregar((producto.cantidad, producto.id))
+        if self._por_precio is not None:
+            self._por_precio.agregar((producto.precio, producto.id))
         return True
 
     def eliminar_producto(self, producto_id: str) -> bool:
         """Elimina un producto por su ID. Devuelve True si se eliminó, False si no existe."""
         if producto_id in self.productos:
-            del self.productos[producto_id]
+            p = self.productos.pop(producto_id)
+            self._sucios.discard(producto_id)
+            self._eliminados.add(producto_id)
+            self.version += 1
+            if self._indice_nombres is not None:
+                self._indice_nombres.quitar(producto_id)
+            if self._ids_ordenados is not None:
+                self._ids_ordenados.quitar(producto_id)
+            if self._por_cantidad is not None:
+                self._por_cantidad.quitar((p.cantidad, producto_id))
+            if self._por_precio is not None:
+                self._por_precio.quitar((p.precio, producto_id))
             return True
         return False
 
@@ -63,7 +716,11 @@ class Inventario:
         p = self.productos.get(producto_id)
         if not p:
             return False
+        if self._por_cantidad is not None:
+            self._por_cantidad.quitar((p.cantidad, producto_id))
+            self._por_cantidad.agregar((nueva_cantidad, producto_id))
         p.cantidad = nueva_cantidad
+        self._marcar_sucio(producto_id)
         return True
 
     def actualizar_precio(self, producto_id: str, nuevo_precio: float) -> bool:
@@ -71,33 +728,595 @@ class Inventario:
         p = self.productos.get(producto_id)
         if not p:
             return False
+        if self._por_precio is not None:
+            self._por_precio.quitar((p.precio, producto_id))
+            self._por_precio.agregar((nuevo_precio, producto_id))
         p.precio = nuevo_precio
+        self._marcar_sucio(producto_id)
+        return True
+
+    def actualizar_nombre(self, producto_id: str, nuevo_nombre: str) -> bool:
+        """Cambia el nombre de un producto (y lo reindexa para las búsquedas)."""
+        p = self.productos.get(producto_id)
+        if not p:
+            return False
+        p.nombre = nuevo_nombre
+        self._marcar_sucio(producto_id)
+        if self._indice_nombres is not None:
+            self._indice_nombres.agregar(producto_id, nuevo_nombre)
         return True
 
     def buscar_por_nombre(self, nombre: str) -> List[Producto]:
-        """Busca productos que contengan la cadena 'nombre' (búsqueda case-insensitive y parcial)."""
-        nombre_lower = nombre.lower()
-        return [p for p in self.productos.values() if nombre_lower in p.nombre.lower()]
+        """Busca productos que contengan la cadena 'nombre' (búsqueda parcial, sin distinguir
+        mayúsculas ni tildes: "lapiz" encuentra "Lápiz"). Usa el índice de trigramas.
+        """
+        return [self.productos[pid] for pid in self._indice().buscar(nombre)]
+
+    def buscar_por_rango_cantidad(self, minimo: Optional[int] = None, maximo: Optional[int] = None,
+                                  incluir_maximo: bool = True) -> List[Producto]:
+        """Productos con minimo <= cantidad <= maximo (o < maximo si incluir_maximo es
+        False), ordenados por cantidad y luego por ID. None deja ese extremo abierto:
+        buscar_por_rango_cantidad(maximo=10, incluir_maximo=False) es la lista de reposición.
+        Cuesta O(log n + k), con k la cantidad de resultados.
+        """
+        return self._buscar_rango(self._orden_cantidad(), minimo, maximo, incluir_maximo)
+
+    def buscar_por_rango_precio(self, minimo: Optional[float] = None, maximo: Optional[float] = None,
+                                incluir_maximo: bool = True) -> List[Producto]:
+        """Productos con minimo <= precio <= maximo, como `buscar_por_rango_cantidad`."""
+        return self._buscar_rango(self._orden_precio(), minimo, maximo, incluir_maximo)
+
+    def _buscar_rango(self, orden: ListaOrdenada, minimo: Any, maximo: Any, incluir_maximo: bool) -> List[Producto]:
+        # (minimo,) es menor que cualquier par (minimo, id): se empieza en el primero >= minimo
+        pares = orden.iterar_desde(None if minimo is None else (minimo,))
+        if maximo is not None:
+            pares = takewhile((lambda par: par[0] <= maximo) if incluir_maximo else (lambda par: par[0] < maximo),
+                              pares)
+        productos = self.productos
+        return [productos[pid] for _, pid in pares]
 
     def mostrar_todos(self) -> List[Producto]:
         """Devuelve una lista de todos los productos ordenados por ID."""
-        return [self.productos[k] for k in sorted(self.productos.keys())]
+        return [self.productos[k] for k in self._orden_ids()]
+
+    def iterar_ordenados(self, desde_id: Optional[str] = None, incluir_inicio: bool = True) -> Iterator[Producto]:
+        """Recorre los productos ordenados por ID a partir de `desde_id`, sin armar una lista."""
+        productos = self.productos
+        return (productos[k] for k in self._orden_ids().iterar_desde(desde_id, incluir_inicio))
+
+    def listar_desde(self, desde_id: Optional[str] = None, limite: int = 20,
+                     incluir_inicio: bool = True) -> List[Producto]:
+        """Una página de hasta `limite` productos ordenados por ID, empezando en `desde_id`.
+        Para la página siguiente: listar_desde(ultimo.id, limite, incluir_inicio=False).
+        """
+        return list(islice(self.iterar_ordenados(desde_id, incluir_inicio), limite))
 
     # ---------- Persistencia en archivos (serialización JSON) ----------
-    def guardar_en_archivo(self) -> None:
-        """Serializa el inventario y lo guarda en self.storage_path (JSON)."""
-        data = {pid: p.to_dict() for pid, p in self.productos.items()}
-        with open(self.storage_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+    #
+    # inventory.json es la base completa; inventory.json.delta (JSON-lines) guarda solo
+    # los cambios posteriores, uno por línea:
+    #     {"op": "put", "producto": {"id": ..., "nombre": ..., "cantidad": ..., "precio": ...}}
+    #     {"op": "del", "id": ...}
+    # Guardar anexa al .delta los productos cambiados; cuando el .delta crece demasiado
+    # se compacta (se reescribe la base y se borra el .delta).
+
+    def guardar_en_archivo(self) -> str:
+        """Guarda los cambios desde el último guardado. Su costo depende de la cantidad de
+        cambios, no del tamaño del inventario; cada tanto compacta en self.storage_path.
+        Devuelve qué hizo: "delta", "compactado" o "sin cambios".
+        """
+        if self._reemplazado or not os.path.exists(self.storage_path):
+            self.compactar()
+            return "compactado"
+        if not self.cambios_pendientes():
+            return "sin cambios"
+        self._anexar_delta()
+        if self._registros_delta >= self.max_registros_delta or self._registros_delta > len(self.productos):
+            self.compactar()
+            return "compactado"
+        return "delta"
+
+    def _anexar_delta(self) -> None:
+        productos = self.productos
+        lineas = [json.dumps({"op": "put", "producto": productos[pid].to_dict()}, ensure_ascii=False)
+                  for pid in self._sucios]
+        lineas.extend(json.dumps({"op": "del", "id": pid}, ensure_ascii=False) for pid in self._eliminados)
+        with open(self.ruta_delta, "a", encoding="utf-8") as f:
+            if self._delta_cortado:
+                f.write("\n")  # no pegar el registro nuevo a una línea cortada
+                self._delta_cortado = False
+            f.write("\n".join(lineas) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._registros_delta += len(lineas)
+        self._sucios.clear()
+        self._eliminados.clear()
+
+    def compactar(self) -> None:
+        """Reescribe el inventario completo en self.storage_path y vacía el .delta.
+
+        La base se escribe en un archivo temporal, se sincroniza con el disco (fsync) y
+        reemplaza a la anterior de forma atómica: un corte deja la base vieja o la nueva,
+        nunca una a medias. Antes, los cambios pendientes se anexan al .delta: si el
+        programa se corta antes de borrarlo, volver a aplicarlo sobre la base nueva deja
+        el mismo resultado.
+        """
+        if self._reemplazado:
+            # El .delta describe cambios sobre la base anterior, que se va a sustituir
+            if os.path.exists(self.ruta_delta):
+                os.remove(self.ruta_delta)
+        elif self.cambios_pendientes() and os.path.exists(self.storage_path):
+            self._anexar_delta()
+        carpeta = os.path.dirname(os.path.abspath(self.storage_path))
+        fd, temporal = tempfile.mkstemp(dir=carpeta, suffix=".tmp")
+        os.close(fd)
+        try:
+            escribir_productos(temporal, self.productos.items(), self.codec)
+            fd = os.open(temporal, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(temporal, self.storage_path)
+        except BaseException:
+            os.remove(temporal)
+            raise
+        if os.path.exists(self.ruta_delta):
+            os.remove(self.ruta_delta)
+        self._registros_delta = 0
+        self._delta_cortado = False
+        self._sucios.clear()
+        self._eliminados.clear()
+        self._reemplazado = False
 
     def cargar_desde_archivo(self) -> None:
-        """Carga el inventario desde self.storage_path. Si el archivo no existe, no lanza error."""
-        if not os.path.exists(self.storage_path):
+        """Carga el inventario desde self.storage_path y le aplica los cambios del .delta.
+        Si no existe ninguno de los dos, no lanza error. Las líneas del .delta que no se
+        pueden leer (p. ej. cortadas por un cierre inesperado) se ignoran y se anotan en
+        self.advertencias_carga.
+        """
+        self.advertencias_carga = []
+        hay_base = os.path.exists(self.storage_path)
+        if not hay_base and not os.path.exists(self.ruta_delta):
             return
-        with open(self.storage_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # data es un dict: { id: {id, nombre, cantidad, precio} }
-        self.productos = {pid: Producto.from_dict(prod) for pid, prod in data.items()}
+        # El archivo se lee por partes, en el codec que tenga (json, posicional, gzip, ...)
+        productos = dict(leer_productos(self.storage_path)) if hay_base else {}
+        if hay_base and not self._codec_fijo:
+            codec = detectar_codec(self.storage_path)
+            self.codec = codec if codec in CODECS else "json"
+        registros = 0
+        self._delta_cortado = False
+        if os.path.exists(self.ruta_delta):
+            with open(self.ruta_delta, "r", encoding="utf-8") as f:
+                for num, linea in enumerate(f, start=1):
+                    self._delta_cortado = not linea.endswith("\n")
+                    if not linea.strip():
+                        continue
+                    try:
+                        registro = json.loads(linea)
+                        if registro["op"] == "put":
+                            p = Producto.from_dict(registro["producto"])
+                            productos[p.id] = p
+                        elif registro["op"] == "del":
+                            productos.pop(registro["id"], None)
+                        else:
+                            raise ValueError(f"operación desconocida {registro['op']!r}")
+                    except (ValueError, KeyError, TypeError) as e:
+                        self.advertencias_carga.append(f"{self.ruta_delta}, línea {num}: {e}. Se ignora.")
+                        continue
+                    registros += 1
+        self.productos = productos
+        self._reemplazado = not hay_base  # sin base, el próximo guardado la crea completa
+        self._registros_delta = registros
+        self._sucios.clear()
+        self._eliminados.clear()
+
+
+# ---------- Autoguardado en segundo plano ----------
+
+@dataclass
+class InformeGuardado:
+    """Resultado de un guardado hecho por AutoGuardado."""
+    momento: float          # time.time() al terminar
+    segundos: float         # duración del guardado
+    modificaciones: int     # operaciones que cubrió (diferencia de Inventario.version)
+    productos: int          # productos distintos modificados o eliminados
+    tipo: str               # "delta", "compactado" o "sin cambios"
+    motivo: str             # "espera", "máximo", "manual" o "final"
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self.error:
+            return f"Falló el guardado ({self.motivo}): {self.error}"
+        return (f"{self.modificaciones} cambio(s) en {self.productos} producto(s) guardados en "
+                f"{self.segundos * 1000:.1f} ms ({self.tipo}, {self.motivo})")
+
+
+class AutoGuardado:
+    """Guarda el inventario desde un hilo en segundo plano cuando tiene cambios.
+
+    Después de una modificación espera `espera` segundos sin cambios nuevos (así una
+    ráfaga de cambios se guarda una sola vez), pero nunca deja pasar más de `maximo`
+    segundos desde el primer cambio sin guardar. Si un guardado falla, se reintenta
+    después de otra `espera`.
+
+    El hilo y el programa comparten el inventario, así que cada modificación debe
+    hacerse dentro de `with autoguardado.cambio():`, que toma `self.lock` (el mismo que
+    se toma para guardar) y avisa al hilo. Mientras se guarda, las modificaciones esperan.
+    """
+
+    def __init__(self, inventario: Inventario, espera: float = 2.0, maximo: float = 30.0,
+                 historial: int = 100) -> None:
+        if espera < 0 or maximo < espera:
+            raise ValueError("Se necesita 0 <= espera <= maximo.")
+        self.inventario = inventario
+        self.espera = espera
+        self.maximo = maximo
+        self.lock = threading.RLock()
+        self.informes: deque = deque(maxlen=historial)
+        self._condicion = threading.Condition()
+        self._primer_cambio: Optional[float] = None   # time.monotonic() de los cambios sin guardar
+        self._ultimo_cambio: Optional[float] = None
+        self._version_guardada = inventario.version
+        self._no_leidos = 0
+        self._activo = False
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> None:
+        if self._hilo is not None:
+            return
+        self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, name="autoguardado", daemon=True)
+        self._hilo.start()
+
+    def detener(self, guardar: bool = True) -> Optional[InformeGuardado]:
+        """Detiene el hilo y, si `guardar`, guarda lo que haya quedado pendiente."""
+        if self._hilo is not None:
+            with self._condicion:
+                self._activo = False
+                self._condicion.notify()
+            self._hilo.join()
+            self._hilo = None
+        if guardar and self.pendientes():
+            return self.guardar_ahora("final")
+        return None
+
+    @contextmanager
+    def cambio(self) -> Iterator[None]:
+        """Bloque para modificar el inventario; al salir programa el guardado si hubo cambios."""
+        with self.lock:
+            yield
+            hubo_cambios = self.inventario.version != self._version_guardada
+        if hubo_cambios:
+            ahora = time.monotonic()
+            with self._condicion:
+                if self._primer_cambio is None:
+                    self._primer_cambio = ahora
+                self._ultimo_cambio = ahora
+                self._condicion.notify()
+
+    def pendientes(self) -> int:
+        """Modificaciones aún no guardadas."""
+        return self.inventario.version - self._version_guardada
+
+    def sincronizado(self) -> None:
+        """Avisa que el inventario ya coincide con el disco (p. ej. después de recargarlo)."""
+        with self.lock:
+            self._version_guardada = self.inventario.version
+            with self._condicion:
+                self._primer_cambio = self._ultimo_cambio = None
+
+    def guardar_ahora(self, motivo: str = "manual") -> InformeGuardado:
+        with self.lock:
+            inv = self.inventario
+            version = inv.version
+            productos = inv.cambios_pendientes()
+            inicio = time.perf_counter()
+            try:
+                tipo = inv.guardar_en_archivo()
+                error = None
+            except Exception as e:  # p. ej. disco lleno o sin permisos: se reintenta
+                tipo, error = "error", f"{type(e).__name__}: {e}"
+            informe = InformeGuardado(time.time(), time.perf_counter() - inicio, version - self._version_guardada,
+                                      productos, tipo, motivo, error)
+            with self._condicion:
+                if error is None:
+                    self._version_guardada = version
+                    self._primer_cambio = self._ultimo_cambio = None
+                elif self._primer_cambio is not None:
+                    self._ultimo_cambio = time.monotonic()  # reintentar tras otra espera
+                    self._primer_cambio = self._ultimo_cambio - self.maximo + self.espera
+                self.informes.append(informe)
+                self._no_leidos += 1
+        return informe
+
+    def informes_nuevos(self) -> List[InformeGuardado]:
+        """Informes de guardados que todavía no se consultaron (los más recientes al final)."""
+        with self._condicion:
+            nuevos = list(self.informes)[-self._no_leidos:] if self._no_leidos else []
+            self._no_leidos = 0
+        return nuevos
+
+    def _bucle(self) -> None:
+        while True:
+            with self._condicion:
+                if not self._activo:
+                    return
+                if self._primer_cambio is None:
+                    self._condicion.wait()
+                    continue
+                por_espera = self._ultimo_cambio + self.espera
+                por_maximo = self._primer_cambio + self.maximo
+                restante = min(por_espera, por_maximo) - time.monotonic()
+                if restante > 0:
+                    self._condicion.wait(restante)
+                    continue
+                motivo = "espera" if por_espera <= por_maximo else "máximo"
+            self.guardar_ahora(motivo)
+
+
+# ---------- Servidor de red (asyncio) ----------
+#
+# Protocolo: una solicitud JSON por línea y una respuesta JSON por línea, en el mismo
+# orden. Las operaciones (con alias en español) y sus campos:
+#   {"op": "add", "id": "P1", "nombre": "Lápiz", "cantidad": 10, "precio": 0.5}
+#   {"op": "update", "id": "P1", "cantidad": 8}      (cantidad, precio y/o nombre)
+#   {"op": "delete", "id": "P1"}
+#   {"op": "get", "id": "P1"}
+#   {"op": "search", "texto": "lapiz", "limite": 100}
+#   {"op": "list", "desde": "P1", "incluir_inicio": false, "limite": 100}
+#   {"op": "range", "campo": "cantidad", "minimo": 0, "maximo": 10, "incluir_maximo": false}
+#   {"op": "save"}
+# Respuesta: {"op": ..., "ok": true/false, "mensaje": ..., "producto" o "productos": ...}.
+# Si la solicitud trae "num", se devuelve igual en la respuesta.
+#
+# Un cliente puede enviar muchas solicitudes sin esperar las respuestas (pipelining).
+# Las consultas se responden sin esperar a nadie; las modificaciones se aplican de a una
+# (un asyncio.Lock) y se responden cuando quedaron guardadas: los cambios que llegan
+# mientras se guarda se guardan juntos en la vuelta siguiente (una escritura para varios).
+
+OPERACIONES_SERVIDOR = {
+    "add": "add", "agregar": "add", "añadir": "add",
+    "update": "update", "actualizar": "update",
+    "delete": "delete", "eliminar": "delete",
+    "get": "get", "obtener": "get",
+    "search": "search", "buscar": "search",
+    "list": "list", "listar": "list",
+    "range": "range", "rango": "range",
+    "save": "save", "guardar": "save",
+}
+MODIFICACIONES = {"add", "update", "delete"}
+
+
+class ServidorInventario:
+    """Atiende a varios clientes sobre un único Inventario (ver el protocolo arriba)."""
+
+    MAX_EN_VUELO = 256    # respuestas pendientes por conexión antes de dejar de leer
+    LIMITE_RESULTADOS = 1000
+    LIMITE_LINEA = 1024 * 1024
+
+    def __init__(self, inventario: Inventario, persistir: bool = True) -> None:
+        self.inventario = inventario
+        self.persistir = persistir
+        self._escritura = asyncio.Lock()
+        self._vuelta: Optional[asyncio.Future] = None  # guardado al que se suman los cambios
+        self._tareas: set = set()
+        self.solicitudes = 0
+        self.guardados = 0
+
+    async def escuchar_tcp(self, host: str, puerto: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.atender, host, puerto, limit=self.LIMITE_LINEA)
+
+    async def escuchar_unix(self, ruta: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.atender, ruta, limit=self.LIMITE_LINEA)
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Una conexión: lee solicitudes en orden y encola las respuestas para `_responder`."""
+        cola: asyncio.Queue = asyncio.Queue(self.MAX_EN_VUELO)
+        respuestas = asyncio.create_task(self._responder(cola, escritor))
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except ValueError:  # línea más larga que LIMITE_LINEA
+                    await cola.put(({"ok": False, "mensaje": "Solicitud demasiado larga."}, None))
+                    break
+                except ConnectionError:
+                    break
+                if not linea:
+                    break
+                if linea.strip():
+                    await cola.put(await self._procesar(linea))
+        finally:
+            await cola.put(None)
+            await respuestas
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _responder(self, cola: asyncio.Queue, escritor: asyncio.StreamWriter) -> None:
+        conectado = True
+        while True:
+            elemento = await cola.get()
+            if elemento is None:
+                break
+            respuesta, guardado = elemento
+            if guardado is not None:
+                try:
+                    await guardado
+                except Exception as e:
+                    respuesta["ok"] = False
+                    respuesta["mensaje"] = f"El cambio se aplicó pero no se pudo guardar: {e}"
+            if not conectado:
+                continue  # se sigue vaciando la cola para no bloquear a `atender`
+            escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+            if cola.empty():
+                try:
+                    await escritor.drain()
+                except ConnectionError:
+                    conectado = False
+
+    async def _procesar(self, linea: bytes) -> Tuple[Dict[str, Any], Optional[Any]]:
+        """Devuelve (respuesta, guardado): `guardado` es None o lo que hay que esperar
+        antes de enviar la respuesta (las modificaciones esperan a quedar en disco).
+        """
+        self.solicitudes += 1
+        try:
+            datos = json.loads(linea)
+        except ValueError as e:
+            return {"ok": False, "mensaje": f"JSON inválido: {e}"}, None
+        if not isinstance(datos, dict):
+            return {"ok": False, "mensaje": "Se esperaba un objeto JSON."}, None
+        op = OPERACIONES_SERVIDOR.get(str(datos.get("op", "")).strip().lower())
+        respuesta: Dict[str, Any] = {"op": op}
+        if "num" in datos:
+            respuesta["num"] = datos["num"]
+        if op is None:
+            respuesta.update(ok=False, mensaje=f"Operación desconocida: {datos.get('op')!r}.")
+            return respuesta, None
+        guardado = None
+        try:
+            if op in MODIFICACIONES:
+                async with self._escritura:
+                    respuesta.update(self._modificar(op, datos))
+                if respuesta["ok"] and self.persistir:
+                    guardado = self._guardar_pronto()
+            elif op == "save":
+                respuesta["ok"] = True
+                guardado = self._guardar_pronto()
+            else:
+                respuesta.update(self._consultar(op, datos))
+        except KeyError as e:
+            respuesta.update(ok=False, mensaje=f"Solicitud inválida: falta el campo {e}.")
+        except (ValueError, TypeError) as e:
+            respuesta.update(ok=False, mensaje=f"Solicitud inválida: {e}.")
+        return respuesta, guardado
+
+    def _modificar(self, op: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        inv = self.inventario
+        pid = str(datos["id"]).strip()
+        if not pid:
+            raise ValueError("falta el id")
+        if op == "add":
+            nombre = str(datos["nombre"]).strip()
+            if not nombre:
+                raise ValueError("falta el nombre")
+            p = Producto.from_dict({"id": pid, "nombre": nombre, "cantidad": datos["cantidad"],
+                                    "precio": datos["precio"]})
+            if inv.añadir_producto(p):
+                return {"ok": True}
+            return {"ok": False, "mensaje": "Ya existe un producto con ese ID."}
+        if pid not in inv.productos:
+            return {"ok": False, "mensaje": "No existe producto con ese ID."}
+        if op == "delete":
+            inv.eliminar_producto(pid)
+            return {"ok": True}
+        # update: se validan todos los campos antes de cambiar ninguno
+        cantidad = entero_estricto(datos["cantidad"], "cantidad") if datos.get("cantidad") is not None else None
+        precio = float(datos["precio"]) if datos.get("precio") is not None else None
+        nombre = str(datos["nombre"]).strip() if datos.get("nombre") is not None else None
+        if cantidad is None and precio is None and not nombre:
+            raise ValueError("no hay nada que actualizar (cantidad, precio o nombre)")
+        if cantidad is not None:
+            inv.actualizar_cantidad(pid, cantidad)
+        if precio is not None:
+            inv.actualizar_precio(pid, precio)
+        if nombre:
+            inv.actualizar_nombre(pid, nombre)
+        return {"ok": True, "producto": inv.productos[pid].to_dict()}
+
+    def _consultar(self, op: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        inv = self.inventario
+        limite = max(0, min(int(datos.get("limite", 100)), self.LIMITE_RESULTADOS))
+        if op == "get":
+            p = inv.productos.get(str(datos["id"]).strip())
+            if p is None:
+                return {"ok": False, "mensaje": "No existe producto con ese ID."}
+            return {"ok": True, "producto": p.to_dict()}
+        if op == "search":
+            encontrados = inv.buscar_por_nombre(str(datos["texto"]))
+            return {"ok": True, "total": len(encontrados), "productos": [p.to_dict() for p in encontrados[:limite]]}
+        if op == "list":
+            desde = datos.get("desde")
+            pagina = inv.listar_desde(None if desde is None else str(desde), limite,
+                                      bool(datos.get("incluir_inicio", True)))
+            return {"ok": True, "productos": [p.to_dict() for p in pagina]}
+        # range
+        campo = datos.get("campo", "cantidad")
+        if campo == "cantidad":
+            buscar = inv.buscar_por_rango_cantidad
+        elif campo == "precio":
+            buscar = inv.buscar_por_rango_precio
+        else:
+            raise ValueError(f"campo de rango desconocido {campo!r} (cantidad o precio)")
+        encontrados = buscar(datos.get("minimo"), datos.get("maximo"), bool(datos.get("incluir_maximo", True)))
+        return {"ok": True, "total": len(encontrados), "productos": [p.to_dict() for p in encontrados[:limite]]}
+
+    def _guardar_pronto(self) -> Any:
+        """Suma los cambios ya aplicados al próximo guardado y devuelve algo que esperar."""
+        if self._vuelta is None:
+            self._vuelta = asyncio.get_running_loop().create_future()
+            tarea = asyncio.create_task(self._guardar(self._vuelta))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+        return asyncio.shield(self._vuelta)
+
+    async def _guardar(self, vuelta: asyncio.Future) -> None:
+        # Con el lock tomado no entran modificaciones; las consultas siguen respondiéndose
+        # mientras el guardado corre en otro hilo.
+        async with self._escritura:
+            self._vuelta = None  # lo que llegue desde ahora va a la vuelta siguiente
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.inventario.guardar_en_archivo)
+            except Exception as e:
+                vuelta.set_exception(e)
+                vuelta.exception()  # marcada como vista: cada respuesta informa el error
+            else:
+                self.guardados += 1
+                vuelta.set_result(None)
+
+    async def terminar(self) -> None:
+        """Espera el guardado en curso, si lo hay, y guarda lo que quede pendiente."""
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+        if self.persistir:
+            async with self._escritura:
+                await asyncio.get_running_loop().run_in_executor(None, self.inventario.guardar_en_archivo)
+
+
+def ejecutar_servidor(inv: Inventario, tcp: Optional[Tuple[str, int]] = None, unix: Optional[str] = None) -> None:
+    """Atiende clientes hasta Ctrl+C (o SIGTERM) y guarda al terminar."""
+    async def servir() -> None:
+        servidor = ServidorInventario(inv)
+        if unix is not None:
+            red = await servidor.escuchar_unix(unix)
+            direccion = unix
+        else:
+            red = await servidor.escuchar_tcp(*tcp)
+            host, puerto = red.sockets[0].getsockname()[:2]
+            direccion = f"{host}:{puerto}"
+        print(f"Servidor escuchando en {direccion}", flush=True)
+        detener = asyncio.Event()
+        bucle = asyncio.get_running_loop()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                bucle.add_signal_handler(senal, detener.set)
+            except (NotImplementedError, RuntimeError):  # Windows
+                pass
+        async with red:
+            try:
+                await detener.wait()
+            finally:
+                red.close()
+                await servidor.terminar()
+        print(f"Servidor detenido: {servidor.solicitudes} solicitudes, {servidor.guardados} guardados.")
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
 
 
 # ---------- Interfaz de consola / menú interactivo ----------
@@ -117,6 +1336,9 @@ Seleccionar una opción:
 """
 
 
+TAMANO_PAGINA = 50
+
+
 def leer_no_vacio(prompt: str) -> str:
     while True:
         valor = input(prompt).strip()
@@ -145,13 +1367,61 @@ def imprimir_producto(p: Producto) -> None:
     print(f"ID: {p.id} | Nombre: {p.nombre} | Cantidad: {p.cantidad} | Precio: {p.precio:.2f}")
 
 
-def main():
-    inv = Inventario()
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Sistema Avanzado de Gestión de Inventario (SEMANA 11)")
+    parser.add_argument("--archivo", default="inventory.json", help="archivo del inventario")
+    red = parser.add_mutually_exclusive_group()
+    red.add_argument("--servidor", metavar="HOST:PUERTO",
+                     help="en lugar del menú, atender clientes por TCP (puerto 0 = uno libre)")
+    red.add_argument("--unix", metavar="RUTA", help="en lugar del menú, atender clientes por un socket Unix")
+    parser.add_argument("--autoguardado", type=float, default=2.0, metavar="SEGUNDOS",
+                        help="en el menú, guardar tras estos segundos sin cambios nuevos (por defecto 2)")
+    parser.add_argument("--autoguardado-maximo", type=float, default=30.0, metavar="SEGUNDOS",
+                        help="y nunca dejar cambios sin guardar más de estos segundos (por defecto 30)")
+    parser.add_argument("--sin-autoguardado", action="store_true", help="guardar solo con la opción 7 o al salir")
+    args = parser.parse_args(argv)
+    if not 0 <= args.autoguardado <= args.autoguardado_maximo:
+        parser.error("se necesita 0 <= --autoguardado <= --autoguardado-maximo")
+    tcp = None
+    if args.servidor:
+        host, _, puerto = args.servidor.rpartition(":")
+        if not puerto.isdigit():
+            parser.error("--servidor espera HOST:PUERTO, p. ej. 127.0.0.1:8765")
+        tcp = (host or "127.0.0.1", int(puerto))
+
+    inv = Inventario(args.archivo)
     # Cargar archivo al inicio si existe (comportamiento típico)
     inv.cargar_desde_archivo()
-    print("Inventario cargado desde:", inv.storage_path)
+    print("Inventario cargado desde:", inv.storage_path, f"(formato: {inv.codec})")
+    for advertencia in inv.advertencias_carga:
+        print("Advertencia:", advertencia)
+    if tcp is not None or args.unix:
+        ejecutar_servidor(inv, tcp=tcp, unix=args.unix)
+        return
+
+    auto = None
+    if not args.sin_autoguardado:
+        auto = AutoGuardado(inv, espera=args.autoguardado, maximo=args.autoguardado_maximo)
+        auto.iniciar()
+        print(f"Autoguardado activo: {auto.espera:g} s después del último cambio, "
+              f"como máximo {auto.maximo:g} s después del primero.")
+    try:
+        menu(inv, auto)
+    except (KeyboardInterrupt, EOFError):
+        # Salida inesperada: no perder lo que el autoguardado no alcanzó a guardar
+        if auto is not None:
+            informe = auto.detener(guardar=True)
+            print(f"\nAutoguardado: {informe}" if informe else "\nNo había cambios sin guardar.")
+        print("\nSaliendo...")
 
+
+def menu(inv: Inventario, auto: Optional[AutoGuardado] = None) -> None:
+    # Las modificaciones van dentro de `cambio()` para coordinarse con el autoguardado
+    cambio = auto.cambio if auto is not None else nullcontext
     while True:
+        if auto is not None:
+            for informe in auto.informes_nuevos():
+                print("[Autoguardado]", informe)
         print(MENU)
         opcion = input("Opción: ").strip()
 
@@ -161,14 +1431,18 @@ def main():
             cantidad = leer_int("Cantidad (entera): ")
             precio = leer_float("Precio unitario: ")
             producto = Producto(id=pid, nombre=nombre, cantidad=cantidad, precio=precio)
-            if inv.añadir_producto(producto):
+            with cambio():
+                añadido = inv.añadir_producto(producto)
+            if añadido:
                 print("Producto añadido correctamente.")
             else:
                 print("Error: ya existe un producto con ese ID.")
 
         elif opcion == "2":
             pid = leer_no_vacio("ID del producto a eliminar: ")
-            if inv.eliminar_producto(pid):
+            with cambio():
+                eliminado = inv.eliminar_producto(pid)
+            if eliminado:
                 print("Producto eliminado.")
             else:
                 print("No existe producto con ese ID.")
@@ -179,8 +1453,9 @@ def main():
                 print("No existe producto con ese ID.")
             else:
                 nueva = leer_int("Nueva cantidad (entera): ")
-                inv.actualizar_cantidad(pid, nueva)
-                print("Cantidad actualizada.")
+                with cambio():
+                    actualizado = inv.actualizar_cantidad(pid, nueva)
+                print("Cantidad actualizada." if actualizado else "No existe producto con ese ID.")
 
         elif opcion == "4":
             pid = leer_no_vacio("ID del producto a actualizar precio: ")
@@ -188,8 +1463,9 @@ def main():
                 print("No existe producto con ese ID.")
             else:
                 nuevo = leer_float("Nuevo precio unitario: ")
-                inv.actualizar_precio(pid, nuevo)
-                print("Precio actualizado.")
+                with cambio():
+                    actualizado = inv.actualizar_precio(pid, nuevo)
+                print("Precio actualizado." if actualizado else "No existe producto con ese ID.")
 
         elif opcion == "5":
             nombre_busq = leer_no_vacio("Nombre o parte del nombre a buscar: ")
@@ -202,28 +1478,49 @@ def main():
                     imprimir_producto(p)
 
         elif opcion == "6":
-            todos = inv.mostrar_todos()
-            if not todos:
+            if not inv.productos:
                 print("El inventario está vacío.")
             else:
-                print(f"Inventario ({len(todos)} productos):")
-                for p in todos:
-                    imprimir_producto(p)
+                # Se muestra por páginas, sin armar la lista completa
+                print(f"Inventario ({len(inv.productos)} productos):")
+                pagina = inv.listar_desde(limite=TAMANO_PAGINA)
+                while pagina:
+                    for p in pagina:
+                        imprimir_producto(p)
+                    if len(pagina) < TAMANO_PAGINA:
+                        break
+                    if input("Enter = página siguiente, q = volver al menú: ").strip().lower() == "q":
+                        break
+                    pagina = inv.listar_desde(pagina[-1].id, TAMANO_PAGINA, incluir_inicio=False)
 
         elif opcion == "7":
-            inv.guardar_en_archivo()
-            print(f"Inventario guardado en {inv.storage_path}.")
+            if auto is not None:
+                informe = auto.guardar_ahora()
+                auto.informes_nuevos()  # ya se muestra aquí
+                print(informe if informe.error else f"Inventario guardado en {inv.storage_path}: {informe}.")
+            else:
+                inv.guardar_en_archivo()
+                print(f"Inventario guardado en {inv.storage_path}.")
 
         elif opcion == "8":
-            inv.cargar_desde_archivo()
+            with cambio():
+                inv.cargar_desde_archivo()  # descarta los cambios sin guardar
+                if auto is not None:
+                    auto.sincronizado()
             print(f"Inventario recargado desde {inv.storage_path}.")
+            for advertencia in inv.advertencias_carga:
+                print("Advertencia:", advertencia)
 
         elif opcion == "9":
-            # Guardar antes de salir (opcional: preguntar al usuario)
-            guardar = input("¿Desea guardar el inventario antes de salir? (s/n): ").strip().lower()
-            if guardar == "s":
-                inv.guardar_en_archivo()
-                print("Inventario guardado.")
+            if auto is not None:
+                auto.detener(guardar=False)
+            # Guardar antes de salir (opcional: preguntar al usuario). Con autoguardado
+            # solo se pregunta si quedaron cambios sin guardar.
+            if auto is None or inv.cambios_pendientes():
+                guardar = input("¿Desea guardar el inventario antes de salir? (s/n): ").strip().lower()
+                if guardar == "s":
+                    inv.guardar_en_archivo()
+                    print("Inventario guardado.")
             print("Saliendo...")
             break
 
@@ -5,14 +5,23 @@
 Se realizo el Sistema simple de Gestión de Biblioteca Digital
 Esto Cumple con:
 - Libro: usa tupla para (titulo, autor)
-- Usuario: lista de libros prestados
-- Biblioteca: dict para libros por ISBN, set para IDs de usuarios
+- Usuario: libros prestados en orden de préstamo (dict usado como conjunto ordenado)
+- Biblioteca: dict para libros por ISBN, set para IDs de usuarios, índice invertido
+  de palabras para buscar por título y autor, índice y conteos por categoría
 - Funcionalidades: añadir/quitar libros, registrar/dar de baja usuarios,
-  prestar/devolver libros, búsquedas y listar préstamos.
+  prestar/devolver libros (uno a uno o en lotes de todo o nada), búsquedas y listar préstamos.
+- Persistencia opcional (Biblioteca.abrir): instantánea + registro de eventos en una carpeta.
 """
 
 from dataclasses import dataclass, field
-from typing import Tuple, Dict, List, Set, Optional
+from typing import Tuple, Dict, Iterable, List, Set, Optional
+import gc
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
 
 
 @dataclass(frozen=True)
@@ -45,20 +54,22 @@ class Usuario:
     Representa un usuario de la biblioteca.
     - nombre: nombre del usuario.
     - user_id: identificador único (debe gestionarlo Biblioteca).
-    - prestados: lista de ISBNs de libros actualmente prestados a este usuario.
+    - prestados: ISBNs de libros actualmente prestados a este usuario, en el orden en
+      que se prestaron. Es un dict {isbn: None} usado como conjunto ordenado: agregar,
+      buscar y quitar cuestan O(1) aunque el usuario tenga miles de préstamos.
     """
     nombre: str
     user_id: str
-    prestados: List[str] = field(default_factory=list)
+    prestados: Dict[str, None] = field(default_factory=dict)
 
     def prestar(self, isbn: str) -> None:
-        """Añade ISBN a la lista de prestados (no verifica aquí disponibilidad)."""
-        self.prestados.append(isbn)
+        """Añade ISBN a los prestados (no verifica aquí disponibilidad)."""
+        self.prestados[isbn] = None
 
     def devolver(self, isbn: str) -> bool:
-        """Quita ISBN de la lista de prestados; devuelve True si estaba y se quitó."""
+        """Quita ISBN de los prestados; devuelve True si estaba y se quitó."""
         if isbn in self.prestados:
-            self.prestados.remove(isbn)
+            del self.prestados[isbn]
             return True
         return False
 
@@ -69,6 +80,102 @@ class Usuario:
         return f"{self.nombre} (ID: {self.user_id}) - Prestados: {len(self.prestados)}"
 
 
+_PALABRA = re.compile(r"\w+")
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas y sin tildes ni diacríticos: "Álgebra" -> "algebra"."""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Palabras normalizadas de un texto: "Cien Años de Soledad" -> [cien, anos, de, soledad]."""
+    return _PALABRA.findall(normalizar_texto(texto))
+
+
+class IndiceInvertido:
+    """Índice invertido: cada palabra (normalizada) -> ISBNs de los libros que la tienen.
+
+    Buscar varias palabras intersecta sus conjuntos empezando por el más chico, así que
+    el costo depende del tamaño de esos conjuntos y no del total de libros.
+    """
+
+    def __init__(self) -> None:
+        self._listas: Dict[str, Set[str]] = {}
+
+    def agregar(self, isbn: str, texto: str) -> None:
+        listas = self._listas
+        for palabra in tokenizar(texto):
+            lista = listas.get(palabra)
+            if lista is None:
+                listas[palabra] = {isbn}
+            else:
+                lista.add(isbn)
+
+    def quitar(self, isbn: str, texto: str) -> None:
+        for palabra in tokenizar(texto):
+            lista = self._listas.get(palabra)
+            if lista is not None:
+                lista.discard(isbn)
+                if not lista:
+                    del self._listas[palabra]
+
+    def buscar_palabras(self, palabras: Iterable[str]) -> Set[str]:
+        """ISBNs que tienen todas las palabras (exactas)."""
+        listas = sorted((self._listas.get(p, set()) for p in set(palabras)), key=len)
+        if not listas:
+            return set()
+        resultado = set(listas[0])
+        for lista in listas[1:]:
+            resultado &= lista
+            if not resultado:
+                break
+        return resultado
+
+    def candidatos_subcadena(self, palabras: Iterable[str]) -> Set[str]:
+        """ISBNs con alguna palabra que contenga a cada una de `palabras` (p. ej. "sol" ->
+        "soledad"). Recorre el vocabulario, no los libros. Es un superconjunto de los
+        libros cuyo texto contiene la consulta completa, que luego se verifica.
+        """
+        resultado: Optional[Set[str]] = None
+        for parte in sorted(set(palabras), key=len, reverse=True):  # las largas filtran más
+            coincidencias: Set[str] = set()
+            for palabra, lista in self._listas.items():
+                if parte in palabra:
+                    coincidencias |= lista
+            resultado = coincidencias if resultado is None else resultado & coincidencias
+            if not resultado:
+                break
+        return resultado or set()
+
+
+@dataclass(frozen=True)
+class FacetaCategoria:
+    """Conteo de libros de una categoría (para la portada del catálogo)."""
+    categoria: str
+    total: int
+    prestados: int
+
+    @property
+    def disponibles(self) -> int:
+        return self.total - self.prestados
+
+
+@dataclass(frozen=True)
+class FalloLote:
+    """Por qué no se puede aplicar un par (isbn, user_id) de un lote de préstamos o devoluciones."""
+    posicion: int   # índice del par dentro del lote
+    isbn: str
+    user_id: str
+    motivo: str
+
+    def __str__(self):
+        return f"#{self.posicion} ({self.isbn}, {self.user_id}): {self.motivo}"
+
+
 class Biblioteca:
     """
     Clase que gestiona libros, usuarios y préstamos.
@@ -76,6 +183,13 @@ class Biblioteca:
     - usuarios: dict {user_id: Usuario}
     - usuarios_ids: set de user_id para garantizar unicidad
     - prestamo_activo: dict {isbn: user_id} para saber qué libro está prestado y a quién
+    - índices invertidos de títulos y autores: se construyen en la primera búsqueda y
+      desde ahí los mantienen agregar_libro y quitar_libro
+    - por_categoria: dict {categoria en minúsculas: set de ISBNs}, con los conteos de
+      libros totales y prestados de cada categoría (los actualizan los préstamos)
+
+    Creada con Biblioteca() vive solo en memoria. Con Biblioteca.abrir(carpeta) cada
+    cambio se anota en el registro de eventos antes de aplicarse (ver AlmacenBiblioteca).
     """
 
     def __init__(self):
@@ -83,13 +197,112 @@ class Biblioteca:
         self.usuarios: Dict[str, Usuario] = {}
         self.usuarios_ids: Set[str] = set()
         self.prestamo_activo: Dict[str, str] = {}  # isbn -> user_id
+        self._indice_titulos: Optional[IndiceInvertido] = None
+        self._indice_autores: Optional[IndiceInvertido] = None
+        self.por_categoria: Dict[str, Set[str]] = {}
+        self._nombre_categoria: Dict[str, str] = {}   # clave -> nombre como se escribió primero
+        self._prestados_categoria: Dict[str, int] = {}
+        self._almacen: Optional["AlmacenBiblioteca"] = None
+
+    # ---------- Persistencia ----------
+    @classmethod
+    def abrir(cls, carpeta: str, eventos_por_instantanea: int = 100_000,
+              sincronizar: bool = False) -> "Biblioteca":
+        """
+        Abre (o crea) una biblioteca persistente en `carpeta`: carga la última instantánea,
+        reaplica los eventos posteriores y desde ahí anota cada cambio. Cada
+        `eventos_por_instantanea` eventos toma una instantánea nueva en segundo plano.
+        Con sincronizar=True hace os.fsync en cada anotación (sobrevive a un corte de luz).
+        Lanza ValueError si la instantánea está dañada o es de otro formato.
+        """
+        bib = cls()
+        almacen = AlmacenBiblioteca(carpeta, eventos_por_instantanea, sincronizar)
+        almacen.cargar(bib)
+        bib._almacen = almacen
+        return bib
+
+    def tomar_instantanea(self, esperar: bool = True) -> bool:
+        """Toma una instantánea ahora. False si no es persistente o ya hay una en curso."""
+        if self._almacen is None:
+            return False
+        return self._almacen.tomar_instantanea(self, esperar)
+
+    def cerrar(self, instantanea: bool = False) -> None:
+        """Espera la instantánea en curso y cierra el registro. Con instantanea=True toma
+        una final, así la próxima apertura no tiene eventos que reaplicar."""
+        if self._almacen is None:
+            return
+        if instantanea and self._almacen.eventos_desde_instantanea:
+            self._almacen.esperar_instantanea()
+            self._almacen.tomar_instantanea(self, esperar=True)
+        self._almacen.cerrar()
+        self._almacen = None
+
+    def __enter__(self) -> "Biblioteca":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    def _anotar(self, *eventos: list) -> None:
+        """Anota eventos [operación, argumentos...] en el registro (una sola escritura).
+        Se llama después de validar y antes de modificar: si falla la escritura, la
+        biblioteca en memoria queda como estaba."""
+        if self._almacen is not None:
+            self._almacen.anotar(self, eventos)
+
+    def aplicar_evento(self, operacion: str, *args) -> bool:
+        """Aplica un evento del registro llamando al método correspondiente."""
+        if operacion == "agregar_libro":
+            titulo, autor, categoria, isbn = args
+            return self.agregar_libro(Libro((titulo, autor), categoria, isbn))
+        metodo = {"quitar_libro": self.quitar_libro, "registrar_usuario": self.registrar_usuario,
+                  "baja_usuario": self.baja_usuario, "prestar": self.prestar_libro,
+                  "devolver": self.devolver_libro}.get(operacion)
+        if metodo is None:
+            raise ValueError(f"operación desconocida: {operacion!r}")
+        return metodo(*args)
+
+    def _capturar_estado(self) -> tuple:
+        """Copia superficial del estado para escribir una instantánea desde otro hilo
+        (los Libro son inmutables; las colecciones se copian)."""
+        return (list(self.libros.values()),
+                [(clave, nombre, list(self.por_categoria[clave])) for clave, nombre in self._nombre_categoria.items()],
+                [(u.nombre, u.user_id, list(u.prestados)) for u in self.usuarios.values()])
+
+    def _restaurar_estado(self, categorias: List[str], libros: List[list],
+                          por_categoria: List[list], usuarios: List[list]) -> None:
+        """Reconstruye todo de una vez desde una instantánea, sin pasar por agregar_libro
+        ni prestar_libro: los conjuntos por categoría ya vienen armados."""
+        self.libros = {isbn: Libro((titulo, autor), categorias[c], isbn) for titulo, autor, c, isbn in libros}
+        self.por_categoria = {clave: set(isbns) for clave, _, isbns in por_categoria}
+        self._nombre_categoria = {clave: nombre for clave, nombre, _ in por_categoria}
+        self._prestados_categoria = dict.fromkeys(self.por_categoria, 0)
+        self.usuarios = {uid: Usuario(nombre, uid, dict.fromkeys(isbns)) for nombre, uid, isbns in usuarios}
+        self.usuarios_ids = set(self.usuarios)
+        self.prestamo_activo = {isbn: uid for _, uid, isbns in usuarios for isbn in isbns}
+        for isbn in self.prestamo_activo:
+            self._prestados_categoria[self.libros[isbn].categoria.lower()] += 1
+        self._indice_titulos = self._indice_autores = None
 
     # ---------- Gestión de libros ----------
     def agregar_libro(self, libro: Libro) -> bool:
         """Agrega libro al catálogo. Devuelve False si ISBN ya existe."""
         if libro.isbn in self.libros:
             return False
+        self._anotar(["agregar_libro", libro.titulo, libro.autor, libro.categoria, libro.isbn])
         self.libros[libro.isbn] = libro
+        if self._indice_titulos is not None:
+            self._indice_titulos.agregar(libro.isbn, libro.titulo)
+            self._indice_autores.agregar(libro.isbn, libro.autor)
+        clave = libro.categoria.lower()
+        isbns = self.por_categoria.get(clave)
+        if isbns is None:
+            self.por_categoria[clave] = {libro.isbn}
+            self._nombre_categoria[clave] = libro.categoria
+            self._prestados_categoria[clave] = 0
+        else:
+            isbns.add(libro.isbn)
         return True
 
     def quitar_libro(self, isbn: str) -> bool:
@@ -102,7 +315,18 @@ class Biblioteca:
         if isbn in self.prestamo_activo:
             # No permitir borrar libro que está prestado
             return False
-        del self.libros[isbn]
+        self._anotar(["quitar_libro", isbn])
+        libro = self.libros.pop(isbn)
+        if self._indice_titulos is not None:
+            self._indice_titulos.quitar(isbn, libro.titulo)
+            self._indice_autores.quitar(isbn, libro.autor)
+        clave = libro.categoria.lower()
+        isbns = self.por_categoria[clave]
+        isbns.discard(isbn)
+        if not isbns:
+            del self.por_categoria[clave]
+            del self._nombre_categoria[clave]
+            del self._prestados_categoria[clave]
         return True
 
     # ---------- Gestión de usuarios ----------
@@ -110,6 +334,7 @@ class Biblioteca:
         """Registra nuevo usuario. Devuelve False si el ID ya existe."""
         if user_id in self.usuarios_ids:
             return False
+        self._anotar(["registrar_usuario", nombre, user_id])
         usuario = Usuario(nombre=nombre, user_id=user_id)
         self.usuarios[user_id] = usuario
         self.usuarios_ids.add(user_id)
@@ -126,6 +351,7 @@ class Biblioteca:
         if usuario.prestados:
             # No permitir baja si tiene libros prestados
             return False
+        self._anotar(["baja_usuario", user_id])
         del self.usuarios[user_id]
         self.usuarios_ids.discard(user_id)
         return True
@@ -145,8 +371,10 @@ class Biblioteca:
             return False  # usuario no registrado
 
         # Registrar préstamo
+        self._anotar(["prestar", isbn, user_id])
         self.prestamo_activo[isbn] = user_id
         self.usuarios[user_id].prestar(isbn)
+        self._prestados_categoria[self.libros[isbn].categoria.lower()] += 1
         return True
 
     def devolver_libro(self, isbn: str, user_id: str) -> bool:
@@ -158,22 +386,130 @@ class Biblioteca:
         if actual_user != user_id:
             return False  # o libro no prestado o prestado a otro usuario
         # quitar registro
+        self._anotar(["devolver", isbn, user_id])
         del self.prestamo_activo[isbn]
+        self._prestados_categoria[self.libros[isbn].categoria.lower()] -= 1
         ok = self.usuarios[user_id].devolver(isbn)
         return ok
 
-    # ---------- Búsquedas ----------
-    def buscar_por_titulo(self, texto: str) -> List[Libro]:
-        texto_l = texto.lower()
-        return [lib for lib in self.libros.values() if texto_l in lib.titulo.lower()]
+    def prestar_lote(self, pares: Iterable[Tuple[str, str]]) -> Tuple[bool, List[FalloLote]]:
+        """
+        Presta un lote de pares (isbn, user_id), p. ej. los de toda una clase: o se
+        prestan todos, o ninguno. Se validan todos en una pasada con las mismas
+        condiciones que prestar_libro, más que un ISBN no se repita dentro del lote.
+        Devuelve (True, []) si se aplicó, o (False, fallos) con el motivo de cada par
+        que no se puede prestar. En una biblioteca persistente se anota con una sola
+        escritura.
+        """
+        pares = list(pares)
+        fallos: List[FalloLote] = []
+        vistos: Dict[str, int] = {}
+        for i, (isbn, user_id) in enumerate(pares):
+            if isbn in vistos:
+                motivo = f"ISBN repetido en el lote (ya está en #{vistos[isbn]})"
+            elif isbn not in self.libros:
+                motivo = "no existe el libro"
+            elif isbn in self.prestamo_activo:
+                motivo = "el libro ya está prestado"
+            elif user_id not in self.usuarios_ids:
+                motivo = "usuario no registrado"
+            else:
+                vistos[isbn] = i
+                continue
+            vistos.setdefault(isbn, i)
+            fallos.append(FalloLote(i, isbn, user_id, motivo))
+        if fallos:
+            return False, fallos
+        if not pares:
+            return True, []
+
+        self._anotar(*(["prestar", isbn, user_id] for isbn, user_id in pares))
+        for isbn, user_id in pares:
+            self.prestamo_activo[isbn] = user_id
+            self.usuarios[user_id].prestar(isbn)
+            self._prestados_categoria[self.libros[isbn].categoria.lower()] += 1
+        return True, []
+
+    def devolver_lote(self, pares: Iterable[Tuple[str, str]]) -> Tuple[bool, List[FalloLote]]:
+        """Igual que prestar_lote, para devoluciones: cada libro debe estar prestado
+        justo a ese usuario y aparecer una sola vez en el lote."""
+        pares = list(pares)
+        fallos: List[FalloLote] = []
+        vistos: Dict[str, int] = {}
+        for i, (isbn, user_id) in enumerate(pares):
+            actual_user = self.prestamo_activo.get(isbn)
+            if isbn in vistos:
+                motivo = f"ISBN repetido en el lote (ya está en #{vistos[isbn]})"
+            elif actual_user is None:
+                motivo = "el libro no está prestado"
+            elif actual_user != user_id:
+                motivo = "el libro está prestado a otro usuario"
+            else:
+                vistos[isbn] = i
+                continue
+            vistos.setdefault(isbn, i)
+            fallos.append(FalloLote(i, isbn, user_id, motivo))
+        if fallos:
+            return False, fallos
+        if not pares:
+            return True, []
+
+        self._anotar(*(["devolver", isbn, user_id] for isbn, user_id in pares))
+        for isbn, user_id in pares:
+            del self.prestamo_activo[isbn]
+            self._prestados_categoria[self.libros[isbn].categoria.lower()] -= 1
+            self.usuarios[user_id].devolver(isbn)
+        return True, []
 
-    def buscar_por_autor(self, texto: str) -> List[Libro]:
-        texto_l = texto.lower()
-        return [lib for lib in self.libros.values() if texto_l in lib.autor.lower()]
+    # ---------- Búsquedas ----------
+    def buscar_por_titulo(self, texto: str, subcadena: bool = False) -> List[Libro]:
+        """Libros cuyo título tiene todas las palabras de `texto` (sin distinguir
+        mayúsculas ni tildes). Si no hay ninguno, o con subcadena=True, busca `texto`
+        como parte del título ("años de sol" encuentra "Cien Años de Soledad").
+        Resultados ordenados por ISBN.
+        """
+        return self._buscar(self._indices()[0], texto, subcadena, lambda lib: lib.titulo)
+
+    def buscar_por_autor(self, texto: str, subcadena: bool = False) -> List[Libro]:
+        """Igual que buscar_por_titulo, sobre el autor."""
+        return self._buscar(self._indices()[1], texto, subcadena, lambda lib: lib.autor)
+
+    def _indices(self) -> Tuple[IndiceInvertido, IndiceInvertido]:
+        """Índices de títulos y autores, construidos en la primera búsqueda (así abrir
+        una biblioteca grande no paga por tokenizar todo el catálogo)."""
+        if self._indice_titulos is None:
+            titulos, autores = IndiceInvertido(), IndiceInvertido()
+            for isbn, libro in self.libros.items():
+                titulos.agregar(isbn, libro.titulo)
+                autores.agregar(isbn, libro.autor)
+            self._indice_titulos, self._indice_autores = titulos, autores
+        return self._indice_titulos, self._indice_autores
+
+    def _buscar(self, indice: IndiceInvertido, texto: str, subcadena: bool, campo) -> List[Libro]:
+        palabras = tokenizar(texto)
+        isbns: Set[str] = set()
+        if palabras and not subcadena:
+            isbns = indice.buscar_palabras(palabras)
+        if not isbns:
+            consulta = normalizar_texto(texto)
+            if palabras:
+                candidatos = (self.libros[isbn] for isbn in indice.candidatos_subcadena(palabras))
+            else:
+                candidatos = self.libros.values()  # solo signos o espacios: no hay palabras que buscar
+            isbns = {lib.isbn for lib in candidatos if consulta in normalizar_texto(campo(lib))}
+        return [self.libros[isbn] for isbn in sorted(isbns)]
 
     def buscar_por_categoria(self, categoria: str) -> List[Libro]:
-        cat_l = categoria.lower()
-        return [lib for lib in self.libros.values() if cat_l == lib.categoria.lower()]
+        """Libros de la categoría (sin distinguir mayúsculas), ordenados por ISBN."""
+        isbns = self.por_categoria.get(categoria.lower(), ())
+        return [self.libros[isbn] for isbn in sorted(isbns)]
+
+    def facetas_categorias(self) -> List[FacetaCategoria]:
+        """Libros por categoría (totales, prestados y disponibles), sin recorrer el
+        catálogo: los conteos se mantienen al agregar, quitar, prestar y devolver.
+        """
+        return [FacetaCategoria(self._nombre_categoria[clave], len(isbns), self._prestados_categoria[clave])
+                for clave, isbns in sorted(self.por_categoria.items())]
 
     # ---------- Listados ----------
     def listar_todos_libros(self) -> List[Libro]:
@@ -187,7 +523,8 @@ class Biblioteca:
         usuario = self.usuarios.get(user_id)
         if not usuario:
             return None
-        return [self.libros[isbn] for isbn in usuario.prestados if isbn in self.libros]
+        # Un libro prestado no se puede quitar del catálogo, así que todos siguen en self.libros
+        return [self.libros[isbn] for isbn in usuario.prestados]
 
     def quien_tiene_el_libro(self, isbn: str) -> Optional[Usuario]:
         """Devuelve el Usuario que tiene prestado el libro (o None)."""
@@ -204,6 +541,253 @@ class Biblioteca:
         return (isbn in self.libros) and (isbn not in self.prestamo_activo)
 
 
+# ------------------ Persistencia: instantánea + registro de eventos ------------------
+
+FORMATO_INSTANTANEA = "biblioteca"
+VERSION_INSTANTANEA = 1
+_SEGMENTO = re.compile(r"eventos\.(\d+)\.log")
+
+
+class AlmacenBiblioteca:
+    """
+    Guarda una Biblioteca en una carpeta:
+    - instantanea.json: estado completo hasta el evento `ultimo_evento` (libros como filas
+      [titulo, autor, n° de categoría, isbn], ISBNs por categoría y préstamos por usuario).
+    - eventos.<primero>.log: segmentos del registro, una línea JSON por evento
+      [n, operación, argumentos...], numerados desde `primero`.
+    Cada instantánea empieza un segmento nuevo; cuando termina de escribirse, los
+    segmentos anteriores ya están cubiertos y se borran. Al abrir se carga la instantánea
+    y se reaplican solo los eventos posteriores.
+    """
+
+    def __init__(self, carpeta: str, eventos_por_instantanea: int = 100_000, sincronizar: bool = False):
+        self.carpeta = carpeta
+        self.eventos_por_instantanea = eventos_por_instantanea
+        self.sincronizar = sincronizar
+        self.ultimo_evento = 0                # número del último evento anotado
+        self.eventos_desde_instantanea = 0
+        self.advertencias: List[str] = []
+        self._archivo = None                  # segmento actual (binario sin búfer), abierto para agregar
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def ruta_instantanea(self) -> str:
+        return os.path.join(self.carpeta, "instantanea.json")
+
+    def _ruta_segmento(self, primero: int) -> str:
+        return os.path.join(self.carpeta, f"eventos.{primero:012d}.log")
+
+    def _segmentos(self) -> List[Tuple[int, str]]:
+        """(primer evento, ruta) de cada segmento, en orden."""
+        segmentos = []
+        for nombre in os.listdir(self.carpeta):
+            m = _SEGMENTO.fullmatch(nombre)
+            if m:
+                segmentos.append((int(m.group(1)), os.path.join(self.carpeta, nombre)))
+        return sorted(segmentos)
+
+    # ---------- Recuperación ----------
+    def cargar(self, bib: Biblioteca) -> None:
+        """Carga la instantánea y reaplica los eventos posteriores; deja abierto un
+        segmento nuevo para los próximos eventos."""
+        os.makedirs(self.carpeta, exist_ok=True)
+        for nombre in os.listdir(self.carpeta):
+            if nombre.startswith(".instantanea-") and nombre.endswith(".tmp"):
+                os.remove(os.path.join(self.carpeta, nombre))  # instantánea que quedó a medias
+        # Se crean millones de objetos que sobreviven: sin el recolector de ciclos
+        # (que los recorrería una y otra vez) la carga tarda menos de la mitad.
+        gc_activo = gc.isenabled()
+        gc.disable()
+        try:
+            self.ultimo_evento = self._cargar_instantanea(bib)
+            segmentos = self._segmentos()
+            for i, (primero, ruta) in enumerate(segmentos):
+                siguiente = segmentos[i + 1][0] if i + 1 < len(segmentos) else None
+                if siguiente is not None and siguiente <= self.ultimo_evento + 1:
+                    continue  # cubierto por la instantánea (no se alcanzó a borrar)
+                if primero > self.ultimo_evento + 1:
+                    # Faltan eventos intermedios: reaplicar lo que sigue dejaría un estado inventado
+                    self.advertencias.append(f"faltan los eventos {self.ultimo_evento + 1} a {primero - 1}; "
+                                             f"se descarta {os.path.basename(ruta)}")
+                    os.replace(ruta, ruta + ".descartado")
+                    continue
+                self._reaplicar(bib, ruta)
+        finally:
+            if gc_activo:
+                gc.enable()
+        self._abrir_segmento()
+
+    def _cargar_instantanea(self, bib: Biblioteca) -> int:
+        try:
+            with open(self.ruta_instantanea, "r", encoding="utf-8") as f:
+                doc = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # Se escribe con os.replace, así que nunca queda a medias: esto es daño real
+            # y empezar vacío haría que la próxima instantánea borrara los datos.
+            raise ValueError(f"instantánea dañada en {self.ruta_instantanea}: {e}") from e
+        if not isinstance(doc, dict) or doc.get("formato") != FORMATO_INSTANTANEA:
+            raise ValueError(f"{self.ruta_instantanea} no es una instantánea de biblioteca")
+        if doc.get("version") != VERSION_INSTANTANEA:
+            raise ValueError(f"versión de instantánea no soportada: {doc.get('version')!r}")
+        bib._restaurar_estado(doc["categorias"], doc["libros"], doc["por_categoria"], doc["usuarios"])
+        return doc["ultimo_evento"]
+
+    def _reaplicar(self, bib: Biblioteca, ruta: str) -> None:
+        nombre = os.path.basename(ruta)
+        with open(ruta, "r", encoding="utf-8") as f:
+            for num_linea, linea in enumerate(f, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    numero, operacion, *args = json.loads(linea)
+                except (ValueError, TypeError):
+                    # Normalmente la última línea, cortada por una caída a mitad de escritura
+                    self.advertencias.append(f"{nombre} línea {num_linea}: evento incompleto, se ignora "
+                                             f"desde ahí")
+                    return
+                if numero <= self.ultimo_evento:
+                    continue
+                if numero != self.ultimo_evento + 1:
+                    self.advertencias.append(f"{nombre} línea {num_linea}: se esperaba el evento "
+                                             f"{self.ultimo_evento + 1} y llegó el {numero}")
+                    return
+                try:
+                    aplicado = bib.aplicar_evento(operacion, *args)
+                except (TypeError, ValueError) as e:
+                    self.advertencias.append(f"{nombre} línea {num_linea}: {e}")
+                else:
+                    if not aplicado:
+                        self.advertencias.append(f"{nombre} línea {num_linea}: no se pudo reaplicar {operacion}")
+                self.ultimo_evento = numero
+                self.eventos_desde_instantanea += 1
+
+    # ---------- Escritura ----------
+    def _abrir_segmento(self) -> None:
+        """Cierra el segmento actual y empieza uno en ultimo_evento + 1. Si ya existía uno
+        con ese número no tenía eventos válidos (si no, se habrían reaplicado): se vacía.
+        Sin búfer para que una escritura fallida no quede pendiente y se pueda recortar."""
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+        self._archivo = open(self._ruta_segmento(self.ultimo_evento + 1), "wb", buffering=0)
+
+    def anotar(self, bib: Biblioteca, eventos: Iterable[list]) -> None:
+        """Numera los eventos y los agrega al segmento actual con una sola escritura.
+        Antes, si ya tocaba, lanza una instantánea del estado actual (que todavía no
+        incluye estos eventos, así que quedan en el segmento nuevo).
+
+        Los números se confirman (ultimo_evento) solo si la escritura y el fsync salen
+        bien. Si fallan, el segmento se recorta a como estaba y la excepción sigue: el
+        registro nunca queda con un lote a medias ni con números salteados.
+        """
+        eventos = list(eventos)
+        if not eventos:
+            return
+        if (self.eventos_desde_instantanea >= self.eventos_por_instantanea
+                and not self.instantanea_en_curso()):
+            self.tomar_instantanea(bib)
+        numero = self.ultimo_evento
+        lineas = []
+        for evento in eventos:
+            numero += 1
+            lineas.append(json.dumps([numero, *evento], ensure_ascii=False))
+        datos = memoryview(("\n".join(lineas) + "\n").encode("utf-8"))
+        archivo = self._archivo
+        inicio = archivo.tell()
+        try:
+            escritos = 0
+            while escritos < len(datos):
+                escritos += archivo.write(datos[escritos:])  # write puede escribir menos de lo pedido
+            if self.sincronizar:
+                os.fsync(archivo.fileno())
+        except BaseException:
+            self._recortar(inicio)
+            raise
+        self.ultimo_evento = numero
+        self.eventos_desde_instantanea += len(lineas)
+
+    def _recortar(self, inicio: int) -> None:
+        """Deshace una escritura fallida del segmento actual. Si ni eso se puede, empieza
+        un segmento nuevo: al recuperar, el viejo se corta en la línea rota y el nuevo
+        sigue desde ultimo_evento + 1, así que no se pierde nada confirmado."""
+        try:
+            self._archivo.truncate(inicio)
+            self._archivo.seek(inicio)
+        except (OSError, ValueError):
+            try:
+                self._abrir_segmento()
+            except OSError as e:
+                self.advertencias.append(f"no se pudo recuperar el registro tras un error de escritura: {e}")
+
+    # ---------- Instantáneas ----------
+    def instantanea_en_curso(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def esperar_instantanea(self) -> None:
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def tomar_instantanea(self, bib: Biblioteca, esperar: bool = False) -> bool:
+        """
+        Copia el estado en este hilo (rápido y consistente), pasa a un segmento nuevo y
+        escribe la instantánea en un hilo aparte. Devuelve False si ya hay una en curso.
+        """
+        if self.instantanea_en_curso():
+            return False
+        estado = bib._capturar_estado()
+        ultimo = self.ultimo_evento
+        if self.sincronizar:
+            os.fsync(self._archivo.fileno())
+        self._abrir_segmento()
+        self.eventos_desde_instantanea = 0
+        self._hilo = threading.Thread(target=self._escribir_instantanea, args=(estado, ultimo),
+                                      name="instantanea-biblioteca", daemon=True)
+        self._hilo.start()
+        if esperar:
+            self._hilo.join()
+        return True
+
+    def _escribir_instantanea(self, estado: tuple, ultimo: int) -> None:
+        libros, por_categoria, usuarios = estado
+        numero_categoria: Dict[str, int] = {}  # cada nombre de categoría se guarda una sola vez
+        filas = []
+        for libro in libros:
+            c = numero_categoria.get(libro.categoria)
+            if c is None:
+                c = numero_categoria[libro.categoria] = len(numero_categoria)
+            titulo, autor = libro.title_author
+            filas.append([titulo, autor, c, libro.isbn])
+        texto = json.dumps({"formato": FORMATO_INSTANTANEA, "version": VERSION_INSTANTANEA,
+                            "ultimo_evento": ultimo, "categorias": list(numero_categoria),
+                            "libros": filas, "por_categoria": por_categoria, "usuarios": usuarios},
+                           ensure_ascii=False, separators=(",", ":"))
+        fd, tmp = tempfile.mkstemp(dir=self.carpeta, prefix=".instantanea-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(texto)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.ruta_instantanea)
+        except OSError as e:
+            self.advertencias.append(f"no se pudo escribir la instantánea: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        for primero, ruta in self._segmentos():
+            if primero <= ultimo:  # todos sus eventos están en la instantánea
+                os.remove(ruta)
+
+    def cerrar(self) -> None:
+        self.esperar_instantanea()
+        if self._archivo is not None:
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+            self._archivo.close()
+            self._archivo = None
+
+
 # ------------------ Pruebas de funcionamiento / ejemplo de uso ------------------
 
 def ejemplo_uso():
@@ -247,14 +831,75 @@ def ejemplo_uso():
     res_autor = bib.buscar_por_autor("Ana Torres")
     print("Búsqueda por autor 'Ana Torres':", [str(l) for l in res_autor])
 
+    # Búsquedas con el índice: varias palabras (todas deben estar), sin tildes,
+    # y como parte del texto si no hay palabras completas que coincidan
+    assert bib.buscar_por_titulo("soledad cien") == [b1]
+    assert bib.buscar_por_titulo("algebra") == [b4]
+    assert bib.buscar_por_titulo("años de sol") == [b1]
+    assert bib.buscar_por_autor("garcia marquez") == [b1]
+    assert bib.buscar_por_titulo("arte historia programación") == []
+    assert bib.buscar_por_titulo("de", subcadena=True) == [b1, b3]  # también "del" y "Moderno"
+    assert bib.quitar_libro("978-0104") and bib.buscar_por_titulo("algebra") == []
+    assert bib.agregar_libro(b4)
+
     # Buscar por categoría
     res_cat = bib.buscar_por_categoria("Matemáticas")
     print("Búsqueda por categoría 'Matemáticas':", [str(l) for l in res_cat])
+    assert bib.buscar_por_categoria("matemáticas") == [b4]
+
+    # Conteos por categoría (libros 978-0102 y 978-0103 siguen prestados)
+    for faceta in bib.facetas_categorias():
+        print(f"  {faceta.categoria}: {faceta.total} libro(s), {faceta.disponibles} disponible(s)")
+    assert [(f.categoria, f.total, f.prestados) for f in bib.facetas_categorias()] == [
+        ("Arte", 1, 1), ("Informática", 1, 1), ("Literatura", 1, 0), ("Matemáticas", 1, 0)]
+
+    # Los préstamos se listan en el orden en que se hicieron, también después de devolver
+    assert bib.prestar_libro("978-0101", "U101") and bib.prestar_libro("978-0104", "U101")
+    assert bib.devolver_libro("978-0101", "U101")
+    assert bib.usuarios["U101"].listar_prestados() == ["978-0102", "978-0104"]
+
+    # Préstamos en lote: o se aplican todos, o se informa qué falla en cada par
+    ok, fallos = bib.prestar_lote([("978-0101", "U102"), ("978-0104", "U100"), ("978-0101", "U100"),
+                                   ("978-9999", "U100"), ("978-0103", "U999")])
+    assert not ok and [(f.posicion, f.motivo) for f in fallos] == [
+        (1, "el libro ya está prestado"), (2, "ISBN repetido en el lote (ya está en #0)"),
+        (3, "no existe el libro"), (4, "el libro ya está prestado")]
+    assert not bib.esta_prestado("978-0101")  # no se aplicó nada
+    assert bib.prestar_lote([("978-0101", "U100")]) == (True, [])
+    ok, fallos = bib.devolver_lote([("978-0101", "U100"), ("978-0104", "U100")])
+    assert not ok and [str(f) for f in fallos] == ["#1 (978-0104, U100): el libro está prestado a otro usuario"]
+    assert bib.devolver_lote([("978-0101", "U100")]) == (True, [])
 
     # Baja de usuario sin préstamos
     assert bib.baja_usuario("U100")  # Valentina ya devolvió y se puede dar de baja
     print("Usuarios activos:", [str(u) for u in bib.listar_usuarios()])
 
+    # Persistencia: lo anotado sobrevive al reinicio, con y sin instantánea de por medio
+    with tempfile.TemporaryDirectory() as carpeta:
+        with Biblioteca.abrir(carpeta, eventos_por_instantanea=3) as pb:
+            for libro in (b1, b2, b3, b4):
+                assert pb.agregar_libro(libro)
+            assert pb.registrar_usuario("Santiago Castro", "U101")
+            assert pb.prestar_libro("978-0102", "U101") and pb.prestar_libro("978-0104", "U101")
+            assert pb.quitar_libro("978-0103")
+        with Biblioteca.abrir(carpeta) as pb:
+            assert pb.listar_todos_libros() == [b1, b2, b4]
+            assert pb.usuarios["U101"].listar_prestados() == ["978-0102", "978-0104"]
+            assert pb.quien_tiene_el_libro("978-0104").nombre == "Santiago Castro"
+            assert [(f.categoria, f.total, f.prestados) for f in pb.facetas_categorias()] == [
+                ("Informática", 1, 1), ("Literatura", 1, 0), ("Matemáticas", 1, 1)]
+            assert pb.buscar_por_titulo("soledad") == [b1]
+            assert pb.devolver_libro("978-0102", "U101")
+            anotados = pb._almacen.ultimo_evento
+            assert pb.prestar_lote([("978-0101", "U101"), ("978-0102", "U101")]) == (True, [])
+            assert pb.devolver_lote([("978-0101", "U101"), ("978-0102", "U101")]) == (True, [])
+            assert pb._almacen.ultimo_evento == anotados + 4
+            pb.cerrar(instantanea=True)
+        with Biblioteca.abrir(carpeta) as pb:
+            assert not pb.esta_prestado("978-0102") and pb.esta_prestado("978-0104")
+            assert pb._almacen.eventos_desde_instantanea == 0
+    print("Persistencia OK: la biblioteca se recuperó de la instantánea y el registro.")
+
     print("Todo OK - Ejemplo con nuevos datos completado.")
 
 
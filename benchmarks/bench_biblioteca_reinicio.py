@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: reinicio de una Biblioteca persistente de la SEMANA 12.
+
+Genera en una carpeta temporal una biblioteca de --libros libros y --usuarios usuarios
+con --prestamos préstamos, toma una instantánea y después anota --eventos eventos más
+(devoluciones y préstamos) que quedan solo en el registro. Luego mide, cada vez en un
+proceso nuevo, cuánto tarda `Biblioteca.abrir` (cargar la instantánea + reaplicar el
+registro) y el pico de RSS. También informa lo que tardó escribir la instantánea.
+
+Run:
+    python benchmarks/bench_biblioteca_reinicio.py --libros 1000000 --usuarios 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA12, cargar_modulo, rss_pico_mb  # noqa: E402
+
+CATEGORIAS = ("Literatura", "Informática", "Arte", "Matemáticas", "Historia", "Ciencias", "Filosofía",
+              "Infantil", "Idiomas", "Música")
+
+
+def generar(carpeta: str, libros: int, usuarios: int, prestamos: int, eventos: int, semilla: int = 42) -> dict:
+    """Se ejecuta en el proceso hijo: crea la biblioteca persistente."""
+    bib12 = cargar_modulo(RUTA_SEMANA12, "biblioteca_semana12")
+    bib = bib12.Biblioteca.abrir(carpeta, eventos_por_instantanea=10 ** 12)  # instantánea solo a mano
+    for i in range(libros):
+        bib.agregar_libro(bib12.Libro((f"Libro número {i}", f"Autor {i % 5000}"),
+                                      CATEGORIAS[i % len(CATEGORIAS)], f"{i:010d}"))
+    for u in range(usuarios):
+        bib.registrar_usuario(f"Usuario {u}", f"U{u:07d}")
+    azar = random.Random(semilla)
+    isbns = list(bib.libros)
+    azar.shuffle(isbns)
+    prestados, libres = isbns[:prestamos], isbns[prestamos:]
+    duenos = [f"U{azar.randrange(usuarios):07d}" for _ in prestados]
+    for isbn, uid in zip(prestados, duenos):
+        bib.prestar_libro(isbn, uid)
+
+    inicio = time.perf_counter()
+    bib.tomar_instantanea(esperar=True)
+    segundos_instantanea = time.perf_counter() - inicio
+
+    # Eventos posteriores a la instantánea: devolver un libro y prestar otro libre
+    for _ in range(eventos // 2):
+        i, j = azar.randrange(len(prestados)), azar.randrange(len(libres))
+        bib.devolver_libro(prestados[i], duenos[i])
+        bib.prestar_libro(libres[j], duenos[i])
+        prestados[i], libres[j] = libres[j], prestados[i]
+    bib.cerrar()
+    return {"segundos_instantanea": segundos_instantanea,
+            "bytes_instantanea": os.path.getsize(os.path.join(carpeta, "instantanea.json")),
+            "bytes_registro": sum(os.path.getsize(os.path.join(carpeta, n)) for n in os.listdir(carpeta)
+                                  if n.endswith(".log"))}
+
+
+def medir(carpeta: str) -> dict:
+    """Se ejecuta en el proceso hijo: abre la biblioteca y mide el reinicio."""
+    bib12 = cargar_modulo(RUTA_SEMANA12, "biblioteca_semana12")
+    inicio = time.perf_counter()
+    bib = bib12.Biblioteca.abrir(carpeta)
+    segundos = time.perf_counter() - inicio
+    resultado = {"segundos": segundos, "libros": len(bib.libros), "usuarios": len(bib.usuarios),
+                 "prestamos": len(bib.prestamo_activo), "reaplicados": bib._almacen.eventos_desde_instantanea,
+                 "advertencias": len(bib._almacen.advertencias), "rss_pico_mb": rss_pico_mb()}
+    bib.cerrar()
+    return resultado
+
+
+def hijo(*argumentos: str) -> dict:
+    salida = subprocess.run([sys.executable, __file__, *argumentos],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--libros", type=int, default=1_000_000)
+    parser.add_argument("--usuarios", type=int, default=100_000)
+    parser.add_argument("--prestamos", type=int, default=200_000, help="préstamos activos en la instantánea")
+    parser.add_argument("--eventos", type=int, default=50_000, help="eventos anotados después de la instantánea")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    parser.add_argument("--generar", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--carpeta", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.prestamos > args.libros:
+        parser.error("--prestamos no puede superar a --libros")
+
+    if args.generar:
+        print(json.dumps(generar(args.carpeta, args.libros, args.usuarios, args.prestamos, args.eventos)))
+        return
+    if args.medir:
+        print(json.dumps(medir(args.carpeta)))
+        return
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        print(f"[INFO] Generando {args.libros} libros y {args.usuarios} usuarios...", file=sys.stderr)
+        generado = hijo("--generar", "--carpeta", carpeta, "--libros", str(args.libros),
+                        "--usuarios", str(args.usuarios), "--prestamos", str(args.prestamos),
+                        "--eventos", str(args.eventos))
+        mediciones = [hijo("--medir", "--carpeta", carpeta) for _ in range(args.repeticiones)]
+    reinicio = min(mediciones, key=lambda r: r["segundos"])
+    assert reinicio["libros"] == args.libros and reinicio["usuarios"] == args.usuarios, "reinicio incompleto"
+    assert reinicio["advertencias"] == 0, "el registro tuvo eventos que no se pudieron reaplicar"
+
+    resultado = {"libros": args.libros, "usuarios": args.usuarios, **generado,
+                 "segundos_reinicio": reinicio["segundos"], "eventos_reaplicados": reinicio["reaplicados"],
+                 "rss_pico_mb": reinicio["rss_pico_mb"]}
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+        return
+    print(f"{args.libros} libros, {args.usuarios} usuarios, {reinicio['prestamos']} préstamos activos:")
+    print(f"  instantánea: {generado['bytes_instantanea'] / 1e6:.1f} MB, escrita en "
+          f"{generado['segundos_instantanea']:.2f} s")
+    print(f"  registro posterior: {reinicio['reaplicados']} eventos, {generado['bytes_registro'] / 1e6:.1f} MB")
+    rss = f"{reinicio['rss_pico_mb']:.0f} MB" if reinicio["rss_pico_mb"] is not None else "n/d"
+    print(f"  reinicio (mejor de {args.repeticiones}): {reinicio['segundos']:.2f} s, RSS pico {rss}")
+
+
+if __name__ == "__main__":
+    main()
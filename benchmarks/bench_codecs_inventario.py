@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: codecs de almacenamiento del Inventario de la SEMANA 11.
+
+Genera un inventario sintético de N productos y, para cada codec (json indentado,
+compacto, posicional, gzip, lzma y sus combinaciones), mide el tamaño del archivo,
+el tiempo de guardado (`compactar`) y el de carga (`cargar_desde_archivo`). Cada
+medición corre en un proceso nuevo para que el pico de RSS sea independiente.
+
+Run:
+    python benchmarks/bench_codecs_inventario.py --n 200000
+    python benchmarks/bench_codecs_inventario.py --n 200000 --codecs json,posicional,gzip
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA11, cargar_modulo, rss_pico_mb  # noqa: E402
+
+PALABRAS = ("Lápiz", "Cuaderno", "Borrador", "Regla", "Mochila", "Tijeras", "Marcador", "Carpeta",
+            "Compás", "Calculadora")
+
+
+def guardar(ruta: str, codec: str, n: int) -> dict:
+    """Se ejecuta en el proceso hijo: escribe n productos con el codec pedido."""
+    inv11 = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+    inv = inv11.Inventario(ruta, codec=codec)
+    inv.productos = {f"P{i:07d}": inv11.Producto(f"P{i:07d}", f"{PALABRAS[i % len(PALABRAS)]} modelo {i}",
+                                                 i % 1000, (i % 9973) / 100) for i in range(n)}
+    inicio = time.perf_counter()
+    inv.compactar()
+    return {"codec": codec, "segundos": time.perf_counter() - inicio, "rss_pico_mb": rss_pico_mb()}
+
+
+def medir(ruta: str) -> dict:
+    """Se ejecuta en el proceso hijo: carga el inventario detectando el codec."""
+    inv11 = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+    inicio = time.perf_counter()
+    inv = inv11.Inventario(ruta)
+    inv.cargar_desde_archivo()
+    segundos = time.perf_counter() - inicio
+    return {"codec": inv.codec, "productos": len(inv.productos), "segundos": segundos,
+            "rss_pico_mb": rss_pico_mb()}
+
+
+def hijo(*argumentos: str) -> dict:
+    salida = subprocess.run([sys.executable, __file__, *argumentos],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main() -> None:
+    inv11 = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200_000, help="cantidad de productos")
+    parser.add_argument("--codecs", default=",".join(inv11.CODECS), help="codecs a medir, separados por comas")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    parser.add_argument("--medir", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--guardar", help=argparse.SUPPRESS)
+    parser.add_argument("--ruta", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.guardar:
+        print(json.dumps(guardar(args.ruta, args.guardar, args.n)))
+        return
+    if args.medir:
+        print(json.dumps(medir(args.ruta)))
+        return
+
+    codecs = [c.strip() for c in args.codecs.split(",") if c.strip()]
+    desconocidos = [c for c in codecs if c not in inv11.CODECS]
+    if desconocidos:
+        parser.error(f"codecs desconocidos: {', '.join(desconocidos)}")
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as carpeta:
+        for codec in codecs:
+            print(f"[INFO] Midiendo {codec} con {args.n} productos...", file=sys.stderr)
+            ruta = os.path.join(carpeta, f"inventory-{codec.replace('+', '-')}.dat")
+            guardados = [hijo("--guardar", codec, "--ruta", ruta, "--n", str(args.n))
+                         for _ in range(args.repeticiones)]
+            cargas = [hijo("--medir", "--ruta", ruta) for _ in range(args.repeticiones)]
+            guardado = min(guardados, key=lambda r: r["segundos"])
+            carga = min(cargas, key=lambda r: r["segundos"])
+            assert carga["codec"] == codec and carga["productos"] == args.n, f"carga incorrecta con {codec}"
+            resultados.append({"codec": codec, "bytes_archivo": os.path.getsize(ruta),
+                               "segundos_guardar": guardado["segundos"], "segundos_cargar": carga["segundos"],
+                               "rss_pico_guardar_mb": guardado["rss_pico_mb"],
+                               "rss_pico_cargar_mb": carga["rss_pico_mb"]})
+
+    if args.json:
+        print(json.dumps({"n": args.n, "resultados": resultados}, indent=2))
+        return
+    base = resultados[0]["bytes_archivo"]
+    print(f"{args.n} productos (mejor de {args.repeticiones}; tamaño relativo a {resultados[0]['codec']}):")
+    print(f"{'Codec':<16}  {'Archivo MB':>10}  {'Relativo':>8}  {'Guardar s':>9}  {'Cargar s':>8}  "
+          f"{'RSS guardar MB':>14}  {'RSS cargar MB':>13}")
+    for r in resultados:
+        rss = [f"{v:.1f}" if v is not None else "n/d" for v in (r["rss_pico_guardar_mb"], r["rss_pico_cargar_mb"])]
+        print(f"{r['codec']:<16}  {r['bytes_archivo'] / 1e6:>10.2f}  {r['bytes_archivo'] / base:>8.3f}  "
+              f"{r['segundos_guardar']:>9.3f}  {r['segundos_cargar']:>8.3f}  {rss[0]:>14}  {rss[1]:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: las cuatro implementaciones de Inventario con inventarios sintéticos.
+
+    semana9   lista de objetos, solo en memoria (imprime en consola; se silencia)
+    semana10  dict + CSV (modo journal, como en su menú)
+    semana11  dict + JSON
+    semana16  lista + CSV (clases extraídas del script de tkinter con `ast`)
+
+Para cada implementación y tamaño (por defecto 1k, 100k y 1M productos) se mide, en
+un proceso nuevo: agregar, obtener por ID, actualizar, eliminar, buscar por nombre
+(la primera búsqueda aparte, porque puede construir un índice), listar todo, guardar
+y cargar, además del pico de memoria residente.
+
+Las implementaciones con lista recorren todo el inventario en cada operación (O(n));
+para que 1M productos termine en tiempo razonable, en ellas el número de operaciones
+medidas se limita a ~`--presupuesto` / n (mínimo 10). Por eso se informa el tiempo por
+operación (`us_por_op`) y no el total. Las operaciones que una implementación no
+ofrece aparecen como null / "n/d".
+
+Run:
+    python benchmarks/bench_inventarios.py --tamanos 1000,100000 --json --salida base.json
+    python benchmarks/bench_inventarios.py --tamanos 1000,100000 --comparar base.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import (RUTA_SEMANA9, RUTA_SEMANA10, RUTA_SEMANA11, RUTA_SEMANA16,  # noqa: E402
+                   cargar_clases, cargar_modulo, rss_pico_mb)
+
+OPERACIONES = ("agregar", "obtener", "actualizar", "buscar_nombre", "primera_busqueda", "listar", "eliminar",
+               "guardar", "cargar")
+PALABRAS = ("Lápiz", "Cuaderno", "Borrador", "Regla", "Mochila", "Tijeras", "Marcador", "Carpeta",
+            "Compás", "Calculadora")
+BUSQUEDAS = ("lápiz", "tijeras", "modelo 77", "no existe")
+
+Fila = Tuple[str, str, int, float]
+
+
+def generar_datos(n: int, semilla: int = 42) -> List[Fila]:
+    """n productos (id, nombre, cantidad, precio) reproducibles."""
+    azar = random.Random(semilla)
+    return [(f"P{i:07d}", f"{PALABRAS[i % len(PALABRAS)]} modelo {i}", azar.randrange(1000),
+             round(azar.uniform(0.1, 100.0), 2)) for i in range(n)]
+
+
+# ---------------------
+# Adaptadores: la misma interfaz para cada implementación
+# ---------------------
+class Adaptador:
+    """Traduce las operaciones del benchmark a los métodos de cada Inventario.
+    Un método en None significa que la implementación no ofrece esa operación.
+    """
+    lineal = False  # True si cada operación recorre toda la lista
+
+    def __init__(self, carpeta: str) -> None:
+        self.carpeta = carpeta
+
+    precargar: Callable[[List[Fila]], None]
+    agregar: Optional[Callable[[Fila], Any]] = None
+    obtener: Optional[Callable[[str], Any]] = None
+    actualizar: Optional[Callable[[str, int], Any]] = None
+    eliminar: Optional[Callable[[str], Any]] = None
+    buscar_nombre: Optional[Callable[[str], Any]] = None
+    listar: Optional[Callable[[], Any]] = None
+    guardar: Optional[Callable[[], Any]] = None
+    cargar: Optional[Callable[[], Any]] = None
+
+    def total(self) -> int:
+        raise NotImplementedError
+
+
+class AdaptadorSemana9(Adaptador):
+    lineal = True
+
+    def __init__(self, carpeta: str) -> None:
+        super().__init__(carpeta)
+        self.m = cargar_modulo(RUTA_SEMANA9, "inventario_semana9")
+        self.inv = self.m.Inventario()
+
+    def precargar(self, datos: List[Fila]) -> None:
+        self.inv.productos = [self.m.Producto(*fila) for fila in datos]
+
+    def agregar(self, fila: Fila) -> None:
+        self.inv.agregar(self.m.Producto(*fila))
+
+    def actualizar(self, idp: str, cantidad: int) -> None:
+        self.inv.actualizar(idp, nueva_cantidad=cantidad)
+
+    def eliminar(self, idp: str) -> None:
+        self.inv.eliminar(idp)
+
+    def buscar_nombre(self, texto: str) -> None:
+        self.inv.buscar(texto)
+
+    def listar(self) -> None:
+        self.inv.mostrar_todo()
+
+    def total(self) -> int:
+        return len(self.inv.productos)
+
+
+class AdaptadorSemana10(Adaptador):
+    def __init__(self, carpeta: str) -> None:
+        super().__init__(carpeta)
+        self.m = cargar_modulo(RUTA_SEMANA10, "inventario_semana10")
+        self.ruta = os.path.join(carpeta, "inventario.txt")
+        self.inv = self.m.Inventario(self.ruta, modo_journal=True)
+
+    def precargar(self, datos: List[Fila]) -> None:
+        Producto = self.m.Producto
+        with self.inv.transaccion():
+            for fila in datos:
+                self.inv.agregar(Producto(*fila))
+
+    def agregar(self, fila: Fila) -> None:
+        self.inv.agregar(self.m.Producto(*fila))
+
+    def obtener(self, idp: str) -> Any:
+        return self.inv.obtener(idp)
+
+    def actualizar(self, idp: str, cantidad: int) -> None:
+        self.inv.actualizar(idp, cantidad=cantidad)
+
+    def eliminar(self, idp: str) -> None:
+        self.inv.eliminar(idp)
+
+    def listar(self) -> Any:
+        return self.inv.listar()
+
+    def guardar(self) -> None:
+        self.inv.compactar_journal()
+
+    def cargar(self) -> None:
+        self.inv.close()
+        self.inv = self.m.Inventario(self.ruta, modo_journal=True)
+
+    def total(self) -> int:
+        return len(self.inv.listar())
+
+
+class AdaptadorSemana11(Adaptador):
+    def __init__(self, carpeta: str) -> None:
+        super().__init__(carpeta)
+        self.m = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+        self.ruta = os.path.join(carpeta, "inventory.json")
+        self.inv = self.m.Inventario(self.ruta)
+
+    def precargar(self, datos: List[Fila]) -> None:
+        Producto = self.m.Producto
+        self.inv.productos = {fila[0]: Producto(*fila) for fila in datos}
+
+    def agregar(self, fila: Fila) -> None:
+        self.inv.añadir_producto(self.m.Producto(*fila))
+
+    def obtener(self, idp: str) -> Any:
+        return self.inv.productos.get(idp)
+
+    def actualizar(self, idp: str, cantidad: int) -> None:
+        self.inv.actualizar_cantidad(idp, cantidad)
+
+    def eliminar(self, idp: str) -> None:
+        self.inv.eliminar_producto(idp)
+
+    def buscar_nombre(self, texto: str) -> Any:
+        return self.inv.buscar_por_nombre(texto)
+
+    def listar(self) -> Any:
+        return self.inv.mostrar_todos()
+
+    def guardar(self) -> None:
+        self.inv.guardar_en_archivo()
+
+    def cargar(self) -> None:
+        self.inv = self.m.Inventario(self.ruta)
+        self.inv.cargar_desde_archivo()
+
+    def total(self) -> int:
+        return len(self.inv.productos)
+
+
+class AdaptadorSemana16(Adaptador):
+    lineal = True
+
+    def __init__(self, carpeta: str) -> None:
+        super().__init__(carpeta)
+        self.m = cargar_clases(RUTA_SEMANA16, "inventario_semana16", ("Producto", "Inventario"))
+        self.ruta = os.path.join(carpeta, "inventario.csv")
+        self.inv = self.m.Inventario()
+
+    def precargar(self, datos: List[Fila]) -> None:
+        self.inv.productos = [self.m.Producto(*fila) for fila in datos]
+
+    def agregar(self, fila: Fila) -> None:
+        self.inv.agregar_producto(self.m.Producto(*fila))
+
+    def obtener(self, idp: str) -> Any:
+        return self.inv.obtener_producto(idp)
+
+    def actualizar(self, idp: str, cantidad: int) -> None:
+        self.inv.modificar_producto(idp, cantidad=cantidad)
+
+    def eliminar(self, idp: str) -> None:
+        self.inv.eliminar_producto(idp)
+
+    def listar(self) -> Any:
+        return self.inv.listar_productos()
+
+    def guardar(self) -> None:
+        self.inv.guardar_csv(self.ruta)
+
+    def cargar(self) -> None:
+        self.inv = self.m.Inventario()
+        self.inv.cargar_csv(self.ruta)
+
+    def total(self) -> int:
+        return len(self.inv.productos)
+
+
+ADAPTADORES = {"semana9": AdaptadorSemana9, "semana10": AdaptadorSemana10,
+               "semana11": AdaptadorSemana11, "semana16": AdaptadorSemana16}
+
+
+# ---------------------
+# Medición (proceso hijo)
+# ---------------------
+def cronometrar(funcion: Optional[Callable[..., Any]], argumentos: Iterable[Tuple[Any, ...]]) -> Optional[dict]:
+    if funcion is None:
+        return None
+    argumentos = list(argumentos)
+    inicio = time.perf_counter()
+    for args in argumentos:
+        funcion(*args)
+    segundos = time.perf_counter() - inicio
+    ops = len(argumentos)
+    return {"ops": ops, "segundos": segundos, "us_por_op": segundos / ops * 1e6 if ops else None}
+
+
+def medir(implementacion: str, n: int, operaciones: int, presupuesto: int) -> dict:
+    datos = generar_datos(n)
+    azar = random.Random(7)
+    with tempfile.TemporaryDirectory() as carpeta, open(os.devnull, "w", encoding="utf-8") as nulo, \
+            contextlib.redirect_stdout(nulo):
+        adaptador = ADAPTADORES[implementacion](carpeta)
+        k = min(operaciones, max(n, 1))
+        if adaptador.lineal:
+            k = min(k, max(10, presupuesto // max(n, 1)))
+        inicio = time.perf_counter()
+        adaptador.precargar(datos)
+        segundos_precarga = time.perf_counter() - inicio
+
+        existentes = [fila[0] for fila in azar.sample(datos, k)] if n else []
+        nuevos = [(f"N{i:07d}", f"Nuevo modelo {i}", i, 1.5) for i in range(k)]
+        # La primera búsqueda se mide aparte: puede incluir construir el índice de nombres
+        primera_busqueda = cronometrar(adaptador.buscar_nombre, [(BUSQUEDAS[0],)])
+        resultados = {
+            "agregar": cronometrar(adaptador.agregar, ((fila,) for fila in nuevos)),
+            "obtener": cronometrar(adaptador.obtener, ((idp,) for idp in existentes)),
+            "actualizar": cronometrar(adaptador.actualizar, ((idp, 5) for idp in existentes)),
+            "buscar_nombre": cronometrar(adaptador.buscar_nombre, ((t,) for t in BUSQUEDAS)),
+            "primera_busqueda": primera_busqueda,
+            "listar": cronometrar(adaptador.listar, [()]),
+            "eliminar": cronometrar(adaptador.eliminar, ((idp,) for idp in existentes)),
+            "guardar": cronometrar(adaptador.guardar, [()]),
+            "cargar": cronometrar(adaptador.cargar, [()]),
+        }
+        total = adaptador.total()
+    return {"implementacion": implementacion, "n": n, "operaciones_medidas": k,
+            "segundos_precarga": segundos_precarga, "productos_finales": total,
+            "operaciones": resultados, "rss_pico_mb": rss_pico_mb()}
+
+
+# ---------------------
+# Informe y comparación
+# ---------------------
+def imprimir_tabla(resultados: List[dict]) -> None:
+    anchos = {op: max(13, len(op)) for op in OPERACIONES}
+    print(f"{'Implementación':<14} {'n':>9} {'k':>6}  " + "  ".join(f"{op:>{anchos[op]}}" for op in OPERACIONES)
+          + f"  {'RSS MB':>8}")
+    for r in resultados:
+        celdas = []
+        for op in OPERACIONES:
+            m = r["operaciones"][op]
+            celdas.append(f"{'n/d' if m is None else format(m['us_por_op'], ',.1f') + ' us':>{anchos[op]}}")
+        rss = f"{r['rss_pico_mb']:.0f}" if r["rss_pico_mb"] is not None else "n/d"
+        print(f"{r['implementacion']:<14} {r['n']:>9} {r['operaciones_medidas']:>6}  " + "  ".join(celdas)
+              + f"  {rss:>8}")
+    print("(tiempo por operación; 'listar', 'guardar' y 'cargar' son una operación sobre todo el inventario)")
+
+
+def comparar(anterior: dict, resultados: List[dict], tolerancia: float) -> List[str]:
+    """Lista las operaciones que empeoraron más que `tolerancia` (0.25 = 25 %)."""
+    previos = {(r["implementacion"], r["n"]): r for r in anterior.get("resultados", [])}
+    regresiones = []
+    for r in resultados:
+        previo = previos.get((r["implementacion"], r["n"]))
+        if previo is None:
+            continue
+        for op in OPERACIONES:
+            actual, antes = r["operaciones"].get(op), previo["operaciones"].get(op)
+            if not actual or not antes or not antes["us_por_op"]:
+                continue
+            cambio = actual["us_por_op"] / antes["us_por_op"] - 1
+            if cambio > tolerancia:
+                regresiones.append(f"{r['implementacion']} n={r['n']} {op}: {antes['us_por_op']:,.1f} -> "
+                                   f"{actual['us_por_op']:,.1f} us/op (+{cambio:.0%})")
+    return regresiones
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", default="1000,100000,1000000",
+                        help="tamaños de inventario separados por comas")
+    parser.add_argument("--implementaciones", default=",".join(ADAPTADORES),
+                        help="implementaciones a medir, separadas por comas")
+    parser.add_argument("--operaciones", type=int, default=1000,
+                        help="operaciones medidas por tipo (agregar, obtener, actualizar, eliminar)")
+    parser.add_argument("--presupuesto", type=int, default=20_000_000,
+                        help="límite de productos recorridos por tipo de operación en las implementaciones con lista")
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    parser.add_argument("--salida", help="además, guardar el JSON en este archivo")
+    parser.add_argument("--comparar", metavar="ANTERIOR.json",
+                        help="comparar con resultados anteriores; termina con código 1 si hay regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25,
+                        help="empeoramiento permitido al comparar (0.25 = 25 %%)")
+    parser.add_argument("--medir", help=argparse.SUPPRESS)
+    parser.add_argument("--n", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.medir, args.n, args.operaciones, args.presupuesto)))
+        return
+
+    implementaciones = [i.strip() for i in args.implementaciones.split(",") if i.strip()]
+    desconocidas = [i for i in implementaciones if i not in ADAPTADORES]
+    if desconocidas:
+        parser.error(f"implementaciones desconocidas: {', '.join(desconocidas)}")
+    tamanos = [int(t) for t in args.tamanos.split(",") if t.strip()]
+
+    resultados = []
+    for n in tamanos:
+        for implementacion in implementaciones:
+            print(f"[INFO] Midiendo {implementacion} con {n} productos...", file=sys.stderr)
+            salida = subprocess.run([sys.executable, __file__, "--medir", implementacion, "--n", str(n),
+                                     "--operaciones", str(args.operaciones),
+                                     "--presupuesto", str(args.presupuesto)],
+                                    check=True, capture_output=True, text=True).stdout
+            resultados.append(json.loads(salida.strip().splitlines()[-1]))
+
+    informe = {"python": platform.python_version(), "plataforma": platform.platform(),
+               "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "resultados": resultados}
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2)
+    if args.json:
+        print(json.dumps(informe, indent=2))
+    else:
+        imprimir_tabla(resultados)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(json.load(f), resultados, args.tolerancia)
+        for linea in regresiones:
+            print(f"[REGRESIÓN] {linea}", file=sys.stderr)
+        if regresiones:
+            sys.exit(1)
+        print(f"[INFO] Sin regresiones respecto a {args.comparar}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
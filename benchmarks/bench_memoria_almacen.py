@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: memoria del almacén dict {id: Producto} vs. AlmacenColumnar (SEMANA 10).
+
+Inserta N productos en cada almacén, en un proceso nuevo por almacén, y mide la
+memoria que queda asignada (tracemalloc) y el pico de RSS del proceso.
+
+Run:
+    python benchmarks/bench_memoria_almacen.py --n 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA10, cargar_modulo, rss_pico_mb  # noqa: E402
+
+
+def medir(almacen: str, n: int, nombres_distintos: int) -> dict:
+    """Se ejecuta en el proceso hijo: llena el almacén pedido con n productos."""
+    inv10 = cargar_modulo(RUTA_SEMANA10, "inventario_semana10")
+    Producto = inv10.Producto
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    productos = inv10.AlmacenColumnar() if almacen == "columnar" else {}
+    for i in range(n):
+        idp = f"P{i:07d}"
+        productos[idp] = Producto(idp, f"Producto número {i % nombres_distintos}", i % 1000, (i % 9973) / 100)
+    segundos = time.perf_counter() - inicio
+    gc.collect()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"almacen": almacen, "productos": len(productos), "segundos_llenado": segundos,
+            "mb_asignados": actual / 1e6, "bytes_por_producto": actual / max(n, 1),
+            "rss_pico_mb": rss_pico_mb()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000, help="cantidad de productos")
+    parser.add_argument("--nombres-distintos", type=int, default=0,
+                        help="cuántos nombres diferentes usar (0 = todos distintos)")
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    parser.add_argument("--medir", choices=("dict", "columnar"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    nombres_distintos = args.nombres_distintos or args.n
+    if args.medir:
+        print(json.dumps(medir(args.medir, args.n, nombres_distintos)))
+        return
+
+    resultados = []
+    for almacen in ("dict", "columnar"):
+        salida = subprocess.run([sys.executable, __file__, "--medir", almacen, "--n", str(args.n),
+                                 "--nombres-distintos", str(nombres_distintos)],
+                                check=True, capture_output=True, text=True).stdout
+        resultados.append(json.loads(salida.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps({"n": args.n, "nombres_distintos": nombres_distintos, "resultados": resultados},
+                         indent=2))
+        return
+    print(f"Memoria para {args.n} productos ({nombres_distintos} nombres distintos):")
+    print(f"{'Almacén':<9}  {'MB asignados':>12}  {'B/producto':>10}  {'RSS pico MB':>11}  {'Llenado s':>9}")
+    for r in resultados:
+        rss = f"{r['rss_pico_mb']:.1f}" if r["rss_pico_mb"] is not None else "n/d"
+        print(f"{r['almacen']:<9}  {r['mb_asignados']:>12.1f}  {r['bytes_por_producto']:>10.0f}  "
+              f"{rss:>11}  {r['segundos_llenado']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
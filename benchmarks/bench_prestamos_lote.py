@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: préstamos y devoluciones en lote de la Biblioteca (SEMANA 12).
+
+Se prestan y luego se devuelven --lotes lotes de --tam pares (isbn, user_id), como los
+de una clase completa, comparando un `prestar_libro`/`devolver_libro` por par con
+`prestar_lote`/`devolver_lote`. Se mide en memoria, con persistencia (una escritura al
+registro por evento o por lote) y con persistencia sincronizada (os.fsync en cada
+escritura).
+
+Run:
+    python benchmarks/bench_prestamos_lote.py --tam 300 --lotes 50
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA12, cargar_modulo  # noqa: E402
+
+MODOS = ("memoria", "persistente", "sincronizado")
+
+
+def medir(modo: str, variante: str, libros: int, tam: int, lotes: int, semilla: int = 42) -> dict:
+    bib12 = cargar_modulo(RUTA_SEMANA12, "biblioteca_semana12")
+    with tempfile.TemporaryDirectory() as carpeta:
+        if modo == "memoria":
+            bib = bib12.Biblioteca()
+        else:
+            bib = bib12.Biblioteca.abrir(carpeta, eventos_por_instantanea=10 ** 12,
+                                         sincronizar=(modo == "sincronizado"))
+        for i in range(libros):
+            bib.agregar_libro(bib12.Libro((f"Libro {i}", f"Autor {i % 100}"), f"Categoría {i % 20}", f"{i:09d}"))
+        for u in range(tam):
+            bib.registrar_usuario(f"Estudiante {u}", f"E{u:04d}")
+        azar = random.Random(semilla)
+        isbns = list(bib.libros)
+        azar.shuffle(isbns)
+        clases = [[(isbns[k * tam + u], f"E{u:04d}") for u in range(tam)] for k in range(lotes)]
+
+        inicio = time.perf_counter()
+        for pares in clases:
+            if variante == "lote":
+                assert bib.prestar_lote(pares)[0]
+            else:
+                for isbn, user_id in pares:
+                    assert bib.prestar_libro(isbn, user_id)
+        segundos_prestar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for pares in clases:
+            if variante == "lote":
+                assert bib.devolver_lote(pares)[0]
+            else:
+                for isbn, user_id in pares:
+                    assert bib.devolver_libro(isbn, user_id)
+        segundos_devolver = time.perf_counter() - inicio
+        bib.cerrar()
+    pares_total = tam * lotes
+    return {"modo": modo, "variante": variante, "us_por_prestamo": segundos_prestar / pares_total * 1e6,
+            "us_por_devolucion": segundos_devolver / pares_total * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--libros", type=int, default=50_000, help="libros en el catálogo")
+    parser.add_argument("--tam", type=int, default=300, help="pares por lote (estudiantes por clase)")
+    parser.add_argument("--lotes", type=int, default=50)
+    parser.add_argument("--modos", default=",".join(MODOS), help="modos a medir, separados por comas")
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    args = parser.parse_args()
+    if args.tam * args.lotes > args.libros:
+        parser.error("--tam * --lotes no puede superar a --libros")
+    modos = [m.strip() for m in args.modos.split(",") if m.strip()]
+    desconocidos = [m for m in modos if m not in MODOS]
+    if desconocidos:
+        parser.error(f"modos desconocidos: {', '.join(desconocidos)}")
+
+    resultados = []
+    for modo in modos:
+        for variante in ("por par", "lote"):
+            print(f"[INFO] Midiendo {modo} / {variante}...", file=sys.stderr)
+            resultados.append(medir(modo, variante, args.libros, args.tam, args.lotes))
+    if args.json:
+        print(json.dumps({"tam": args.tam, "lotes": args.lotes, "resultados": resultados}, indent=2))
+        return
+    print(f"{args.lotes} lotes de {args.tam} pares:")
+    print(f"{'Modo':<13}  {'Variante':<8}  {'us/préstamo':>11}  {'us/devolución':>13}")
+    for r in resultados:
+        print(f"{r['modo']:<13}  {r['variante']:<8}  {r['us_por_prestamo']:>11.2f}  {r['us_por_devolucion']:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: préstamos de un usuario con miles de libros en la Biblioteca (SEMANA 12).
+
+Un usuario institucional recibe --prestamos libros y luego se repite --operaciones
+veces: devolver uno de sus libros al azar y prestarle otro disponible. Se compara
+`Usuario.prestados` como dict ordenado (O(1)) con la lista anterior, donde devolver
+hacía `isbn in lista` y `lista.remove` (O(k)). También se mide listar sus préstamos.
+
+Run:
+    python benchmarks/bench_prestamos_usuario.py --prestamos 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA12, cargar_modulo  # noqa: E402
+
+
+@dataclass
+class UsuarioLista:
+    """Usuario de la SEMANA 12 antes del cambio, con los préstamos en una lista."""
+    nombre: str
+    user_id: str
+    prestados: List[str] = field(default_factory=list)
+
+    def prestar(self, isbn: str) -> None:
+        self.prestados.append(isbn)
+
+    def devolver(self, isbn: str) -> bool:
+        if isbn in self.prestados:
+            self.prestados.remove(isbn)
+            return True
+        return False
+
+    def listar_prestados(self) -> List[str]:
+        return list(self.prestados)
+
+
+def medir(variante: str, libros: int, prestamos: int, operaciones: int, semilla: int = 42) -> dict:
+    bib12 = cargar_modulo(RUTA_SEMANA12, "biblioteca_semana12")
+    bib = bib12.Biblioteca()
+    for i in range(libros):
+        bib.agregar_libro(bib12.Libro((f"Libro {i}", f"Autor {i % 100}"), f"Categoría {i % 20}", f"{i:09d}"))
+    bib.registrar_usuario("Colegio Central", "INST")
+    if variante == "lista":
+        bib.usuarios["INST"] = UsuarioLista("Colegio Central", "INST")
+    azar = random.Random(semilla)
+    isbns = list(bib.libros)
+    azar.shuffle(isbns)
+    prestados, libres = isbns[:prestamos], isbns[prestamos:]
+
+    inicio = time.perf_counter()
+    for isbn in prestados:
+        assert bib.prestar_libro(isbn, "INST")
+    segundos_prestar = time.perf_counter() - inicio
+
+    # Devolver uno al azar y prestar uno libre: el usuario siempre tiene `prestamos` libros
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        i = azar.randrange(len(prestados))
+        j = azar.randrange(len(libres))
+        devuelto, nuevo = prestados[i], libres[j]
+        assert bib.devolver_libro(devuelto, "INST")
+        assert bib.prestar_libro(nuevo, "INST")
+        prestados[i], libres[j] = nuevo, devuelto
+    segundos_rotacion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    listados = bib.listar_prestados_usuario("INST")
+    segundos_listar = time.perf_counter() - inicio
+    assert len(listados) == prestamos
+    return {"variante": variante, "us_por_prestamo_inicial": segundos_prestar / max(prestamos, 1) * 1e6,
+            "us_por_devolver_y_prestar": segundos_rotacion / max(operaciones, 1) * 1e6,
+            "ms_listar": segundos_listar * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--libros", type=int, default=50_000, help="libros en el catálogo")
+    parser.add_argument("--prestamos", type=int, default=10_000, help="préstamos que mantiene el usuario")
+    parser.add_argument("--operaciones", type=int, default=20_000, help="ciclos devolver + prestar")
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    args = parser.parse_args()
+    if args.prestamos > args.libros:
+        parser.error("--prestamos no puede superar a --libros")
+
+    resultados = [medir(variante, args.libros, args.prestamos, args.operaciones) for variante in ("dict", "lista")]
+    if args.json:
+        print(json.dumps({"libros": args.libros, "prestamos": args.prestamos, "operaciones": args.operaciones,
+                          "resultados": resultados}, indent=2))
+        return
+    print(f"Usuario con {args.prestamos} préstamos, {args.operaciones} ciclos devolver + prestar:")
+    print(f"{'Variante':<8}  {'us/préstamo':>11}  {'us/ciclo':>9}  {'Listar ms':>9}")
+    for r in resultados:
+        print(f"{r['variante']:<8}  {r['us_por_prestamo_inicial']:>11.2f}  {r['us_por_devolver_y_prestar']:>9.2f}  "
+              f"{r['ms_listar']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
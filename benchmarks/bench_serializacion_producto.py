@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: conversión de Producto (SEMANA 11) a dict/tupla y de vuelta.
+
+Compara, sobre N productos, `dataclasses.asdict` y el `from_dict` anterior (que
+convertía siempre cantidad y precio con int()/float()) contra las funciones
+generadas por `generar_codec` (`to_dict`, `to_tuple`, `from_dict`, `from_tuple`).
+Solo mide la conversión, sin JSON ni disco.
+
+Run:
+    python benchmarks/bench_serializacion_producto.py --n 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import sys
+import time
+from typing import Callable, Iterable
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA11, cargar_modulo  # noqa: E402
+
+
+def cronometrar(funcion: Callable, datos: Iterable, repeticiones: int) -> float:
+    """Mejor tiempo (segundos) de aplicar `funcion` a cada elemento de `datos`."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        for x in datos:
+            funcion(x)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000, help="cantidad de productos")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    args = parser.parse_args()
+
+    inv11 = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+    Producto = inv11.Producto
+    productos = [Producto(f"P{i:07d}", f"Producto número {i}", i % 1000, (i % 9973) / 100) for i in range(args.n)]
+    dicts = [p.to_dict() for p in productos]
+    tuplas = [p.to_tuple() for p in productos]
+
+    def from_dict_anterior(d: dict):
+        return Producto(id=d["id"], nombre=d["nombre"], cantidad=int(d["cantidad"]), precio=float(d["precio"]))
+
+    casos = [
+        ("a dict", "asdict", dataclasses.asdict, productos),
+        ("a dict", "to_dict", Producto.to_dict, productos),
+        ("a dict", "codec.a_dict", inv11.CODEC_PRODUCTO.a_dict, productos),
+        ("a tupla", "codec.a_tupla", inv11.CODEC_PRODUCTO.a_tupla, productos),
+        ("desde dict", "from_dict anterior", from_dict_anterior, dicts),
+        ("desde dict", "from_dict", Producto.from_dict, dicts),
+        ("desde dict", "codec.desde_dict", inv11.CODEC_PRODUCTO.desde_dict, dicts),
+        ("desde tupla", "codec.desde_tupla", inv11.CODEC_PRODUCTO.desde_tupla, tuplas),
+    ]
+    resultados = []
+    for grupo, nombre, funcion, datos in casos:
+        print(f"[INFO] Midiendo {nombre}...", file=sys.stderr)
+        segundos = cronometrar(funcion, datos, args.repeticiones)
+        resultados.append({"grupo": grupo, "funcion": nombre, "segundos": segundos,
+                           "ns_por_producto": segundos / args.n * 1e9})
+
+    if args.json:
+        print(json.dumps({"n": args.n, "resultados": resultados}, indent=2))
+        return
+    referencia = {"a dict": resultados[0]["segundos"], "a tupla": resultados[0]["segundos"],
+                  "desde dict": resultados[4]["segundos"], "desde tupla": resultados[4]["segundos"]}
+    print(f"{args.n} productos (mejor de {args.repeticiones}; aceleración respecto a asdict / from_dict anterior):")
+    print(f"{'Conversión':<12}  {'Función':<20}  {'Segundos':>9}  {'ns/producto':>11}  {'Aceleración':>11}")
+    for r in resultados:
+        print(f"{r['grupo']:<12}  {r['funcion']:<20}  {r['segundos']:>9.3f}  {r['ns_por_producto']:>11.0f}  "
+              f"{referencia[r['grupo']] / r['segundos']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
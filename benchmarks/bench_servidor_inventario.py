@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga: servidor de red del Inventario de la SEMANA 11.
+
+Sin --conectar ni --unix, genera un inventario de N productos, levanta el servidor
+(`--servidor 127.0.0.1:0`) en otro proceso y lo detiene al final. Abre --conexiones
+conexiones; cada una mantiene hasta --ventana solicitudes en vuelo (pipelining) hasta
+completar --solicitudes en total, con la mezcla de operaciones de --mezcla. Informa
+solicitudes por segundo y percentiles de latencia (desde que se envía la solicitud
+hasta que llega su respuesta).
+
+Run:
+    python benchmarks/bench_servidor_inventario.py --n 100000 --conexiones 8 --ventana 32
+    python benchmarks/bench_servidor_inventario.py --conectar 127.0.0.1:8765 --mezcla get=90,update=10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA11, cargar_modulo  # noqa: E402
+
+PALABRAS = ("Lápiz", "Cuaderno", "Borrador", "Regla", "Mochila", "Tijeras", "Marcador", "Carpeta",
+            "Compás", "Calculadora")
+OPERACIONES = ("get", "search", "list", "range", "update")
+
+
+def generar(ruta: str, n: int) -> None:
+    inv11 = cargar_modulo(RUTA_SEMANA11, "inventario_semana11")
+    inv = inv11.Inventario(ruta)
+    inv.productos = {f"P{i:07d}": inv11.Producto(f"P{i:07d}", f"{PALABRAS[i % len(PALABRAS)]} modelo {i}",
+                                                 i % 1000, (i % 9973) / 100) for i in range(n)}
+    inv.compactar()
+
+
+def interpretar_mezcla(texto: str) -> List[Tuple[str, float]]:
+    mezcla = []
+    for parte in texto.split(","):
+        op, _, peso = parte.partition("=")
+        op = op.strip()
+        if op not in OPERACIONES:
+            raise ValueError(f"operación desconocida {op!r} (opciones: {', '.join(OPERACIONES)})")
+        mezcla.append((op, float(peso or 1)))
+    return mezcla
+
+
+def fabrica_solicitudes(mezcla: List[Tuple[str, float]], n: int, semilla: int) -> Callable[[], Dict[str, Any]]:
+    azar = random.Random(semilla)
+    ops = [op for op, _ in mezcla]
+    pesos = [peso for _, peso in mezcla]
+
+    def siguiente() -> Dict[str, Any]:
+        op = azar.choices(ops, pesos)[0]
+        pid = f"P{azar.randrange(max(n, 1)):07d}"
+        if op == "get":
+            return {"op": "get", "id": pid}
+        if op == "update":
+            return {"op": "update", "id": pid, "cantidad": azar.randrange(1000)}
+        if op == "search":
+            return {"op": "search", "texto": f"modelo {azar.randrange(max(n, 1))}", "limite": 10}
+        if op == "list":
+            return {"op": "list", "desde": pid, "limite": 20}
+        inicio = azar.randrange(1000)
+        return {"op": "range", "campo": "cantidad", "minimo": inicio, "maximo": inicio, "limite": 20}
+
+    return siguiente
+
+
+async def abrir(destino: Tuple[str, Any]) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    tipo, direccion = destino
+    if tipo == "unix":
+        return await asyncio.open_unix_connection(direccion, limit=1 << 24)
+    return await asyncio.open_connection(*direccion, limit=1 << 24)
+
+
+async def conexion(destino: Tuple[str, Any], cantidad: int, ventana: int,
+                   siguiente: Callable[[], Dict[str, Any]], latencias: List[float],
+                   errores: Dict[str, int]) -> None:
+    """Envía `cantidad` solicitudes con hasta `ventana` en vuelo y anota cada latencia."""
+    lector, escritor = await abrir(destino)
+    enviadas: deque = deque()
+    cupo = asyncio.Semaphore(ventana)
+
+    async def enviar() -> None:
+        for _ in range(cantidad):
+            await cupo.acquire()
+            solicitud = siguiente()
+            enviadas.append((solicitud["op"], time.perf_counter()))
+            escritor.write(json.dumps(solicitud).encode("utf-8") + b"\n")
+            await escritor.drain()
+
+    async def recibir() -> None:
+        for _ in range(cantidad):
+            linea = await lector.readline()
+            if not linea:
+                raise ConnectionError("el servidor cerró la conexión")
+            ahora = time.perf_counter()
+            op, enviada = enviadas.popleft()
+            latencias.append(ahora - enviada)
+            respuesta = json.loads(linea)
+            if not respuesta.get("ok"):
+                errores[op] = errores.get(op, 0) + 1
+            cupo.release()
+
+    await asyncio.gather(enviar(), recibir())
+    escritor.close()
+    await escritor.wait_closed()
+
+
+async def carga(destino: Tuple[str, Any], conexiones: int, solicitudes: int, ventana: int,
+                mezcla: List[Tuple[str, float]], n: int) -> Dict[str, Any]:
+    latencias: List[float] = []
+    errores: Dict[str, int] = {}
+    por_conexion = [solicitudes // conexiones + (1 if i < solicitudes % conexiones else 0)
+                    for i in range(conexiones)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexion(destino, cantidad, ventana, fabrica_solicitudes(mezcla, n, semilla=i),
+                                    latencias, errores)
+                           for i, cantidad in enumerate(por_conexion) if cantidad))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+
+    def percentil(p: float) -> float:
+        if not latencias:
+            return 0.0
+        return latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))] * 1000
+
+    return {"solicitudes": len(latencias), "segundos": segundos,
+            "solicitudes_por_segundo": len(latencias) / segundos if segundos else 0.0,
+            "p50_ms": percentil(50), "p95_ms": percentil(95), "p99_ms": percentil(99),
+            "max_ms": latencias[-1] * 1000 if latencias else 0.0, "errores": errores}
+
+
+def levantar_servidor(ruta: str) -> Tuple[subprocess.Popen, Tuple[str, int]]:
+    proceso = subprocess.Popen([sys.executable, RUTA_SEMANA11, "--archivo", ruta, "--servidor", "127.0.0.1:0"],
+                               stdout=subprocess.PIPE, text=True)
+    for linea in proceso.stdout:
+        if linea.startswith("Servidor escuchando en "):
+            host, _, puerto = linea.split()[-1].rpartition(":")
+            return proceso, (host, int(puerto))
+    proceso.wait()
+    raise RuntimeError(f"el servidor terminó sin empezar a escuchar (código {proceso.returncode})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000,
+                        help="productos del inventario generado (o existentes en el servidor, para elegir IDs)")
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--solicitudes", type=int, default=50_000, help="solicitudes en total")
+    parser.add_argument("--ventana", type=int, default=32, help="solicitudes en vuelo por conexión")
+    parser.add_argument("--mezcla", default="get=70,search=5,list=5,range=5,update=15",
+                        help="operaciones y pesos, p. ej. get=90,update=10")
+    destino = parser.add_mutually_exclusive_group()
+    destino.add_argument("--conectar", metavar="HOST:PUERTO", help="usar un servidor ya levantado")
+    destino.add_argument("--unix", metavar="RUTA", help="usar un servidor ya levantado en un socket Unix")
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    args = parser.parse_args()
+    try:
+        mezcla = interpretar_mezcla(args.mezcla)
+    except ValueError as e:
+        parser.error(str(e))
+
+    proceso: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as carpeta:
+        if args.unix:
+            objetivo: Tuple[str, Any] = ("unix", args.unix)
+        elif args.conectar:
+            host, _, puerto = args.conectar.rpartition(":")
+            objetivo = ("tcp", (host or "127.0.0.1", int(puerto)))
+        else:
+            ruta = os.path.join(carpeta, "inventory.json")
+            print(f"[INFO] Generando {args.n} productos y levantando el servidor...", file=sys.stderr)
+            generar(ruta, args.n)
+            proceso, direccion = levantar_servidor(ruta)
+            objetivo = ("tcp", direccion)
+        try:
+            resultado = asyncio.run(carga(objetivo, args.conexiones, args.solicitudes, args.ventana, mezcla, args.n))
+        finally:
+            if proceso is not None:
+                proceso.send_signal(signal.SIGTERM)
+                proceso.communicate(timeout=60)
+
+    resultado.update(conexiones=args.conexiones, ventana=args.ventana, mezcla=args.mezcla)
+    if args.json:
+        print(json.dumps(resultado, indent=2))
+        return
+    print(f"{resultado['solicitudes']} solicitudes en {resultado['segundos']:.2f} s "
+          f"({args.conexiones} conexiones, ventana {args.ventana}, mezcla {args.mezcla})")
+    print(f"  {resultado['solicitudes_por_segundo']:,.0f} solicitudes/s")
+    print(f"  latencia ms: p50 {resultado['p50_ms']:.2f}  p95 {resultado['p95_ms']:.2f}  "
+          f"p99 {resultado['p99_ms']:.2f}  máx {resultado['max_ms']:.2f}")
+    if resultado["errores"]:
+        print(f"  respuestas con error: {resultado['errores']}")
+
+
+if __name__ == "__main__":
+    main()
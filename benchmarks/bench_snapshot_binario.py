@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: arranque del Inventario de la SEMANA 10 desde CSV vs. instantánea binaria.
+
+Genera un inventario sintético de N productos, lo guarda (CSV + `.bin`) y mide en
+procesos separados el tiempo de carga y la memoria residente máxima de cada formato.
+Cada medición corre en un proceso nuevo para que el pico de RSS sea independiente.
+
+Run:
+    python benchmarks/bench_snapshot_binario.py --n 500000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun import RUTA_SEMANA10, cargar_modulo, rss_pico_mb  # noqa: E402
+
+
+def generar(ruta: str, n: int) -> None:
+    """Escribe un CSV de n productos y lo vuelve a guardar con Inventario (crea el .bin)."""
+    with open(ruta, "w", encoding="utf-8", newline="") as f:
+        f.write("id,nombre,cantidad,precio\n")
+        for i in range(n):
+            f.write(f"P{i:07d},Producto número {i},{i % 1000},{(i % 9973) / 100:.2f}\n")
+    inv10 = cargar_modulo(RUTA_SEMANA10, "inventario_semana10")
+    inv = inv10.Inventario(ruta, snapshot_binario=True, procesos_carga=1)
+    inv._guardar_atomico()
+
+
+def medir(ruta: str, formato: str) -> dict:
+    """Se ejecuta en el proceso hijo: carga el inventario con el formato pedido."""
+    inv10 = cargar_modulo(RUTA_SEMANA10, "inventario_semana10")
+    inicio = time.perf_counter()
+    inv = inv10.Inventario(ruta, snapshot_binario=(formato == "binario"), procesos_carga=1)
+    segundos = time.perf_counter() - inicio
+    return {"formato": formato, "origen": inv.origen_carga(), "productos": len(inv.listar()),
+            "segundos": segundos, "rss_pico_mb": rss_pico_mb()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=500_000, help="cantidad de productos")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="emitir los resultados en JSON")
+    parser.add_argument("--medir", choices=("csv", "binario"), help=argparse.SUPPRESS)
+    parser.add_argument("--ruta", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.medir:
+        print(json.dumps(medir(args.ruta, args.medir)))
+        return
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "inventario.txt")
+        generar(ruta, args.n)
+        tamanos = {"csv": os.path.getsize(ruta), "binario": os.path.getsize(ruta + ".bin")}
+        resultados = []
+        for formato in ("csv", "binario"):
+            corridas = []
+            for _ in range(args.repeticiones):
+                salida = subprocess.run([sys.executable, __file__, "--medir", formato, "--ruta", ruta],
+                                        check=True, capture_output=True, text=True).stdout
+                corridas.append(json.loads(salida.strip().splitlines()[-1]))
+            mejor = min(corridas, key=lambda r: r["segundos"])
+            assert mejor["origen"] == formato, f"se esperaba cargar desde {formato}"
+            mejor["bytes_archivo"] = tamanos[formato]
+            resultados.append(mejor)
+
+    if args.json:
+        print(json.dumps({"n": args.n, "resultados": resultados}, indent=2))
+        return
+    print(f"Carga de {args.n} productos (mejor de {args.repeticiones}):")
+    print(f"{'Formato':<8}  {'Segundos':>9}  {'RSS pico MB':>11}  {'Archivo MB':>10}")
+    for r in resultados:
+        rss = f"{r['rss_pico_mb']:.1f}" if r["rss_pico_mb"] is not None else "n/d"
+        print(f"{r['formato']:<8}  {r['segundos']:>9.3f}  {rss:>11}  {r['bytes_archivo'] / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Los scripts de cada semana tienen espacios y paréntesis en el nombre, así que no se
+pueden importar con `import`; aquí se cargan a partir de su ruta.
+"""
+from __future__ import annotations
+
+import ast
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Iterable, Optional
+
+try:
+    import resource  # solo existe en Linux/Mac
+except ImportError:  # Windows
+    resource = None
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_SEMANA9 = os.path.join(RAIZ, "(SEMANA 9) Sistema de Gestión de Inventarios",
+                            "Tema (Sistema de Gestión de Inventarios) Semana 9.py")
+RUTA_SEMANA10 = os.path.join(RAIZ, "SEMANA 10", "Tarea (Sistema de Gestión de Inventarios Mejorado.py")
+RUTA_SEMANA11 = os.path.join(RAIZ, "SEMANA 11", "Tarea (Sistema Avanzado de Gestión de Inventario).py")
+RUTA_SEMANA12 = os.path.join(RAIZ, "SEMANA 12", "Tarea (Sistema de Gestión de Biblioteca Digital).py")
+RUTA_SEMANA16 = os.path.join(RAIZ, "SEMANA 16",
+                             "sistema de gestión de inventario con interfaz gráfica y  almacenamiento en archivos..py")
+
+
+def cargar_modulo(ruta: str, nombre: str) -> ModuleType:
+    """Importa un script de la tarea a partir de su ruta y lo registra como `nombre`."""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo  # necesario para dataclasses y pickle
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def cargar_clases(ruta: str, nombre: str, clases: Iterable[str]) -> ModuleType:
+    """Importa solo las clases indicadas (y los imports de la biblioteca estándar) de un
+    script que no se puede ejecutar completo; p. ej. la SEMANA 16 necesita tkinter y un
+    módulo `inventario` que no existe. Se extraen del código fuente con `ast`.
+    """
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    with open(ruta, encoding="utf-8") as f:
+        arbol = ast.parse(f.read(), filename=ruta)
+    clases = set(clases)
+    omitir = {"tkinter", "inventario"}
+    cuerpo = []
+    for nodo in arbol.body:
+        if isinstance(nodo, ast.ClassDef) and nodo.name in clases:
+            cuerpo.append(nodo)
+        elif isinstance(nodo, ast.Import) and not any(a.name.split(".")[0] in omitir for a in nodo.names):
+            cuerpo.append(nodo)
+        elif isinstance(nodo, ast.ImportFrom) and (nodo.module or "").split(".")[0] not in omitir:
+            cuerpo.append(nodo)
+    modulo = ModuleType(nombre)
+    modulo.__file__ = ruta
+    sys.modules[nombre] = modulo
+    exec(compile(ast.Module(body=cuerpo, type_ignores=[]), ruta, "exec"), modulo.__dict__)
+    return modulo
+
+
+def rss_pico_mb() -> Optional[float]:
+    """Memoria residente máxima (MB) del proceso actual, o None si no se puede medir."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB; macOS, bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024